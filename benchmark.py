@@ -0,0 +1,739 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：benchmark.py
+@Author ：OrangeJ
+@Date ：2026/10/18 10:12
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from utils.lex import Lex, MmapLex
+from utils.yacc import Yacc, CustomYaccEncoder, NodeType
+from utils.dot import DotGenerator
+from utils.incremental import IncrementalParser
+from utils.parallel import parse_parallel, split_segments
+from utils.analyzer import Analyzer, CustomAnaEncoder, Sentence_Type
+from utils.ir import IRGenerator, LLVM
+from utils.fold import fold_constants
+from utils.jsonstream import JsonStyle, dump_tokens, dump_ast
+from utils import binary
+
+
+def generate_source(functions: int = 100, statements: int = 20) -> str:
+    """
+    生成用于基准测试的miniC源码
+
+    :param functions: 函数个数
+    :param statements: 每个函数中循环体语句个数
+    :return: 源码
+    """
+    lines = ["int g;", "int table[16][16];", ""]
+    for f in range(functions):
+        lines.append(f"int func{f}(int a, int b[]) {{")
+        lines.append("    int i, sum, tmp[8];")
+        lines.append("    /* generated block */")
+        lines.append("    i = 0x0;")
+        lines.append("    sum = 017;")
+        lines.append("    while (i < 8) {")
+        for s in range(statements):
+            lines.append(f"        sum = sum + a * {s + 1} - b[i] / 3 % 7; // statement {s}")
+            if s % 5 == 0:
+                lines.append(f"        if (sum >= {s} && i != 3 || !a) {{ tmp[i] = sum; }} else {{ g = g - 1; }}")
+        lines.append("        i++;")
+        lines.append("    }")
+        lines.append("    return sum;")
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_nested(depth: int = 100, locals_per_block: int = 20) -> str:
+    """
+    生成深度嵌套的miniC源码，每层循环体定义若干局部变量（部分遮蔽外层同名变量）并引用外层变量
+
+    :param depth: 嵌套层数
+    :param locals_per_block: 每层定义的局部变量个数
+    :return: 源码
+    """
+    lines = ["int g;", "int v0;", "", "int main() {", "    int v0, v1;", "    v0 = 0;", "    v1 = 1;"]
+    for d in range(depth):
+        indent = "    " * (d + 1)
+        lines.append(f"{indent}while (v0 < {d + 1}) {{")
+        names = [f"v{d + 1}"] + [f"w{d}_{k}" for k in range(locals_per_block - 1)]
+        lines.append(f"{indent}    int {', '.join(names)};")
+        for k, name in enumerate(names):
+            lines.append(f"{indent}    {name} = v{d} + v{max(d - 1, 0)} + g * {k};")
+    for d in reversed(range(depth)):
+        lines.append("    " * (d + 1) + "}")
+    lines.append("    return v0;")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def generate_constants(functions: int = 100, statements: int = 20) -> str:
+    """
+    生成含大量常量表达式的miniC源码，模拟宏展开后的代码
+
+    :param functions: 函数个数
+    :param statements: 每个函数中循环体语句个数
+    :return: 源码
+    """
+    lines = ["int g;", ""]
+    for f in range(functions):
+        lines.append(f"int func{f}(int a, int b[]) {{")
+        lines.append("    int i, sum;")
+        lines.append("    i = 0 * 4 + 0;")
+        lines.append("    sum = (16 * 4 - 1) % 10;")
+        lines.append("    while (i < 4 * 2 && 1) {")
+        for s in range(statements):
+            lines.append(f"        sum = sum * 1 + ({s} * 8 + 1) / 3 - a * (2 - 1) + 0; // statement {s}")
+            if s % 5 == 0:
+                lines.append(f"        if (!0 && i != 16 / 4 || 0) {{ b[i * 1 + 0] = sum - -{s}; }}")
+        lines.append("        i = i + (10 - 9);")
+        lines.append("    }")
+        lines.append("    return sum / (3 - 2);")
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_overloads(overloads: int = 100, calls: int = 1000) -> str:
+    """
+    生成大量重载函数与调用点的miniC源码
+
+    各重载以参数个数与每个参数是变量还是数组区分，按参数个数从多到少声明，最后定义无参数的重载；
+    调用点只传0~1个参数，逐个比较各重载时每次调用都要扫描几乎全部重载。
+    （参数个数相同的重载按实参大小无法区分，只能声明，不能都给出定义）
+
+    :param overloads: 重载个数
+    :param calls: 调用点个数
+    :return: 源码
+    """
+    signatures = []
+    arity = 0
+    while len(signatures) < overloads:
+        signatures += [(arity, mask) for mask in range(2 ** arity)]
+        arity += 1
+    lines = []
+    for arity, mask in reversed(signatures[1:overloads]):
+        paras = ", ".join(f"int p{i}[]" if mask >> i & 1 else f"int p{i}" for i in range(arity))
+        lines.append(f"int f({paras});")
+    lines.append("int f() { return 0; }")
+    lines.append("int main() {")
+    lines.append("    int s;")
+    lines.append("    s = 0;")
+    for c in range(calls):
+        lines.append(f"    s = s + f({'1' if c % 2 else ''});")
+    lines.append("    return s;")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def bench_lex(opts) -> None:
+    source = generate_source(opts.functions, opts.statements)
+    print(f"source size: {len(source)} chars")
+    for name in ("get_token_regex", "get_token"):
+        best = None
+        count = 0
+        for _ in range(opts.repeat):
+            start = time.perf_counter()
+            count = sum(1 for _ in getattr(Lex(source), name)())
+            cost = time.perf_counter() - start
+            best = cost if best is None else min(best, cost)
+        print(f"{name:<16} {count} tokens, {best:.3f}s, {count / best:,.0f} tokens/s")
+
+
+def bench_mmap(opts) -> None:
+    fd, path = tempfile.mkstemp(suffix=".c")
+    os.close(fd)
+    try:
+        for functions in opts.functions:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generate_source(functions, opts.statements))
+            size = os.path.getsize(path)
+            for name in ("Lex", "MmapLex"):
+                tracemalloc.start()
+                start = time.perf_counter()
+                if name == "Lex":
+                    with open(path, "r", encoding="utf-8") as f:
+                        tokens = Lex(f.read()).get_token()
+                else:
+                    tokens = MmapLex(path).get_token()
+                count = sum(1 for _ in tokens)
+                cost = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{size / 2 ** 20:8.1f} MiB {name:<8} {count} tokens, {cost:.3f}s, peak {peak / 2 ** 20:.2f} MiB")
+    finally:
+        os.remove(path)
+
+
+def bench_buffer(opts) -> None:
+    source = generate_source(opts.functions, opts.statements)
+    for name in ("namedtuple", "TokenBuffer"):
+        tracemalloc.start()
+        start = time.perf_counter()
+        if name == "namedtuple":
+            tokens = list(Lex(source).get_token())
+        else:
+            tokens = Lex(source).get_buffer()
+        cost = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<12} {len(tokens)} tokens, {cost:.3f}s, "
+              f"retained {current / 2 ** 20:.2f} MiB, peak {peak / 2 ** 20:.2f} MiB")
+        del tokens
+
+
+def bench_parse(opts) -> None:
+    source = generate_source(opts.functions, opts.statements)
+    tokens = Lex(source).get_buffer()
+    print(f"{len(tokens)} tokens")
+
+    def run(name: str) -> Yacc:
+        yy = Yacc(tokens)
+        yy.parser()
+        if name == "parse+dot":
+            with open(os.devnull, "w") as f:
+                DotGenerator(yy.ast).write(f)
+        return yy
+
+    for name in ("parse", "parse+dot"):
+        # 计时与内存统计分开进行，tracemalloc会显著拖慢分配密集的语法分析
+        start = time.perf_counter()
+        run(name)
+        cost = time.perf_counter() - start
+        tracemalloc.start()
+        yy = run(name)
+        # 分析结束后仍被引用的内存即语法树的内存占用
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del yy
+        print(f"{name:<10} {cost:.3f}s, AST {current / 2 ** 20:.2f} MiB, peak {peak / 2 ** 20:.2f} MiB")
+
+
+def bench_expr(opts) -> None:
+    for operands in opts.operands:
+        source = "int main() {\n    int a;\n    a = " + " + ".join(["a"] * operands) + ";\n    return a;\n}\n"
+        tokens = Lex(source).get_buffer()
+        start = time.perf_counter()
+        Yacc(tokens).parser()
+        cost = time.perf_counter() - start
+        print(f"{operands:8d} operands: {cost:.3f}s, {operands / cost:,.0f} operands/s")
+
+
+def bench_incremental(opts) -> None:
+    for functions in opts.functions:
+        source = generate_source(functions, opts.statements)
+        start = time.perf_counter()
+        Yacc(Lex(source).get_token()).parser()
+        full = time.perf_counter() - start
+
+        inc = IncrementalParser(source)
+        # 在中间函数的循环体内反复修改一个常量，模拟编辑器中的逐键输入
+        offset = source.index(f"int func{functions // 2}(")
+        offset = source.index("a * 1 ", offset) + len("a * ")
+        start = time.perf_counter()
+        for i in range(opts.repeat):
+            inc.update(offset, offset + 1, str(i % 9 + 1))
+        edit = (time.perf_counter() - start) / opts.repeat
+        print(f"{functions:6d} functions, {len(source)} chars: full parse {full * 1000:.1f}ms, "
+              f"incremental edit {edit * 1000:.2f}ms")
+
+
+def bench_parallel(opts) -> None:
+    source = generate_source(opts.functions, opts.statements)
+    tokens = Lex(source).get_buffer()
+    start = time.perf_counter()
+    segments = split_segments(tokens)
+    print(f"{len(tokens)} tokens, {len(segments)} segments, split {(time.perf_counter() - start) * 1000:.1f}ms")
+    for workers in opts.workers:
+        start = time.perf_counter()
+        parse_parallel(tokens, workers)
+        cost = time.perf_counter() - start
+        print(f"{workers:3d} workers: {cost:.3f}s")
+
+
+class FirstByteWriter:
+    """
+    丢弃写入内容的文本流，记录首次写入的时间
+    """
+
+    def __init__(self):
+        self.first = None
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        if self.first is None and text:
+            self.first = time.perf_counter()
+        self.size += len(text)
+        return len(text)
+
+
+def bench_json(opts) -> None:
+    def dumps_tokens(source, stream):
+        tokens = Lex(source).get_token()
+        stream.write(json.dumps({'tokens': [{"type": i.type, "value": i.value, "line": i.line, "column": i.column}
+                                            for i in tokens]}, indent=4))
+
+    def dumps_ast(ast, stream):
+        stream.write(json.dumps({"root": ast}, cls=CustomYaccEncoder, indent=4))
+
+    cases = [
+        ("tokens dumps", dumps_tokens, False),
+        ("tokens stream", lambda source, stream: dump_tokens(Lex(source).get_token(), stream), False),
+        ("tokens ndjson", lambda source, stream: dump_tokens(Lex(source).get_token(), stream, JsonStyle.NDJSON), False),
+        ("ast dumps", dumps_ast, True),
+        ("ast stream", lambda ast, stream: dump_ast(ast, stream), True),
+        ("ast ndjson", lambda ast, stream: dump_ast(ast, stream, JsonStyle.NDJSON), True),
+    ]
+    for functions in opts.functions:
+        source = generate_source(functions, opts.statements)
+        yy = Yacc(Lex(source).get_buffer())
+        yy.parser()
+        for name, func, use_ast in cases:
+            # 计时与内存统计分开进行
+            stream = FirstByteWriter()
+            start = time.perf_counter()
+            func(yy.ast if use_ast else source, stream)
+            cost = time.perf_counter() - start
+            tracemalloc.start()
+            func(yy.ast if use_ast else source, FirstByteWriter())
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{functions:6d} functions {name:<14} {stream.size / 2 ** 20:8.1f} MiB out, "
+                  f"first byte {(stream.first - start) * 1000:8.1f}ms, total {cost:.3f}s, peak {peak / 2 ** 20:.2f} MiB")
+
+
+def bench_binary(opts) -> None:
+    source = generate_source(opts.functions, opts.statements)
+    tokens = Lex(source).get_buffer()
+    yy = Yacc(tokens)
+    yy.parser()
+    # 语义分析中残留的调试输出不计入结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        sentences = Analyzer(yy.ast).analysis()
+    cases = [
+        ("tokens", tokens, lambda o, f: dump_tokens(o, f, JsonStyle.COMPACT), binary.dump_tokens, binary.load_tokens),
+        ("ast", yy.ast, lambda o, f: dump_ast(o, f, JsonStyle.COMPACT), binary.dump_ast, binary.load_ast),
+        ("sentences", sentences, lambda o, f: json.dump(o, f, cls=CustomAnaEncoder, separators=(',', ':')),
+         binary.dump_sentences, binary.load_sentences),
+    ]
+    for name, obj, json_dump, bin_dump, bin_load in cases:
+        text = io.StringIO()
+        start = time.perf_counter()
+        json_dump(obj, text)
+        json_write = time.perf_counter() - start
+        start = time.perf_counter()
+        json.loads(text.getvalue())
+        json_read = time.perf_counter() - start
+        data = io.BytesIO()
+        start = time.perf_counter()
+        bin_dump(obj, data)
+        bin_write = time.perf_counter() - start
+        data.seek(0)
+        start = time.perf_counter()
+        bin_load(data)
+        bin_read = time.perf_counter() - start
+        print(f"{name:<10} json {len(text.getvalue().encode()) / 2 ** 20:7.2f} MiB, "
+              f"write {json_write:.3f}s, read {json_read:.3f}s | "
+              f"binary {len(data.getvalue()) / 2 ** 20:7.2f} MiB, write {bin_write:.3f}s, read {bin_read:.3f}s")
+
+
+def bench_analyze(opts) -> None:
+    for functions in opts.functions:
+        yy = Yacc(Lex(generate_source(functions, opts.statements)).get_buffer())
+        yy.parser()
+        # 语义分析中残留的调试输出不计入结果
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            Analyzer(yy.ast, record_stack_flow=False).analysis()
+            plain = time.perf_counter() - start
+            aa = Analyzer(yy.ast)
+            start = time.perf_counter()
+            aa.analysis()
+            recorded = time.perf_counter() - start
+        line = f"{functions:6d} functions analysis {plain:.3f}s, with stack flow log {recorded:.3f}s"
+        # 符号栈流的快照总大小与代码块数的平方成正比，只对较小的程序重建
+        if functions <= opts.flow_limit:
+            start = time.perf_counter()
+            variable_stack_flow, _ = aa.get_stack_flow()
+            line += f", rebuild {len(variable_stack_flow)} snapshots {time.perf_counter() - start:.3f}s"
+        print(line)
+
+
+def bench_scopes(opts) -> None:
+    # 语法分析与语义分析均为递归实现，嵌套较深时需提高递归深度限制
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), max(opts.depth) * 50))
+    for depth in opts.depth:
+        yy = Yacc(Lex(generate_nested(depth, opts.locals)).get_buffer())
+        yy.parser()
+        # 语义分析中残留的调试输出不计入结果
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            Analyzer(yy.ast, record_stack_flow=False).analysis()
+            cost = time.perf_counter() - start
+        count = depth * opts.locals
+        print(f"depth {depth:5d}, {count:7d} locals, analysis {cost:.3f}s, {cost / count * 1e6:.1f}us per local")
+
+
+def bench_overloads(opts) -> None:
+    def analyze(source: str) -> tuple[float, list]:
+        yy = Yacc(Lex(source).get_buffer())
+        yy.parser()
+        # 语义分析中残留的调试输出不计入结果
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            sentences = Analyzer(yy.ast, record_stack_flow=False).analysis()
+            return time.perf_counter() - start, sentences
+
+    for overloads in opts.overloads:
+        # 只定义重载、不调用的耗时从总耗时中扣除，剩余部分为各调用点的开销
+        defines, _ = analyze(generate_overloads(overloads, 0))
+        cost, sentences = analyze(generate_overloads(overloads, opts.calls))
+        longest = max(len(i.value) for i in sentences if i.sentence_type is Sentence_Type.DEFINE_FUNC)
+        print(f"{overloads:5d} overloads, define {defines:.3f}s, {opts.calls} calls {cost - defines:.3f}s "
+              f"({(cost - defines) / opts.calls * 1e6:.1f}us per call), longest function name {longest}")
+
+
+def bench_sentences(opts) -> None:
+    source = generate_source(opts.functions, opts.statements)
+    yy = Yacc(Lex(source).get_buffer())
+    yy.parser()
+    # 语义分析中残留的调试输出不计入结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        sentences = Analyzer(yy.ast, record_stack_flow=False).analysis()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    best = None
+    for _ in range(opts.repeat):
+        start = time.perf_counter()
+        IRGenerator(sentences, ir=LLVM).get_ir()
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    print(f"{len(sentences)} sentences, retained {retained / 2 ** 20:.2f} MiB "
+          f"({retained / len(sentences):.0f} bytes per sentence), IR generation {best:.3f}s")
+
+
+# 常量折叠的边界情况：表达式 -> 期望折叠得到的常量，None表示不应折叠为常量
+FOLD_CASES: dict[str, Optional[int]] = {
+    "5 / 0": None,
+    "7 % 0": None,
+    "(0 - 2147483647 - 1) / -1": None,
+    "2147483647 + 1": -2147483648,
+    "0 - 2147483647 - 1": -2147483648,
+    "(0 - 7) / 2": -3,
+    "(0 - 7) % 2": -1,
+    "-(3 < 4)": -1,
+    # 本语言的==优先级高于<，即3 < (4 == 1)
+    "3 < 4 == 1": 0,
+    "!0 && 16 / 4": 1,
+    "y * 0": None,
+    "y + 0": None,
+    "0 && y": None,
+    "1 || y": None,
+}
+
+
+def check_fold_cases() -> int:
+    """
+    逐个折叠FOLD_CASES中的表达式并与期望值比较
+
+    :return: 不符合期望的个数
+    """
+    mismatches = 0
+    for expr, expected in FOLD_CASES.items():
+        yy = Yacc(Lex(f"int main() {{ int y; return {expr}; }}").get_buffer())
+        yy.parser()
+        result = fold_constants(yy.ast).program[0].funcbody.subprogram[-1].return_expr
+        actual = int(result.value) if result.node_type is NodeType.NUM else None
+        if actual != expected:
+            mismatches += 1
+            print(f"fold mismatch: {expr} -> {actual}, expected {expected}")
+    return mismatches
+
+
+def bench_fold(opts) -> None:
+    mismatches = check_fold_cases()
+    print(f"{len(FOLD_CASES)} fold cases, {mismatches} mismatches")
+    if mismatches:
+        sys.exit(1)
+    for name, source in (("generated", generate_source(opts.functions, opts.statements)),
+                         ("constants", generate_constants(opts.functions, opts.statements))):
+        tokens = Lex(source).get_buffer()
+        for fold in (False, True):
+            best = None
+            for _ in range(opts.repeat):
+                yy = Yacc(tokens)
+                yy.parser()
+                # 语义分析中残留的调试输出不计入结果
+                with contextlib.redirect_stdout(io.StringIO()):
+                    start = time.perf_counter()
+                    ast = fold_constants(yy.ast) if fold else yy.ast
+                    sentences = Analyzer(ast, record_stack_flow=False).analysis()
+                    ir = IRGenerator(sentences, ir=LLVM).get_ir()
+                    cost = time.perf_counter() - start
+                best = cost if best is None else min(best, cost)
+            print(f"{name:<10} fold {'on ' if fold else 'off'}: {len(sentences):7d} sentences, "
+                  f"{len(ir):7d} IR lines, analysis + IR {best:.3f}s")
+
+
+def compile_ir(source: str) -> list[str]:
+    """
+    完整编译流程：词法分析、语法分析、语义分析与IR生成
+
+    :param source: 源码
+    :return: IR
+    """
+    yy = Yacc(Lex(source).get_buffer())
+    yy.parser()
+    sentences = Analyzer(fold_constants(yy.ast), record_stack_flow=False).analysis()
+    return IRGenerator(sentences, ir=LLVM).get_ir()
+
+
+def bench_threads(opts) -> None:
+    sources = [generate_source(opts.functions + i, opts.statements) for i in range(opts.sources)]
+    jobs = sources * opts.rounds
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{len(jobs)} compilations, {opts.threads} threads, GIL {'enabled' if gil else 'disabled'}")
+    # 语义分析中残留的调试输出不计入结果
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        expected = [compile_ir(i) for i in sources]
+        serial = (time.perf_counter() - start) * opts.rounds
+        start = time.perf_counter()
+        with ThreadPoolExecutor(opts.threads) as pool:
+            results = list(pool.map(compile_ir, jobs))
+        concurrent = time.perf_counter() - start
+    mismatches = sum(1 for i, res in enumerate(results) if res != expected[i % len(sources)])
+    print(f"serial {serial:.3f}s (estimated), concurrent {concurrent:.3f}s, {mismatches} mismatches")
+    if mismatches:
+        sys.exit(1)
+
+
+def bench_batch(opts) -> None:
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "miniC.py")
+    with tempfile.TemporaryDirectory() as directory:
+        sources = []
+        for i in range(opts.files):
+            path = os.path.join(directory, "src", f"f{i:05d}.c")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generate_source(opts.functions, opts.statements))
+            sources.append(path)
+        # 每个文件启动一次解释器，只运行一部分文件并按比例估算
+        sample = sources[:opts.sample]
+        start = time.perf_counter()
+        for i in sample:
+            subprocess.run([sys.executable, script, i, "-i", "-o", os.path.join(directory, "single.ll")],
+                           stdout=subprocess.DEVNULL, check=True)
+        single = (time.perf_counter() - start) * len(sources) / len(sample)
+        print(f"{len(sources)} files, one process per file {single:.2f}s (estimated from {len(sample)} files), "
+              f"{len(sources) / single:.1f} files/s")
+        for jobs in opts.jobs:
+            start = time.perf_counter()
+            subprocess.run([sys.executable, script, os.path.join(directory, "src", "*.c"), "-i",
+                            "-o", os.path.join(directory, f"out{jobs}"), "--jobs", str(jobs)],
+                           stdout=subprocess.DEVNULL, check=True)
+            cost = time.perf_counter() - start
+            print(f"{len(sources)} files, batch jobs={jobs:<3d} {cost:.2f}s, {len(sources) / cost:.1f} files/s, "
+                  f"{single / cost:.1f}x")
+
+
+# -l不应导入的模块，出现即说明按需导入失效
+STARTUP_FORBIDDEN = ("graphviz", "numpy", "matplotlib", "imageio", "utils.yacc", "utils.analyzer", "utils.ir",
+                     "utils.optimizer", "utils.binary")
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """
+    解析python -X importtime的输出
+
+    :param stderr: 子进程的标准错误输出
+    :return: 顶层导入的模块 -> 累计耗时（微秒），嵌套导入计入其顶层模块；其余被导入的模块记为0
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            # 表头
+            continue
+        # 模块名前的缩进表示嵌套层级
+        nested = name[1:].startswith(" ")
+        modules[name.strip()] = 0 if nested else int(cumulative)
+    return modules
+
+
+def interpreter_modules() -> set[str]:
+    """
+    解释器启动时（site、encodings以及.pth钩子等）导入的模块，因环境而异，与编译器无关
+
+    :return: 模块名集合
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, text=True, check=True)
+    return set(parse_importtime(proc.stderr))
+
+
+def bench_startup(opts) -> None:
+    interpreter = interpreter_modules()
+    fd, path = tempfile.mkstemp(suffix=".c")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(generate_source(1, 1))
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "miniC.py")
+    command = [sys.executable, "-X", "importtime", script, path] + opts.args
+    try:
+        # 首次运行写入字节码缓存，不计入结果
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        walls, imports = [], []
+        modules = {}
+        for _ in range(opts.runs):
+            start = time.perf_counter()
+            proc = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+            walls.append(time.perf_counter() - start)
+            # 只统计编译器自身导入的模块
+            modules = {k: v for k, v in parse_importtime(proc.stderr).items() if k not in interpreter}
+            imports.append(sum(modules.values()) / 1000)
+    finally:
+        os.remove(path)
+    wall, imported = statistics.median(walls) * 1000, statistics.median(imports)
+    print(f"miniC {' '.join(opts.args)}: {opts.runs} runs, median wall {wall:.1f}ms, "
+          f"median import {imported:.1f}ms, {len(modules)} modules excluding {len(interpreter)} imported by the "
+          f"interpreter (budget {opts.budget:.1f}ms)")
+    for name, cost in sorted(modules.items(), key=lambda i: -i[1])[:opts.top]:
+        print(f"    {cost / 1000:8.1f}ms  {name}")
+    failed = False
+    unexpected = [i for i in STARTUP_FORBIDDEN if any(j == i or j.startswith(i + ".") for j in modules)]
+    if opts.args == ["-l"] and unexpected:
+        print(f"[FAIL] '-l' imports {', '.join(unexpected)}")
+        failed = True
+    if imported > opts.budget:
+        print(f"[FAIL] import time {imported:.1f}ms exceeds the budget of {opts.budget:.1f}ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    argsParser = argparse.ArgumentParser("benchmark", description="miniC 编译器性能基准")
+    subParsers = argsParser.add_subparsers(dest="target", required=True)
+
+    lexParser = subParsers.add_parser("lex", help="词法分析吞吐量")
+    lexParser.add_argument("--functions", type=int, default=500, help="生成源码中的函数个数")
+    lexParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    lexParser.add_argument("--repeat", type=int, default=3, help="重复次数，取最优")
+    lexParser.set_defaults(func=bench_lex)
+
+    mmapParser = subParsers.add_parser("mmap", help="mmap词法分析峰值内存")
+    mmapParser.add_argument("--functions", type=int, nargs="+", default=[500, 2000, 8000], help="生成源码中的函数个数")
+    mmapParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    mmapParser.set_defaults(func=bench_mmap)
+
+    bufferParser = subParsers.add_parser("buffer", help="Token列表与TokenBuffer内存对比")
+    bufferParser.add_argument("--functions", type=int, default=2000, help="生成源码中的函数个数（默认约100万个Token）")
+    bufferParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    bufferParser.set_defaults(func=bench_buffer)
+
+    parseParser = subParsers.add_parser("parse", help="仅语法分析与额外生成gv图的耗时与内存")
+    parseParser.add_argument("--functions", type=int, default=500, help="生成源码中的函数个数")
+    parseParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    parseParser.set_defaults(func=bench_parse)
+
+    exprParser = subParsers.add_parser("expr", help="超长表达式的语法分析耗时")
+    exprParser.add_argument("--operands", type=int, nargs="+", default=[1000, 10000, 100000], help="表达式中的操作数个数")
+    exprParser.set_defaults(func=bench_expr)
+
+    incParser = subParsers.add_parser("incremental", help="全量语法分析与增量修改的延迟对比")
+    incParser.add_argument("--functions", type=int, nargs="+", default=[100, 400, 1600], help="生成源码中的函数个数")
+    incParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    incParser.add_argument("--repeat", type=int, default=50, help="修改次数")
+    incParser.set_defaults(func=bench_incremental)
+
+    parallelParser = subParsers.add_parser("parallel", help="不同进程数下并行语法分析的耗时")
+    parallelParser.add_argument("--functions", type=int, default=2000, help="生成源码中的函数个数")
+    parallelParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    parallelParser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="进程数")
+    parallelParser.set_defaults(func=bench_parallel)
+
+    jsonParser = subParsers.add_parser("json", help="一次性序列化与流式JSON输出的首字节延迟与峰值内存")
+    jsonParser.add_argument("--functions", type=int, nargs="+", default=[100, 400, 1600], help="生成源码中的函数个数")
+    jsonParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    jsonParser.set_defaults(func=bench_json)
+
+    binaryParser = subParsers.add_parser("binary", help="紧凑JSON与二进制交换格式的大小与读写耗时")
+    binaryParser.add_argument("--functions", type=int, default=200, help="生成源码中的函数个数")
+    binaryParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    binaryParser.set_defaults(func=bench_binary)
+
+    analyzeParser = subParsers.add_parser("analyze", help="语义分析耗时，以及符号栈流事件日志的记录与重建开销")
+    analyzeParser.add_argument("--functions", type=int, nargs="+", default=[100, 200, 400, 1000],
+                               help="生成源码中的函数个数（每个函数约10个代码块）")
+    analyzeParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    analyzeParser.add_argument("--flow-limit", type=int, default=400, dest="flow_limit",
+                               help="不超过该函数个数时统计重建符号栈流快照的耗时")
+    analyzeParser.set_defaults(func=bench_analyze)
+
+    scopesParser = subParsers.add_parser("scopes", help="深度嵌套代码块与大量局部变量下的语义分析耗时")
+    scopesParser.add_argument("--depth", type=int, nargs="+", default=[100, 200, 400, 800], help="嵌套层数")
+    scopesParser.add_argument("--locals", type=int, default=10, help="每层定义的局部变量个数")
+    scopesParser.set_defaults(func=bench_scopes)
+
+    overloadsParser = subParsers.add_parser("overloads", help="大量函数重载与调用点下的语义分析耗时")
+    overloadsParser.add_argument("--overloads", type=int, nargs="+", default=[100, 500, 2000], help="重载个数")
+    overloadsParser.add_argument("--calls", type=int, default=10000, help="调用点个数")
+    overloadsParser.set_defaults(func=bench_overloads)
+
+    sentencesParser = subParsers.add_parser("sentences", help="语义分析结果（Sentence列表）的内存占用与IR生成耗时")
+    sentencesParser.add_argument("--functions", type=int, default=1000, help="生成源码中的函数个数")
+    sentencesParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    sentencesParser.add_argument("--repeat", type=int, default=3, help="IR生成的重复次数，取最优")
+    sentencesParser.set_defaults(func=bench_sentences)
+
+    foldParser = subParsers.add_parser("fold", help="常量折叠与代数化简前后的语义分析、IR生成耗时与产物大小")
+    foldParser.add_argument("--functions", type=int, default=500, help="生成源码中的函数个数")
+    foldParser.add_argument("--statements", type=int, default=20, help="每个函数的语句个数")
+    foldParser.add_argument("--repeat", type=int, default=3, help="重复次数，取最优")
+    foldParser.set_defaults(func=bench_fold)
+
+    threadsParser = subParsers.add_parser("threads", help="多线程并发编译，并与串行结果比对")
+    threadsParser.add_argument("--sources", type=int, default=8, help="不同源码的个数")
+    threadsParser.add_argument("--functions", type=int, default=5, help="生成源码中的函数个数（逐个源码递增）")
+    threadsParser.add_argument("--statements", type=int, default=10, help="每个函数的语句个数")
+    threadsParser.add_argument("--rounds", type=int, default=8, help="每个源码的编译次数")
+    threadsParser.add_argument("--threads", type=int, default=8, help="线程数")
+    threadsParser.set_defaults(func=bench_threads)
+
+    batchParser = subParsers.add_parser("batch", help="每个文件启动一次解释器与批量编译的吞吐量对比")
+    batchParser.add_argument("--files", type=int, default=1000, help="源文件个数")
+    batchParser.add_argument("--functions", type=int, default=3, help="每个源文件中的函数个数")
+    batchParser.add_argument("--statements", type=int, default=5, help="每个函数的语句个数")
+    batchParser.add_argument("--sample", type=int, default=50, help="逐个启动解释器编译的文件数，用于估算")
+    batchParser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4], help="批量编译的进程数")
+    batchParser.set_defaults(func=bench_batch)
+
+    startupParser = subParsers.add_parser("startup", help="以python -X importtime统计命令行冷启动的导入耗时，超出预算时失败")
+    startupParser.add_argument("--runs", type=int, default=10, help="运行次数，取中位数")
+    startupParser.add_argument("--budget", type=float, default=80,
+                               help="编译器自身的导入耗时预算（毫秒），不含解释器启动时导入的模块")
+    startupParser.add_argument("--top", type=int, default=8, help="列出耗时最多的顶层导入个数")
+    startupParser.add_argument("args", nargs="*", default=["-l"], help="传给miniC的参数，默认为-l")
+    startupParser.set_defaults(func=bench_startup)
+
+    opts = argsParser.parse_args()
+    opts.func(opts)
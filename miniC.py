@@ -7,17 +7,15 @@
 @Date ：2022/4/23 10:22
 """
 import argparse
+import contextlib
+import io
 import os
 import sys
 import json
-
-from utils.lex import Lex
-from utils.yacc import Yacc, CustomYaccEncoder, Node
-from utils.analyzer import Analyzer, CustomAnaEncoder
-from utils.ir import IRGenerator, LLVM
-from utils.optimizer import Optimizer
 from enum import Enum
 
+# 各阶段的模块在main中按目标任务导入，--connect、-l等只需要前几个阶段的调用不导入后续阶段及graphviz等依赖
+
 EXEC_ = "minic.exe" if "win" in sys.platform else "minic"
 DESC_ENG = "A miniC Compiler. if not set argument '-o', it will print the result of compiler to screen"
 DESC_CHS = "Mini C 编译器，如果不设置参数'-o'，其过程结果将会被输出至屏幕/命令行"
@@ -33,6 +31,7 @@ class OUTPUT_TARGET(Enum):
 class OUTPUT_TYPE(Enum):
     STD = 0
     JSON = 1
+    BINARY = 2
 
 
 class INPUT_TYPE(Enum):
@@ -52,22 +51,121 @@ class COMPILE_ACTION(Enum):
     COMPLEX = 7
 
 
-if __name__ == "__main__":
-    # 预设参数解析
+# 批量编译时各任务与输出格式对应的产物扩展名，其余任务输出IR
+BATCH_SUFFIXES = {
+    (COMPILE_ACTION.LEX, OUTPUT_TYPE.STD): ".tokens",
+    (COMPILE_ACTION.LEX, OUTPUT_TYPE.JSON): ".tokens.json",
+    (COMPILE_ACTION.LEX, OUTPUT_TYPE.BINARY): ".tokens.bin",
+    (COMPILE_ACTION.YACC, OUTPUT_TYPE.STD): ".gv",
+    (COMPILE_ACTION.YACC, OUTPUT_TYPE.JSON): ".ast.json",
+    (COMPILE_ACTION.YACC, OUTPUT_TYPE.BINARY): ".ast.bin",
+    (COMPILE_ACTION.ANALYZE, OUTPUT_TYPE.JSON): ".flow.json",
+    (COMPILE_ACTION.ANALYZE, OUTPUT_TYPE.BINARY): ".sentences.bin",
+    (COMPILE_ACTION.CG, OUTPUT_TYPE.STD): ".cfg.gv",
+    (COMPILE_ACTION.CG, OUTPUT_TYPE.JSON): ".cfg.gv",
+}
+BATCH_DEFAULT_SUFFIX = ".ll"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    命令行参数解析器，常驻服务也以此检查请求中的参数
+
+    :return:
+    """
     argsParser = argparse.ArgumentParser(EXEC_, description=DESC_CHS)
-    argsParser.add_argument("input", nargs="?", type=str, default=None, metavar="input")
+    argsParser.add_argument("input", nargs="*", type=str, default=[], metavar="input",
+                            help="源文件，可以给出多个文件、通配符或清单文件（@list.txt，每行一个路径），此时并行批量编译")
     argsParser.add_argument("-l", "--lex", action="store_true", default=False, dest="lex", help="词法处理")
     argsParser.add_argument("-y", "--yacc", action="store_true", default=False, dest="yacc", help="语法处理")
     argsParser.add_argument("-a", "--analyze", action="store_true", default=False, dest="analyze", help="语义处理")
     argsParser.add_argument("-c", "--cg", action="store_true", default=False, dest="cg", help="生成控制流图")
     argsParser.add_argument("-i", "--ir", action="store_true", default=False, dest="ir", help="IR生成")
     argsParser.add_argument("-j", "--json", action="store_true", default=False, dest="json", help="输出为json格式")
+    argsParser.add_argument("--compact", action="store_true", default=False, dest="compact",
+                            help="输出为无缩进的紧凑json格式（隐含-j）")
+    argsParser.add_argument("--ndjson", action="store_true", default=False, dest="ndjson",
+                            help="输出为每行一条记录的NDJSON格式（隐含-j）")
+    argsParser.add_argument("-b", "--binary", action="store_true", default=False, dest="binary",
+                            help="以二进制交换格式输出Token、语法树或Sentence列表（需配合-o）")
+    argsParser.add_argument("--no-fold", action="store_false", default=True, dest="fold",
+                            help="关闭语义分析前的常量折叠与代数化简")
+    argsParser.add_argument("--mmap", action="store_true", default=False, dest="mmap", help="以mmap方式流式读取输入文件（用于超大源文件）")
+    argsParser.add_argument("--parallel", nargs="?", type=int, const=0, default=None, dest="parallel",
+                            help="多进程并行解析各顶层定义，可指定进程数，默认为CPU核数")
+    argsParser.add_argument("--profile", nargs="?", const="", default=None, dest="profile", metavar="JSON",
+                            help="统计各语法产生式的调用次数、消耗Token数与耗时，报告输出至stderr，指定文件时写入JSON；"
+                                 "也可通过环境变量MINIC_PROFILE（值为1或JSON文件路径）开启，开启时按串行方式语法分析")
+    argsParser.add_argument("--cache", nargs="?", default=None, dest="cache", metavar="DIR",
+                            help="编译产物缓存目录，源码、编译器与参数均未改变时直接使用缓存的Token、语法树、Sentence或IR；"
+                                 "也可通过环境变量MINIC_CACHE指定")
+    argsParser.add_argument("--cache-size", type=int, default=256, dest="cache_size", metavar="MiB",
+                            help="缓存目录大小上限，超出时淘汰最久未使用的产物")
+    argsParser.add_argument("--jobs", type=int, default=None, dest="jobs",
+                            help="批量编译的进程数，默认为CPU核数")
     argsParser.add_argument("--duration", type=int, default=1.5, dest="duration", help="符号栈流输出GIF图每帧持续时间")
     argsParser.add_argument("-o", nargs="?", default=None, type=str, dest="output", help="输出文件")
     argsParser.add_argument("-v", "--version", action="version", version=f"v{VERSION}", help="版本信息")
-    opts = argsParser.parse_args()
+    argsParser.add_argument("--serve", nargs="?", const="", default=None, dest="serve", metavar="SOCKET",
+                            help="以常驻服务方式运行，监听Unix域套接字，未指定时从标准输入读取JSON-lines请求")
+    argsParser.add_argument("--connect", default=None, dest="connect", metavar="SOCKET",
+                            help="将本次编译交给指定套接字上的常驻服务执行，其余参数与直接编译相同")
+    argsParser.add_argument("--workers", type=int, default=None, dest="workers",
+                            help="常驻服务的工作进程数，默认为CPU核数")
+    argsParser.add_argument("--timeout", type=float, default=60, dest="timeout",
+                            help="常驻服务中单个请求的超时时间（秒）")
+    return argsParser
+
+
+def main(argv: list[str] = None) -> None:
+    """
+    命令行入口，各分支均以sys.exit结束
 
-    input_file = opts.input
+    :param argv: 命令行参数，默认为sys.argv[1:]
+    :return:
+    """
+    # 预设参数解析
+    argsParser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
+    opts = argsParser.parse_args(argv)
+
+    # 常驻编译服务与瘦客户端
+    if opts.serve is not None:
+        from utils.server import serve
+        serve(opts.serve or None, opts.workers, opts.timeout)
+        sys.exit(0)
+    if opts.connect is not None:
+        from utils.client import connect
+        # 去掉--connect及其参数（包括--connect=PATH与缩写形式），其余参数转发给服务
+        forward = []
+        skip = False
+        for i, arg in enumerate(argv):
+            name = arg.partition("=")[0]
+            if skip:
+                skip = False
+            elif arg == "--":
+                forward += argv[i:]
+                break
+            elif len(name) > 2 and "--connect".startswith(name):
+                skip = name == arg
+            else:
+                forward.append(arg)
+        sys.exit(connect(opts.connect, forward))
+
+    from utils.lex import Lex, MmapLex, TokenBuffer
+    from utils.jsonstream import JsonStyle, dump_tokens, dump_ast, dump_stack_flow
+
+    # 单个已存在的输入文件无需展开通配符与清单文件，不导入批量编译模块
+    if len(opts.input) == 1 and os.path.exists(opts.input[0]):
+        inputs, batch = opts.input, False
+    else:
+        from utils.batch import expand_inputs
+        try:
+            inputs, batch = expand_inputs(opts.input)
+        except OSError as e:
+            argsParser.error(str(e))
+            sys.exit(4)
+    input_file = inputs[0] if inputs else None
     output_file = opts.output
     gif_duration = opts.duration
 
@@ -75,14 +173,17 @@ if __name__ == "__main__":
     if input_file is None:
         argsParser.error("no input file")
         sys.exit(1)
-    if not os.path.exists(input_file):
+    if not batch and not os.path.exists(input_file):
         argsParser.error(f"{input_file} not exist!")
         sys.exit(2)
 
     # 执行过程控制变量
     task = COMPILE_ACTION.NONE
     output_dest = OUTPUT_TARGET.STDOUT if output_file is None else OUTPUT_TARGET.FILE
-    output_type = OUTPUT_TYPE.STD if not opts.json else OUTPUT_TYPE.JSON
+    output_type = OUTPUT_TYPE.JSON if opts.json or opts.compact or opts.ndjson else OUTPUT_TYPE.STD
+    json_style = JsonStyle.NDJSON if opts.ndjson else JsonStyle.COMPACT if opts.compact else JsonStyle.INDENT
+    # 非NDJSON格式输出到屏幕时补一个换行
+    json_newline = "" if json_style == JsonStyle.NDJSON else "\n"
 
     # 任务选择
     if opts.lex:
@@ -102,31 +203,82 @@ if __name__ == "__main__":
         argsParser.error("too many action args")
         sys.exit(3)
 
+    # 二进制格式仅用于词法、语法与语义分析结果
+    if opts.binary:
+        if output_type == OUTPUT_TYPE.JSON:
+            argsParser.error("'-b' can't be used with json output")
+            sys.exit(3)
+        if task not in (COMPILE_ACTION.LEX, COMPILE_ACTION.YACC, COMPILE_ACTION.ANALYZE):
+            argsParser.error("'-b' only works with '-l', '-y' or '-a'")
+            sys.exit(3)
+        if output_dest == OUTPUT_TARGET.STDOUT:
+            argsParser.error("'-b' requires an output file, please set arg '-o'")
+            sys.exit(3)
+        output_type = OUTPUT_TYPE.BINARY
+
+    # 批量编译，-o为输出目录，各文件的产物写入其中
+    if batch:
+        if output_dest == OUTPUT_TARGET.STDOUT:
+            argsParser.error("multiple inputs require an output directory, please set arg '-o'")
+            sys.exit(3)
+        if task == COMPILE_ACTION.ANALYZE and output_type == OUTPUT_TYPE.STD:
+            argsParser.error("'-a' with multiple inputs requires '-j' or '-b'")
+            sys.exit(3)
+        from utils.batch import compile_batch, forward_args
+        suffix = BATCH_SUFFIXES.get((task, output_type), BATCH_DEFAULT_SUFFIX)
+        # 生成控制流图成功时以99退出
+        success = 99 if task == COMPILE_ACTION.CG else 0
+        sys.exit(compile_batch(inputs, forward_args(argv, opts.input), output_file, suffix, opts.jobs, success))
+
     # 文件读入
     input_stream = ""
-    try:
-        with open(input_file, "r", encoding="UTF-8") as f:
-            input_stream = f.read()
-    except Exception as e:
-        argsParser.error(str(e))
-        sys.exit(4)
+    if not opts.mmap:
+        try:
+            with open(input_file, "r", encoding="UTF-8") as f:
+                input_stream = f.read()
+        except Exception as e:
+            argsParser.error(str(e))
+            sys.exit(4)
+
+    # 编译产物缓存
+    cache = None
+    cache_dir = opts.cache if opts.cache is not None else os.environ.get("MINIC_CACHE")
+    if cache_dir:
+        from utils.cache import ArtifactCache
+        from utils.ir import LLVM
+        cache = ArtifactCache(cache_dir, opts.cache_size * 2 ** 20, version=str(VERSION))
+        # mmap方式按字节流扫描，非ASCII输入的Token与字符串方式不同，词法分析方式也计入键
+        lexer = "mmap" if opts.mmap else "str"
+        cache_key = cache.key(input_file, flags=f"ir={LLVM.__name__},fold={opts.fold},lex={lexer}")
+    if cache is not None or output_type == OUTPUT_TYPE.BINARY:
+        from utils import binary
 
     # 词法处理
     curr_task = COMPILE_ACTION.LEX
-    ll = Lex(input_stream)
+    ll = MmapLex(input_file) if opts.mmap else Lex(input_stream)
     tokens = ll.get_token()
 
     # 如果目标任务为词法分析
     if curr_task.value >= task.value:
+        if cache is not None:
+            hit = cache.load(cache_key, "tokens", binary.load_tokens)
+            if hit is None:
+                tokens = ll.get_buffer()
+                cache.store(cache_key, "tokens", binary.dump_tokens, tokens)
+            else:
+                tokens = hit[0]
         # 输出格式为JSON
         if output_type == OUTPUT_TYPE.JSON:
-            jsonify_tokens = json.dumps(
-                {'tokens': [{"type": i.type, "value": i.value, "line": i.line} for i in tokens]}, indent=4)
+            # 逐个Token编码并直接写出，不在内存中拼接完整的JSON
             if output_dest == OUTPUT_TARGET.STDOUT:
-                print(jsonify_tokens)
+                dump_tokens(tokens, sys.stdout, json_style)
+                sys.stdout.write(json_newline)
             else:
                 with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(jsonify_tokens)
+                    dump_tokens(tokens, f, json_style)
+        elif output_type == OUTPUT_TYPE.BINARY:
+            with open(output_file, "wb") as f:
+                binary.dump_tokens(tokens, f)
         else:
             if output_dest == OUTPUT_TARGET.STDOUT:
                 for i in tokens:
@@ -137,76 +289,147 @@ if __name__ == "__main__":
                         f.write(str(i) + '\n')
         sys.exit(0)
 
+    # 缓存命中时从目标任务所需的最后一个阶段继续，并原样输出该阶段之前产生的屏幕输出
+    ast = res = ir = None
+    analyze_output = ""
+    if cache is not None:
+        hit = None
+        if task.value >= COMPILE_ACTION.IR.value:
+            hit = cache.load(cache_key, "ir", lambda f: json.load(f))
+            if hit is not None:
+                ir = hit[0]
+        if hit is None and task.value >= COMPILE_ACTION.CG.value:
+            hit = cache.load(cache_key, "sentences", binary.load_sentences)
+            if hit is not None:
+                res, analyze_output = hit
+        if hit is None:
+            hit = cache.load(cache_key, "ast", binary.load_ast)
+            if hit is not None:
+                ast = hit[0]
+        if hit is not None:
+            sys.stdout.write(hit[1])
+
     # 语法分析
     curr_task = COMPILE_ACTION.YACC
-    yy = Yacc(tokens)
-    yy.parser()
-    json_ast = {"root": yy.ast}  # 该AST原生格式为JSON格式
-    gv_ast = yy.graph.source
-    render = yy.graph.render
+    from utils.yacc import Yacc
+    if ast is None and res is None and ir is None:
+        profile = opts.profile if opts.profile is not None else os.environ.get("MINIC_PROFILE")
+        buffer = None
+        if cache is not None:
+            hit = cache.load(cache_key, "tokens", binary.load_tokens)
+            if hit is None:
+                buffer = ll.get_buffer()
+                cache.store(cache_key, "tokens", binary.dump_tokens, buffer)
+            else:
+                buffer = hit[0]
+        else:
+            buffer = ll.get_buffer()
+        # 并行分析需要TokenBuffer，从缓存读入的Token列表按串行方式分析
+        if opts.parallel is None or profile is not None or not isinstance(buffer, TokenBuffer):
+            yy = Yacc(buffer)
+            profiler = None
+            if profile is not None:
+                from utils.profiler import ProductionProfiler
+                profiler = ProductionProfiler()
+                profiler.instrument(yy)
+            yy.parser()
+            ast, diagnostics = yy.ast, yy.diagnostics
+            if profiler is not None:
+                if profile in ("", "1"):
+                    profiler.report(sys.stderr)
+                else:
+                    profiler.dump(profile)
+        else:
+            from utils.parallel import parse_parallel
+            ast, diagnostics = parse_parallel(buffer, opts.parallel or None)
+
+        # 错误恢复后一次输出全部语法错误
+        if diagnostics:
+            for i in diagnostics:
+                print(i)
+            sys.exit(77)
+        if cache is not None:
+            cache.store(cache_key, "ast", binary.dump_ast, ast)
 
     # 如果目标任务为语法分析
     if curr_task.value >= task.value:
         # 输出格式为JSON
         if output_type == OUTPUT_TYPE.JSON:
-            jsonify_ast = json.dumps(json_ast, cls=CustomYaccEncoder, indent=4)
+            # 该AST原生格式为JSON格式
             if output_dest == OUTPUT_TARGET.STDOUT:
-                print(jsonify_ast)
+                dump_ast(ast, sys.stdout, json_style)
+                sys.stdout.write(json_newline)
             else:
                 with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(jsonify_ast)
+                    dump_ast(ast, f, json_style)
+        elif output_type == OUTPUT_TYPE.BINARY:
+            with open(output_file, "wb") as f:
+                binary.dump_ast(ast, f)
         else:
+            # gv图仅在此时由AST生成
+            from utils.dot import DotGenerator
+            dot = DotGenerator(ast)
             if output_dest == OUTPUT_TARGET.STDOUT:
-                print(gv_ast)
+                dot.write(sys.stdout)
             else:
-                render(f'{output_file}', format='png')
                 with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(gv_ast)
+                    dot.write(f)
+                dot.render(output_file, 'png')
         sys.exit(0)
 
     # 语义分析
     curr_task = COMPILE_ACTION.ANALYZE
-    aa = Analyzer(yy.ast)
-    res = aa.analysis()
-    variable_stack_flow, function_stack_flow = aa.get_stack_flow()
-
-    if aa.error:
-        sys.exit(88)
-
-    json_VSF = {}
-    json_FSF = {}
-    for i in range(len(variable_stack_flow)):
-        json_VSF[i] = variable_stack_flow[i]
-    for i in range(len(function_stack_flow)):
-        json_FSF[i] = function_stack_flow[i]
-    json_SF = {
-        "VSF": json_VSF,
-        "FSF": json_FSF
-    }
+    from utils.analyzer import Analyzer, CustomAnaEncoder
+    if res is None and ir is None:
+        if opts.fold:
+            from utils.fold import fold_constants
+            ast = fold_constants(ast)
+        # 启用缓存时记录语义分析的屏幕输出，随Sentence列表一并缓存
+        analyze_log = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(analyze_log) if cache is not None else contextlib.nullcontext():
+                # 符号栈流只用于语义分析的输出，生成IR与控制流图时不记录
+                aa = Analyzer(ast, record_stack_flow=task == COMPILE_ACTION.ANALYZE)
+                res = aa.analysis()
+        finally:
+            analyze_output = analyze_log.getvalue()
+            sys.stdout.write(analyze_output)
+
+        if aa.error:
+            sys.exit(88)
+        if cache is not None:
+            cache.store(cache_key, "sentences", binary.dump_sentences, res, analyze_output)
 
     if curr_task.value >= task.value:
         # 输出格式为JSON
         if output_type == OUTPUT_TYPE.JSON:
-            jsonify_SF = json.dumps(json_SF, cls=CustomAnaEncoder, indent=4)
+            # 符号栈流由事件日志重建，只在输出时构造
+            variable_stack_flow, function_stack_flow = aa.get_stack_flow()
             if output_dest == OUTPUT_TARGET.STDOUT:
                 print("[WARN ] We don't recommend that try to print Symbol Stack Flow to screen")
-                print(jsonify_SF)
+                dump_stack_flow(variable_stack_flow, function_stack_flow, sys.stdout, json_style)
+                sys.stdout.write(json_newline)
             else:
                 with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(jsonify_SF)
+                    dump_stack_flow(variable_stack_flow, function_stack_flow, f, json_style)
+        elif output_type == OUTPUT_TYPE.BINARY:
+            # 二进制格式输出语义分析结果（Sentence列表），供后续IR生成使用
+            with open(output_file, "wb") as f:
+                binary.dump_sentences(res, f)
         else:
             if output_dest == OUTPUT_TARGET.STDOUT:
                 print("[ERROR] The Symbol Stack Flow can't be printed to screen without jsonify, please use set arg '-j' to implement jsonify")
             else:
                 try:
                     from utils.gif import GifGenerator
+                    variable_stack_flow, function_stack_flow = aa.get_stack_flow()
                     frames = []
-                    for key, value in json_VSF.items():
+                    for value in variable_stack_flow:
                         texts = [json.dumps(i, indent=4, cls=CustomAnaEncoder) for i in value]
                         frames.append(GifGenerator.text2png(texts, 8, 15))
                     GifGenerator.png2gif(frames, "VSF.gif", duration=gif_duration)
                     frames = []
-                    for key, value in json_FSF.items():
+                    for value in function_stack_flow:
                         texts = [json.dumps(i, indent=4, cls=CustomAnaEncoder) for i in value]
                         frames.append(GifGenerator.text2png(texts, 8, 15))
                     GifGenerator.png2gif(frames, "FSF.gif", duration=gif_duration)
@@ -215,6 +438,7 @@ if __name__ == "__main__":
         sys.exit(0)
 
     if task == COMPILE_ACTION.CG:
+        from utils.optimizer import Optimizer
         o = Optimizer(res)
         cg, render = o.get_control_graph()
         if output_dest == OUTPUT_TARGET.STDOUT:
@@ -227,11 +451,21 @@ if __name__ == "__main__":
 
     # IR生成
     curr_task = COMPILE_ACTION.IR
-    ii = IRGenerator(res, ir=LLVM)
-    ir = ii.get_ir()
+    from utils.ir import IRGenerator, LLVM
+    if ir is None:
+        ir_log = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(ir_log) if cache is not None else contextlib.nullcontext():
+                ii = IRGenerator(res, ir=LLVM)
+                ir = ii.get_ir()
+        finally:
+            sys.stdout.write(ir_log.getvalue())
 
-    if ii.ir.error:
-        sys.exit(99)
+        if ii.ir.error:
+            sys.exit(99)
+        if cache is not None:
+            # 命中时需依次输出语义分析与IR生成两个阶段的屏幕输出
+            cache.put(cache_key, "ir", json.dumps(ir).encode("utf-8"), analyze_output + ir_log.getvalue())
 
     if output_type == OUTPUT_TYPE.JSON:
         print("[ERROR] IR can't be transformed to json")
@@ -244,3 +478,7 @@ if __name__ == "__main__":
                 for i in ir:
                     f.write(f"{i}\n")
     sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,14 @@
 """
 
 import sys
-import copy
 
 from enum import Enum
 from json import JSONEncoder
+from collections.abc import Iterable, Iterator
 from typing import Union, Any, Optional
 
-from utils.yacc import Node, NodeType
+from utils.lex import SYMBOLS
+from utils.yacc import Node, NodeType, InfoView
 
 GLOBAL = "@"
 OTHER = "%"
@@ -52,6 +53,23 @@ class Sentence_Type(Enum):
     PHI = 32
 
 
+# binary expression node -> (sentence type, bit width of the evaluated value)
+BINARY_SENTENCES = {
+    NodeType.PLUS: (Sentence_Type.ADD, 32),
+    NodeType.MINUS: (Sentence_Type.MINUS, 32),
+    NodeType.TIMES: (Sentence_Type.TIMES, 32),
+    NodeType.DIVIDE: (Sentence_Type.DIVIDE, 32),
+    NodeType.MOD: (Sentence_Type.MOD, 32),
+    NodeType.EQ: (Sentence_Type.EQ, 1),
+    NodeType.NEQ: (Sentence_Type.NEQ, 1),
+    NodeType.GT: (Sentence_Type.GT, 1),
+    NodeType.GEQ: (Sentence_Type.GEQ, 1),
+    NodeType.LT: (Sentence_Type.LT, 1),
+    NodeType.LEQ: (Sentence_Type.LEQ, 1),
+    NodeType.NOT: (Sentence_Type.NOT, 32),
+}
+
+
 class Reg_Type:
     INT_REG = "int"
     VOID_REG = "void"
@@ -60,65 +78,135 @@ class Reg_Type:
 
 class CustomAnaEncoder(JSONEncoder):
     """
-    For Class Sentence and Class Symbol
+    For Class Sentence, Class Operand and Class Symbol
     """
 
     def default(self, o: Any) -> Any:
-        if isinstance(o, Sentence):
-            return o.__json__()
-        elif isinstance(o, Symbol):
+        if isinstance(o, (Sentence, Operand, Symbol)):
             return o.__json__()
 
 
+class Operand:
+    """
+    A value used by a Sentence, replaces the old operand dicts.
+
+    Attributes a subclass doesn't have read as None, so IRGenerator can probe
+    any operand the way it probed the dicts with .get()
+    """
+    __slots__ = ('type', 'size')
+    # keys of the old operand dict in order, used by __json__
+    fields: tuple[str, ...] = ()
+    reg = None
+    value = None
+    dimension = None
+    define_dime = None
+
+    def __repr__(self) -> str:
+        return repr(self.__json__())
+
+    def __json__(self) -> dict:
+        return {name: getattr(self, name) for name in self.fields}
+
+
+class Reg(Operand):
+    """
+    A register: temporary value, function result or scalar variable definition
+    """
+    __slots__ = ('reg',)
+    fields = ('type', 'reg', 'size')
+
+    def __init__(self, reg_type: Optional[str], reg: Optional[str], size: Optional[int]):
+        self.type = reg_type
+        self.reg = reg
+        self.size = size
+
+
+class Const(Operand):
+    """
+    An integer literal
+    """
+    __slots__ = ('value',)
+    fields = ('type', 'value', 'size')
+
+    def __init__(self, value: Union[str, int], size: int = 32):
+        self.type = "num"
+        self.value = value
+        self.size = size
+
+
+class ArrayRef(Operand):
+    """
+    A named variable or array.
+
+    dimension is the list of index operands of an array element, None for the whole variable,
+    or the number of dimensions of an array definition; define_dime is the defined length of each dimension
+    """
+    __slots__ = ('reg', 'dimension', 'define_dime')
+    fields = ('type', 'reg', 'size', 'dimension', 'define_dime')
+
+    def __init__(self, reg_type: Optional[str], reg: Optional[str], size: Optional[int],
+                 dimension: Union[list[Operand], int, None] = None, define_dime: Optional[list] = None):
+        self.type = reg_type
+        self.reg = reg
+        self.size = size
+        self.dimension = dimension
+        self.define_dime = define_dime
+
+
+# key order of Operation.info, the same order the old info dicts were filled in, keeps JSON output unchanged
+OPERANDS_LRA = ('lvar', 'rvar', 'avar')
+OPERANDS_ALR = ('avar', 'lvar', 'rvar')
+OPERANDS_LAR = ('lvar', 'avar', 'rvar')
+OPERANDS_RA = ('rvar', 'avar')
+
+
 class Sentence:
     """
     To Storage Analyze Result
     The format of result closes to IR
+
+    Sentence itself is used for FUNC_END, other sentence types use the subclasses below.
+    Sentence.info is a read-only view of the old info dict, see yacc.InfoView
     """
+    __slots__ = ('sentence_type', 'lineno', 'value', 'label', 'reg')
+    # all fields including the ones of base classes, used by binary serialization
+    fields: tuple[str, ...] = __slots__
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = cls.__base__.fields + cls.__dict__.get('__slots__', ())
 
     def __init__(self,
                  sentence_type: Sentence_Type,
                  lineno: int,
                  value: str = "",
                  label: str = None,
-                 reg: str = None,
-                 info: dict = None):
-        if info is None:
-            info = {}
+                 reg: str = None):
         self.sentence_type = sentence_type
         self.lineno = lineno
         self.value = value
         self.label = label
         self.reg = reg
-        self.info = info
+
+    @property
+    def info(self) -> InfoView:
+        return InfoView(self)
+
+    def info_items(self) -> Iterator[tuple[str, Any]]:
+        """
+        (key, value) pairs of the old info dict in order
+        """
+        return iter(())
+
+    def operands_repr(self) -> str:
+        return ""
 
     def __repr__(self) -> str:
         if self.label:
             base = f"{self.label}:\t({self.sentence_type.name}, "
         else:
             base = f"\t({self.sentence_type.name}, "
-        if self.sentence_type is Sentence_Type.JMP:
-            base += f"label {self.info['label']})"
-        elif self.sentence_type is Sentence_Type.IF_JMP:
-            base += f"{self.info['var']['reg']}, label {self.info['tl']}, label {self.info['fl']})"
-        elif self.sentence_type in [Sentence_Type.DEFINE_LOCAL_VAR, Sentence_Type.DEFINE_LOCAL_ARRAY]:
-            base += f"i{self.info['size']}, {self.info['reg']})"
-        elif self.sentence_type is Sentence_Type.CALL:
-            base += f"{self.info['func_type']} {self.info['func']}() )"
-        elif self.sentence_type in [Sentence_Type.ZEXT, Sentence_Type.LOAD, Sentence_Type.ASSIGN]:
-            aval = self.info['avar']['reg']
-            rval = self.info['rvar'].get('reg') if self.info['rvar'].get('reg') else self.info['rvar'].get('value')
-            base += f"-, {rval}, {aval})"
-        elif self.sentence_type is Sentence_Type.RETURN:
-            regt = self.info['return_reg']
-            ret_v = regt.get('reg') if regt.get('reg') else regt.get('value')
-            base += f"{ret_v})"
-        else:
-            aval = self.info['avar']['reg']
-            lval = self.info['lvar'].get('reg') if self.info['lvar'].get('reg') else self.info['lvar'].get('value')
-            rval = self.info['rvar'].get('reg') if self.info['rvar'].get('reg') else self.info['rvar'].get('value')
-            base += f"{lval}, {rval}, {aval})"
-        return base
+        return base + self.operands_repr() + ")"
 
     def __json__(self) -> dict:
         return {
@@ -127,10 +215,155 @@ class Sentence:
             "value": self.value,
             "label": self.label,
             "reg": self.reg,
-            "info": self.info
+            "info": dict(self.info_items())
         }
 
 
+class Jump(Sentence):
+    """
+    JMP, target is the destination label
+    """
+    __slots__ = ('target',)
+
+    def __init__(self, lineno: int, target: str = None):
+        super().__init__(Sentence_Type.JMP, lineno)
+        self.target = target
+
+    def info_items(self):
+        yield 'label', self.target
+
+    def operands_repr(self) -> str:
+        return f"label {self.target}"
+
+
+class Branch(Sentence):
+    """
+    IF_JMP, jump to tl if var is true else fl
+    """
+    __slots__ = ('var', 'tl', 'fl')
+
+    def __init__(self, lineno: int, var: Operand, tl: str, fl: str):
+        super().__init__(Sentence_Type.IF_JMP, lineno)
+        self.var = var
+        self.tl = tl
+        self.fl = fl
+
+    def info_items(self):
+        yield 'var', self.var
+        yield 'tl', self.tl
+        yield 'fl', self.fl
+
+    def operands_repr(self) -> str:
+        return f"{self.var.reg}, label {self.tl}, label {self.fl}"
+
+
+class VarDefine(Sentence):
+    """
+    DEFINE_LOCAL_VAR, DEFINE_GLOBAL_VAR, DEFINE_LOCAL_ARRAY and DEFINE_GLOBAL_ARRAY,
+    var is the defined storage and info is the fields of var
+    """
+    __slots__ = ('var',)
+
+    def __init__(self, sentence_type: Sentence_Type, lineno: int, var: Operand, value: str = "", reg: str = None):
+        super().__init__(sentence_type, lineno, value=value, reg=reg)
+        self.var = var
+
+    def info_items(self):
+        return iter(self.var.__json__().items())
+
+    def operands_repr(self) -> str:
+        return f"i{self.var.size}, {self.var.reg}"
+
+
+class FuncDefine(Sentence):
+    """
+    DEFINE_FUNC, paras are the VarDefine sentences of parameters
+    """
+    __slots__ = ('func_type', 'paras')
+
+    def __init__(self, lineno: int, value: str, func_type: str, paras: list[VarDefine] = None):
+        super().__init__(Sentence_Type.DEFINE_FUNC, lineno, value=value)
+        self.func_type = func_type
+        self.paras = [] if paras is None else paras
+
+    def info_items(self):
+        yield 'type', self.func_type
+        yield 'paras', self.paras
+
+    def operands_repr(self) -> str:
+        return f"{self.func_type} {self.value}"
+
+
+class FuncCall(Sentence):
+    """
+    CALL, avar receives the result and is None for void functions
+    """
+    __slots__ = ('func', 'args', 'avar', 'func_type')
+
+    def __init__(self, lineno: int, func: str, args: list[Operand], func_type: str, avar: Operand = None):
+        super().__init__(Sentence_Type.CALL, lineno, value=func)
+        self.func = func
+        self.args = args
+        self.avar = avar
+        self.func_type = func_type
+
+    def info_items(self):
+        yield 'func', self.func
+        yield 'args', self.args
+        if self.avar is not None:
+            yield 'avar', self.avar
+        yield 'func_type', self.func_type
+
+    def operands_repr(self) -> str:
+        return f"{self.func_type} {self.func}() "
+
+
+class FuncReturn(Sentence):
+    """
+    RETURN, return_reg is None for void functions
+    """
+    __slots__ = ('return_reg',)
+
+    def __init__(self, lineno: int, return_reg: Optional[Operand]):
+        super().__init__(Sentence_Type.RETURN, lineno)
+        self.return_reg = return_reg
+
+    def info_items(self):
+        yield 'return_reg', self.return_reg
+
+    def operands_repr(self) -> str:
+        ret = self.return_reg
+        return f"{None if ret is None else ret.reg if ret.reg else ret.value}"
+
+
+class Operation(Sentence):
+    """
+    Three-address sentences: ASSIGN, LOAD, ZEXT, arithmetic, comparison and XOR.
+    avar is the evaluated value, lvar and rvar are the operands; layout is the key order of info
+    """
+    __slots__ = ('avar', 'lvar', 'rvar', 'layout')
+
+    def __init__(self, sentence_type: Sentence_Type, lineno: int, avar: Operand = None, lvar: Operand = None,
+                 rvar: Operand = None, layout: tuple[str, ...] = OPERANDS_LRA):
+        super().__init__(sentence_type, lineno)
+        self.avar = avar
+        self.lvar = lvar
+        self.rvar = rvar
+        self.layout = layout
+
+    def info_items(self):
+        for name in self.layout:
+            yield name, getattr(self, name)
+
+    def operands_repr(self) -> str:
+        if self.sentence_type in (Sentence_Type.ZEXT, Sentence_Type.LOAD, Sentence_Type.ASSIGN):
+            rval = self.rvar.reg if self.rvar.reg else self.rvar.value
+            return f"-, {rval}, {self.avar.reg}"
+        lval = self.lvar.reg if self.lvar.reg else self.lvar.value
+        rval = self.rvar.reg if self.rvar.reg else self.rvar.value
+        return f"{lval}, {rval}, {self.avar.reg}"
+
+
 class Symbol:
     def __init__(self,
                  value: str,
@@ -143,8 +376,11 @@ class Symbol:
                  def_from: str = "define",
                  func_paras: list = None,
                  func_entry: str = None,
-                 func_leave: str = None):
+                 func_leave: str = None,
+                 symbol: int = None):
         self.value = value
+        # interned id of the (unmangled) name, used as key of symbol tables
+        self.symbol = SYMBOLS.intern(value) if symbol is None else symbol
         self.symbol_type = symbol_type
         self.reg = reg
         self.size = size
@@ -174,49 +410,106 @@ class Symbol:
         }
 
 
-PRE_DEFINE_FUNC = {
-    "getint": [Symbol("getint", symbol_type='int func', func_paras=[])],
-    "getch": [Symbol('getch', symbol_type='int func', func_paras=[])],
-    "getarray": [Symbol('getarray', symbol_type='int func',
-                       func_paras=[{'type': 'int array', 'value': 'a', 'size': 32, 'dimension': [None]}])],
-    "putint": [Symbol('putint', symbol_type='void func',
-                     func_paras=[{'type': 'int var', 'value': 'k', 'size': 32}])],
-    "putch": [Symbol('putch', symbol_type='void func',
-                    func_paras=[{'type': 'int var', 'value': 'c', 'size': 32}])],
-    "putarray": [Symbol('putarray', symbol_type='void func',
-                       func_paras=[{'type': 'int var', 'value': 'n', 'size': 32},
-                                   {'type': 'int array', 'value': 'd', 'size': 32, 'dimension': [None]}])],
-}
+# symbol tables are keyed on interned ids, see lex.StringTable
+RETG = SYMBOLS.intern("retg")
+
+# overloads after the first one are named <name>.<n>, n counts from 1 in definition order
+# '.' never appears in miniC identifiers, so mangled names can't clash with user functions
+# and are emitted by IRGenerator as valid LLVM global names without quoting
+OVERLOAD_SEPARATOR = "."
+
+
+def mangle(name: str, index: int) -> str:
+    """
+    name of the index-th overload of a function
+
+    :param name: function name
+    :param index: 0 for the first definition
+    :return:
+    """
+    return name if index == 0 else f"{name}{OVERLOAD_SEPARATOR}{index}"
+
+
+def call_signature(symbol: int, sizes: Iterable[Optional[int]]) -> tuple:
+    """
+    key used to resolve a call: name and the size of every argument (arity is implied)
+    """
+    return symbol, tuple(sizes)
+
+
+def para_sizes(sym: Symbol) -> Iterator[int]:
+    """
+    sizes of the parameters of a function symbol, matched against call_signature
+    """
+    return (i['size'] for i in sym.func_paras)
+
+
+def define_signature(sym: Symbol) -> tuple:
+    """
+    key used to detect redefinition: name, return type and the type of every parameter
+    """
+    return sym.symbol, sym.symbol_type, tuple(i['type'] for i in sym.func_paras)
+
+
+PRE_DEFINE_FUNC = {i.symbol: [i] for i in (
+    Symbol("getint", symbol_type='int func', func_paras=[]),
+    Symbol('getch', symbol_type='int func', func_paras=[]),
+    Symbol('getarray', symbol_type='int func',
+           func_paras=[{'type': 'int array', 'value': 'a', 'size': 32, 'dimension': [None]}]),
+    Symbol('putint', symbol_type='void func',
+           func_paras=[{'type': 'int var', 'value': 'k', 'size': 32}]),
+    Symbol('putch', symbol_type='void func',
+           func_paras=[{'type': 'int var', 'value': 'c', 'size': 32}]),
+    Symbol('putarray', symbol_type='void func',
+           func_paras=[{'type': 'int var', 'value': 'n', 'size': 32},
+                       {'type': 'int array', 'value': 'd', 'size': 32, 'dimension': [None]}]),
+)}
+
+# scope events recorded for get_stack_flow, each event is (op, symbol, Symbol)
+# symbols are never modified after they are inserted, so the log keeps references instead of copies
+FLOW_SNAPSHOT = 0
+FLOW_ENTER = 1
+FLOW_LEAVE = 2
+FLOW_VAR = 3
+FLOW_FUNC = 4
 
 
 class Analyzer:
 
-    def __init__(self, ast: Node):
+    def __init__(self, ast: Node, record_stack_flow: bool = True):
         """
         Excepted get a Node of yacc.Yacc.ast
 
         :param ast: An AST
+        :param record_stack_flow: record scope changes for get_stack_flow, not needed to generate IR
         """
         self.__ast: Node = ast
-        # each element is a dict that contains block_id and variable_definition
-        self.__variable_stack: list[dict[str:Symbol]] = []
-        self.__curr_var_table: dict[str:Symbol] = {}
-        # key is function name and value is a dict that contains return type, parameters and entry label
-        self.__function_table: dict[str:list[Symbol]] = {}
-        self.__function_table.update(PRE_DEFINE_FUNC)
+        # scope chain: interned name -> stack of (scope depth, Symbol), the innermost definition is the last one
+        self.__bindings: dict[int, list[tuple[int, Symbol]]] = {}
+        # names introduced by each open scope, popped from __bindings when the scope is left
+        self.__scope_names: list[list[int]] = []
+        # key is interned function name and value is a list of overloads
+        # overload lists are copied so that user definitions never leak into PRE_DEFINE_FUNC
+        self.__function_table: dict[int:list[Symbol]] = {k: list(v) for k, v in PRE_DEFINE_FUNC.items()}
+        # call signature -> first overload accepting it, define signature -> overload
+        self.__call_index: dict[tuple, Symbol] = {}
+        self.__define_index: dict[tuple, Symbol] = {}
+        for funcs in self.__function_table.values():
+            for i in funcs:
+                self.__call_index.setdefault(call_signature(i.symbol, para_sizes(i)), i)
+                self.__define_index[define_signature(i)] = i
         # jump control label
         self.__last_label: str = None
         self.__condition_entry: str = None
         self.__block_leave: str = None
         self.__func_ret: str = None
-        self.__return_reg: dict = None
+        self.__return_reg: Optional[Reg] = None
         #
         self.__result: list[Sentence] = []
         self.__reg_counter: int = 0
         self.__label_counter: int = 0
-        # create a stack change flow
-        self.__var_stack_flow = []
-        self.__fun_stack_flow = []
+        # append-only log of scope changes, replayed by get_stack_flow
+        self.__flow_events: Optional[list[tuple]] = [] if record_stack_flow else None
         self.error = False
 
     def analysis(self) -> list[Sentence]:
@@ -228,20 +521,21 @@ class Analyzer:
         if self.__ast.node_type != NodeType.ROOT:
             self.__error(f"Excepted AST start with ROOT, Found {self.__ast.node_type.value}", 0)
             sys.exit(9009)
-        program: list[Node] = self.__ast.info['program']
-        self.__variable_stack.append(self.__curr_var_table)
+        program: list[Node] = self.__ast.program
+        self.__scope_names.append([])
+        self.__record(FLOW_ENTER)
         for i in program:
             if i.node_type is NodeType.INT_VAR:
                 sent, symb = self.__a_define_var(i)
-                sent.info['reg'] = sent.info['reg'].replace("%", "@")
-                symb.reg = sent.info['reg']
+                sent.var.reg = sent.var.reg.replace("%", "@")
+                symb.reg = sent.var.reg
                 sent.sentence_type = Sentence_Type.DEFINE_GLOBAL_VAR
                 self.__insert_var_table(symb)
                 self.__result.append(sent)
             elif i.node_type is NodeType.INT_ARRAY:
                 sent, symb = self.__a_define_array(i)
-                sent.info['reg'] = sent.info['reg'].replace("%", "@")
-                symb.reg = sent.info['reg']
+                sent.var.reg = sent.var.reg.replace("%", "@")
+                symb.reg = sent.var.reg
                 sent.sentence_type = Sentence_Type.DEFINE_GLOBAL_ARRAY
                 self.__insert_var_table(symb)
                 self.__result.append(sent)
@@ -250,7 +544,37 @@ class Analyzer:
         return self.__result
 
     def get_stack_flow(self) -> tuple[list, list]:
-        return self.__var_stack_flow, self.__fun_stack_flow
+        """
+        snapshots of variable stack and function table taken at every block entry and exit,
+        rebuilt by replaying the scope event log, keys are converted back to spelling
+
+        :return:
+        """
+        if self.__flow_events is None:
+            raise RuntimeError("stack flow was not recorded, create Analyzer with record_stack_flow=True")
+        spelling = SYMBOLS.spelling
+        variable_stack: list[dict[str, Symbol]] = []
+        function_table: dict[str, list[Symbol]] = {spelling(k): list(v) for k, v in PRE_DEFINE_FUNC.items()}
+        var_stack_flow = []
+        fun_stack_flow = []
+        for op, symbol, sym in self.__flow_events:
+            if op == FLOW_VAR:
+                variable_stack[-1][spelling(symbol)] = sym
+            elif op == FLOW_SNAPSHOT:
+                var_stack_flow.append([dict(table) for table in variable_stack])
+                fun_stack_flow.append({k: list(v) for k, v in function_table.items()})
+            elif op == FLOW_ENTER:
+                variable_stack.append({})
+            elif op == FLOW_LEAVE:
+                if variable_stack:
+                    variable_stack.pop()
+            else:
+                function_table.setdefault(spelling(symbol), []).append(sym)
+        return var_stack_flow, fun_stack_flow
+
+    def __record(self, op: int, sym: Symbol = None) -> None:
+        if self.__flow_events is not None:
+            self.__flow_events.append((op, -1 if sym is None else sym.symbol, sym))
 
     def __error(self, msg: str, lineno: int):
         """
@@ -290,14 +614,15 @@ class Analyzer:
         self.__label_counter += 1
         return f"{label_prefix}{self.__label_counter}"
 
-    def __set_reg(self, target_name: str, is_global: bool = False) -> str:
+    def __set_reg(self, target_name: str, symbol: int, is_global: bool = False) -> str:
         """
         get a reg name, follow the format definition of LLVM
 
         :param target_name: reg base name
+        :param symbol: interned id of target_name
         :return: return a reg
         """
-        check = self.__check_name(target_name)
+        check = self.__check_name(symbol)
         prefix = OTHER if not is_global else GLOBAL
         prefix += "aa"
         if check < 0:
@@ -312,86 +637,50 @@ class Analyzer:
         :param var_node:
         :return:
         """
-        var = self.__curr_var_table.get(var_node.value)
-        if var is None:
-            for i in self.__variable_stack:
-                var = i.get(var_node.value, None)
-                if var is not None:
-                    break
+        # innermost definition shadows the outer ones
+        entries = self.__bindings.get(var_node.symbol)
+        var = entries[-1][1] if entries else None
         if var is None:
             self.__error(f"Undefined variable {var_node.value}", var_node.lineno)
         return var
 
-    def __find_func_define(self, func_name: str, args: list[dict], lineno: int = 0, declare: bool = False) -> Optional[Symbol]:
-        funcs: list[Symbol] = self.__function_table.get(func_name)
+    def __find_func_define(self, func: int, sizes: Iterable[Optional[int]], lineno: int = 0,
+                           declare: bool = False) -> Optional[Symbol]:
+        funcs: list[Symbol] = self.__function_table.get(func)
+        func_name = SYMBOLS.spelling(func)
         if not funcs:
             if not declare:
                 self.__error(f"Undefined function {func_name}", lineno)
         else:
-            for i in funcs:
-                paras = i.func_paras
-                if len(paras) != len(args):
-                    continue
-                func_match = True
-                for j in range(len(paras)):
-                    if paras[j]['size'] != args[j]['size']:
-                        func_match = False
-                        break
-                if func_match:
-                    if declare and i.def_from != "declare":
-                        self.__error(f"Function {func_name} has already been defined!", lineno)
-                    return i
+            # the earliest overload whose parameter sizes match the arguments
+            i = self.__call_index.get(call_signature(func, sizes))
+            if i is not None:
+                if declare and i.def_from != "declare":
+                    self.__error(f"Function {func_name} has already been defined!", lineno)
+                return i
             if not declare:
                 self.__error(f"Can't find proper function call of {func_name}", lineno)
         return None
 
-    def __process_var_use(self, var_node: Node, just_value: bool = True) -> dict:
+    def __process_var_use(self, var_node: Node, just_value: bool = True) -> Operand:
         """
 
         :param var_node:
         :return:
         """
-        error_var_dict = {
-            "type": None,
-            "reg": None,
-            "size": -1,
-        }
+        error_var = Reg(None, None, -1)
         if var_node.node_type is NodeType.NUM:
-            return {
-                "type": "num",
-                "value": var_node.value,
-                "size": 32
-            }
+            return Const(var_node.value)
         elif var_node.node_type is NodeType.IDENT:
             sym = self.__find_var_define(var_node)
             if sym is None:
-                return error_var_dict
+                return error_var
             else:
                 if not just_value:
-                    return {
-                        "type": "ident",
-                        "reg": sym.reg,
-                        "size": 32,
-                        "dimension": None,
-                        "define_dime": sym.dimension
-                    }
-                pass_reg = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 32,
-                    "dimension": None,
-                    "define_dime": sym.dimension
-                }
-                curr = Sentence(Sentence_Type.LOAD, lineno=var_node.lineno)
-                curr.info['avar'] = pass_reg
-                curr.info['lvar'] = pass_reg
-                curr.info['rvar'] = {
-                    "type": "ident",
-                    "reg": sym.reg,
-                    "size": 32,
-                    "dimension": None,
-                    "define_dime": sym.dimension
-                }
+                    return ArrayRef("ident", sym.reg, 32, None, sym.dimension)
+                pass_reg = ArrayRef(Reg_Type.TMP_REG, self.__create_tmp_reg(), 32, None, sym.dimension)
+                curr = Operation(Sentence_Type.LOAD, lineno=var_node.lineno, avar=pass_reg, lvar=pass_reg,
+                                 rvar=ArrayRef("ident", sym.reg, 32, None, sym.dimension), layout=OPERANDS_ALR)
                 if self.__last_label:
                     curr.label = self.__last_label
                     self.__last_label = None
@@ -400,112 +689,69 @@ class Analyzer:
         elif var_node.node_type is NodeType.ARRAY:
             sym = self.__find_var_define(var_node)
             if sym is None:
-                return error_var_dict
+                return error_var
             elif sym.symbol_type != "int array":
                 self.__error(f"{sym.symbol_type} is not subscriptable", var_node.lineno)
-                return error_var_dict
+                return error_var
             else:
-                var_dimension = [var_node.info[str(i)] for i in range(var_node.info['size'])]
                 dimensions = []
-                for i in var_dimension:
+                for i in var_node.indices:
                     if i.node_type is NodeType.NUM:
-                        dimensions.append({
-                            "type": "num",
-                            "value": int(i.value),
-                            "size": 32
-                        })
+                        dimensions.append(Const(int(i.value)))
                     elif i.node_type is NodeType.IDENT:
                         dimensions.append(self.__process_var_use(i))
                     else:
                         dimensions.append(self.__a_expr(i))
-                return {
-                    "type": "ident",
-                    "reg": sym.reg,
-                    "size": 32,
-                    "dimension": dimensions,
-                    "define_dime": sym.dimension
-                }
+                return ArrayRef("ident", sym.reg, 32, dimensions, sym.dimension)
         elif var_node.node_type is NodeType.FUNC:
-            args: list[Node] = var_node.info['args']
+            args: tuple[Node, ...] = var_node.args
             arg_res = []
             for i in args:
                 if i.node_type is NodeType.IDENT:
                     sym = self.__find_var_define(i)
                     if sym and sym.dimension:
-                        arg_res.append({
-                            "type": "ident",
-                            "reg": sym.reg,
-                            "size": 32,
-                            "dimension": None,
-                            "define_dime": sym.dimension
-                        })
+                        arg_res.append(ArrayRef("ident", sym.reg, 32, None, sym.dimension))
                         continue
                 arg_res.append(self.__a_expr(i))
-            func_sym = self.__find_func_define(var_node.value, arg_res, var_node.lineno)
+            func_sym = self.__find_func_define(var_node.symbol, (i.size for i in arg_res), var_node.lineno)
             if func_sym is None:
-                return error_var_dict
-            curr = Sentence(Sentence_Type.CALL, value=func_sym.value, lineno=var_node.lineno)
-            curr.info['func'] = func_sym.value
-            curr.info['args'] = arg_res
+                return error_var
             if "int" in func_sym.symbol_type:
-                tmp_reg = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 32
-                }
-                curr.info['avar'] = tmp_reg
-                curr.info['func_type'] = "int"
+                tmp_reg = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 32)
+                curr = FuncCall(var_node.lineno, func_sym.value, arg_res, "int", tmp_reg)
             else:
-                tmp_reg = {
-                    "type": Reg_Type.VOID_REG,
-                    "reg": None,
-                    "size": None
-                }
-                curr.info['func_type'] = "void"
+                tmp_reg = Reg(Reg_Type.VOID_REG, None, None)
+                curr = FuncCall(var_node.lineno, func_sym.value, arg_res, "void")
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
             return tmp_reg
 
-    def __process_side_val(self, expr: Node) -> dict:
+    def __process_side_val(self, expr: Node) -> Operand:
         if expr.node_type in (NodeType.NUM, NodeType.IDENT, NodeType.ARRAY):
             res = self.__process_var_use(expr)
-            if res['type'] is Reg_Type.VOID_REG:
+            if res.type is Reg_Type.VOID_REG:
                 self.__error("Can't use VOID value in expression", expr.lineno)
             return res
         else:
             return self.__a_expr(expr)
 
-    def __convert_i32_i1(self, target_reg: dict, source_reg: dict, lineno: int = 0) -> Sentence:
-        trans = Sentence(sentence_type=Sentence_Type.NEQ, lineno=lineno)
-        trans.info['lvar'] = source_reg
-        trans.info['rvar'] = {
-            "type": "num",
-            "value": "0",
-            "size": 32
-        }
-        trans.info['avar'] = target_reg
+    def __convert_i32_i1(self, target_reg: Operand, source_reg: Operand, lineno: int = 0) -> Sentence:
+        trans = Operation(Sentence_Type.NEQ, lineno=lineno, avar=target_reg, lvar=source_reg, rvar=Const("0"))
         if self.__last_label:
             trans.label = self.__last_label
             self.__last_label = None
         return trans
 
-    def __convert_i1_i32(self, target_reg: dict, source_reg: dict, lineno: int = 0) -> Sentence:
-        trans = Sentence(sentence_type=Sentence_Type.ZEXT, lineno=lineno)
-        trans.info['lvar'] = target_reg
-        trans.info['rvar'] = source_reg
-        trans.info['avar'] = target_reg
+    def __convert_i1_i32(self, target_reg: Operand, source_reg: Operand, lineno: int = 0) -> Sentence:
+        trans = Operation(Sentence_Type.ZEXT, lineno=lineno, avar=target_reg, lvar=target_reg, rvar=source_reg)
         if self.__last_label:
             trans.label = self.__last_label
             self.__last_label = None
         return trans
 
-    def __convert_to_target_length(self, source_reg: dict, target_length: int, lineno: int = 0) -> dict:
-        if source_reg['size'] != target_length:
-            tmp = {
-                "type": Reg_Type.TMP_REG,
-                "reg": self.__create_tmp_reg(),
-                "size": target_length,
-            }
+    def __convert_to_target_length(self, source_reg: Operand, target_length: int, lineno: int = 0) -> Operand:
+        if source_reg.size != target_length:
+            tmp = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), target_length)
             if target_length == 1:
                 trans = self.__convert_i32_i1(tmp, source_reg, lineno)
             else:
@@ -514,19 +760,12 @@ class Analyzer:
             return tmp
         return source_reg
 
-    def __create_jump_sentences(self, reg: dict, true_label: str, false_label: str) -> None:
-        if reg['size'] != 1:
-            tmp = {
-                "type": Reg_Type.TMP_REG,
-                "reg": self.__create_tmp_reg(),
-                "size": 1,
-            }
+    def __create_jump_sentences(self, reg: Operand, true_label: str, false_label: str) -> None:
+        if reg.size != 1:
+            tmp = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
             self.__result.append(self.__convert_i32_i1(tmp, reg))
             reg = tmp
-        curr = Sentence(Sentence_Type.IF_JMP, lineno=0)
-        curr.info['var'] = reg
-        curr.info['tl'] = true_label
-        curr.info['fl'] = false_label
+        curr = Branch(0, reg, true_label, false_label)
         self.__set_label_and_keep_base_block(curr)
         self.__result.append(curr)
 
@@ -535,19 +774,18 @@ class Analyzer:
         self.__reg_counter += 1
         return reg
 
-    def __check_name(self, name: str) -> int:
+    def __check_name(self, symbol: int) -> int:
         """
         check if this name has already appeared in variable definition stack.
 
-        :param name: target name
+        :param symbol: interned id of target name
         :return: if it's defined at first time will return -1, else will return a number that can avoid redefinition.
         """
         check = -1
-        for i in self.__variable_stack:
-            if name in i.keys():
-                check = self.__reg_counter
-                self.__reg_counter += 1
-                return check
+        # names are removed from __bindings once no open scope defines them
+        if symbol in self.__bindings:
+            check = self.__reg_counter
+            self.__reg_counter += 1
         return check
 
     def __check_var_redefinition(self, var: Union[Node, Symbol]) -> bool:
@@ -557,8 +795,9 @@ class Analyzer:
         :param var:
         :return:
         """
-        if var.value in self.__curr_var_table.keys():
-            last = self.__curr_var_table.get(var.value)
+        entries = self.__bindings.get(var.symbol)
+        if entries and entries[-1][0] == len(self.__scope_names) - 1:
+            last = entries[-1][1]
             self.__error(f"Redefinition of {var.value}, it was defined in line {last.lineno}", var.lineno)
             return False
         return True
@@ -570,7 +809,7 @@ class Analyzer:
         :param func:
         :return:
         """
-        return func.value in self.__function_table.keys()
+        return func.symbol in self.__function_table
 
     def __insert_var_table(self, sym: Symbol) -> bool:
         """
@@ -580,7 +819,9 @@ class Analyzer:
         :return:
         """
         if self.__check_var_redefinition(sym):
-            self.__curr_var_table[sym.value] = sym
+            self.__bindings.setdefault(sym.symbol, []).append((len(self.__scope_names) - 1, sym))
+            self.__scope_names[-1].append(sym.symbol)
+            self.__record(FLOW_VAR, sym)
             return False
         return True
 
@@ -591,25 +832,21 @@ class Analyzer:
         :param sym:
         :return:
         """
-        func_name = sym.value
+        func_name = sym.symbol
+        signature = define_signature(sym)
         if self.__check_func_redefinition(sym):
             # check is overload or total redefinition
-            for j in self.__function_table[sym.value]:
-                j: Symbol
-                if sym.symbol_type == j.symbol_type and len(j.func_paras) == len(sym.func_paras):
-                    flag = True
-                    for k in range(len(j.func_paras)):
-                        if j.func_paras[k]['type'] != sym.func_paras[k]['type']:
-                            flag = False
-                            break
-                    if flag:
-                        self.__error(f"Redefine of function {sym.value}, already defined in {j.lineno}", sym.lineno)
-                        return False
-            
-            sym.value = sym.value + "i" * len(self.__function_table[sym.value])
+            j = self.__define_index.get(signature)
+            if j is not None:
+                self.__error(f"Redefine of function {sym.value}, already defined in {j.lineno}", sym.lineno)
+                return False
+            sym.value = mangle(sym.value, len(self.__function_table[func_name]))
         else:
-            self.__function_table[sym.value] = []
+            self.__function_table[func_name] = []
         self.__function_table[func_name].append(sym)
+        self.__define_index[signature] = sym
+        self.__call_index.setdefault(call_signature(func_name, para_sizes(sym)), sym)
+        self.__record(FLOW_FUNC, sym)
         return True
 
     def __push_var_table(self):
@@ -618,14 +855,10 @@ class Analyzer:
 
         :return: None
         """
+        self.__record(FLOW_SNAPSHOT)
+        self.__record(FLOW_ENTER)
 
-        curr_variable_stack = copy.deepcopy(self.__variable_stack)
-        curr_function_stack = copy.deepcopy(self.__function_table)
-        self.__var_stack_flow.append(curr_variable_stack)
-        self.__fun_stack_flow.append(curr_function_stack)
-
-        self.__curr_var_table = {}
-        self.__variable_stack.append(self.__curr_var_table)
+        self.__scope_names.append([])
 
     def __pop_var_table(self):
         """
@@ -633,71 +866,57 @@ class Analyzer:
 
         :return: None
         """
-        curr_variable_stack = copy.deepcopy(self.__variable_stack)
-        curr_function_stack = copy.deepcopy(self.__function_table)
-        self.__var_stack_flow.append(curr_variable_stack)
-        self.__fun_stack_flow.append(curr_function_stack)
-        if self.__variable_stack:
-            self.__variable_stack.pop()
-            self.__curr_var_table = self.__variable_stack[-1]
+        self.__record(FLOW_SNAPSHOT)
+        self.__record(FLOW_LEAVE)
+        if self.__scope_names:
+            for symbol in self.__scope_names.pop():
+                entries = self.__bindings[symbol]
+                entries.pop()
+                if not entries:
+                    del self.__bindings[symbol]
 
     def __set_label_and_keep_base_block(self, curr: Sentence):
         if self.__last_label:
             curr.label = self.__last_label
             self.__last_label = None
             if self.__result[-1].sentence_type not in [Sentence_Type.JMP, Sentence_Type.IF_JMP]:
-                bb = Sentence(Sentence_Type.JMP, lineno=0)
-                bb.info['label'] = curr.label
-                self.__result.append(bb)
+                self.__result.append(Jump(0, curr.label))
 
-    def __a_define_var(self, var_node: Node) -> tuple[Sentence, Symbol]:
+    def __a_define_var(self, var_node: Node) -> tuple[VarDefine, Symbol]:
         """
 
 
         :param var_node:
         :return:
         """
-        reg = self.__set_reg(var_node.value)
-        symbol = Symbol(value=var_node.value, symbol_type="int var", reg=reg, lineno=var_node.lineno)
-        var = Sentence(sentence_type=Sentence_Type.DEFINE_LOCAL_VAR, value=var_node.value, lineno=var_node.lineno,
-                       reg=reg)
-        var.info = {
-            "type": Reg_Type.INT_REG,
-            "reg": reg,
-            "size": 32
-        }
+        reg = self.__set_reg(var_node.value, var_node.symbol)
+        symbol = Symbol(value=var_node.value, symbol_type="int var", reg=reg, lineno=var_node.lineno,
+                        symbol=var_node.symbol)
+        var = VarDefine(Sentence_Type.DEFINE_LOCAL_VAR, value=var_node.value, lineno=var_node.lineno, reg=reg,
+                        var=Reg(Reg_Type.INT_REG, reg, 32))
         return var, symbol
 
-    def __a_define_array(self, array_node: Node) -> tuple[Sentence, Symbol]:
+    def __a_define_array(self, array_node: Node) -> tuple[VarDefine, Symbol]:
         """
 
 
         :param array_node:
         :return:
         """
-        reg = self.__set_reg(array_node.value)
-        symbol = Symbol(value=array_node.value, symbol_type="int array", reg=reg, lineno=array_node.lineno)
-        array = Sentence(sentence_type=Sentence_Type.DEFINE_LOCAL_ARRAY,
-                         value=array_node.value,
-                         lineno=array_node.lineno,
-                         reg=reg)
-        array.info = {
-            "type": Reg_Type.INT_REG,
-            "reg": reg,
-            "size": 32,
-            "dimension": array_node.info['size'],
-            "define_dime": []
-        }
-        for j in range(array_node.info['size']):
-            if array_node.info[str(j)] is None:
-                array.info['define_dime'].append(None)
-            else:
-                array.info['define_dime'].append(int(array_node.info[str(j)].value))
-        symbol.size = array.info['dimension']
-        symbol.dimension = array.info['define_dime']
+        reg = self.__set_reg(array_node.value, array_node.symbol)
+        symbol = Symbol(value=array_node.value, symbol_type="int array", reg=reg, lineno=array_node.lineno,
+                        symbol=array_node.symbol)
+        define_dime = [None if dim is None else int(dim.value) for dim in array_node.dims]
+        array = VarDefine(Sentence_Type.DEFINE_LOCAL_ARRAY,
+                          value=array_node.value,
+                          lineno=array_node.lineno,
+                          reg=reg,
+                          var=ArrayRef(Reg_Type.INT_REG, reg, 32, len(array_node.dims), define_dime))
+        symbol.size = array.var.dimension
+        symbol.dimension = array.var.define_dime
         return array, symbol
 
-    def __a_define_function(self, function: Node) -> tuple[Sentence, Symbol]:
+    def __a_define_function(self, function: Node) -> tuple[FuncDefine, Symbol]:
         """
         Process definition of function. Be careful, this function will auto insert sentence and symbol to
         result and table. If this function can be defined, it will process function body automatically(If it has).
@@ -715,31 +934,19 @@ class Analyzer:
             func_type = "int"
         else:
             func_type = "void"
-        func = Sentence(sentence_type=Sentence_Type.DEFINE_FUNC, value=function.value, lineno=function.lineno)
-        func.info = {
-            "type": func_type,
-            "paras": []
-        }
+        func = FuncDefine(value=function.value, lineno=function.lineno, func_type=func_type)
         func_paras = []
         func_paras_def = []
         # process parameters of function
-        for para in function.info['paras']:
+        for para in function.paras:
             if para.node_type is NodeType.INT_VAR:
                 sent, symb = self.__a_define_var(para)
-                func.info['paras'].append(sent)
+                func.paras.append(sent)
                 ins_reg = self.__create_tmp_reg()
-                ins_info = {
-                    'type': sent.info.get('type'),
-                    'reg': ins_reg,
-                    'size': sent.info.get('size'),
-                }
-                curr = Sentence(Sentence_Type.DEFINE_LOCAL_VAR, lineno=0)
-                curr.info = ins_info
-                func_paras_def.append(curr)
-                curr = Sentence(Sentence_Type.ASSIGN, lineno=0)
-                curr.info['rvar'] = sent.info
-                curr.info['avar'] = ins_info
-                func_paras_def.append(curr)
+                ins_info = Reg(sent.var.type, ins_reg, sent.var.size)
+                func_paras_def.append(VarDefine(Sentence_Type.DEFINE_LOCAL_VAR, lineno=0, var=ins_info))
+                func_paras_def.append(Operation(Sentence_Type.ASSIGN, lineno=0, avar=ins_info, rvar=sent.var,
+                                                layout=OPERANDS_RA))
                 symb.reg = ins_reg
                 self.__insert_var_table(symb)
                 func_paras.append({
@@ -749,22 +956,12 @@ class Analyzer:
                 })
             elif para.node_type is NodeType.INT_ARRAY:
                 sent, symb = self.__a_define_array(para)
-                func.info['paras'].append(sent)
+                func.paras.append(sent)
                 ins_reg = self.__create_tmp_reg()
-                ins_info = {
-                    'type': sent.info.get('type'),
-                    'reg': ins_reg,
-                    'size': sent.info.get('size'),
-                    'dimension': sent.info.get('dimension'),
-                    'define_dime': sent.info.get('define_dime'),
-                }
-                curr = Sentence(Sentence_Type.DEFINE_LOCAL_ARRAY, lineno=0)
-                curr.info = ins_info
-                func_paras_def.append(curr)
-                curr = Sentence(Sentence_Type.ASSIGN, lineno=0)
-                curr.info['rvar'] = sent.info
-                curr.info['avar'] = ins_info
-                func_paras_def.append(curr)
+                ins_info = ArrayRef(sent.var.type, ins_reg, sent.var.size, sent.var.dimension, sent.var.define_dime)
+                func_paras_def.append(VarDefine(Sentence_Type.DEFINE_LOCAL_ARRAY, lineno=0, var=ins_info))
+                func_paras_def.append(Operation(Sentence_Type.ASSIGN, lineno=0, avar=ins_info, rvar=sent.var,
+                                                layout=OPERANDS_RA))
                 symb.reg = ins_reg
                 self.__insert_var_table(symb)
                 func_paras.append({
@@ -783,14 +980,15 @@ class Analyzer:
                       lineno=function.lineno,
                       func_paras=func_paras,
                       func_entry=func_entry,
-                      func_leave=func_leave)
-        if function.info['funcbody'] is None:
+                      func_leave=func_leave,
+                      symbol=function.symbol)
+        if function.funcbody is None:
             symb.def_from = "declare"
             self.__pop_var_table()
             if self.__insert_func_table(symb):
                 return func, symb
         else:
-            symb_dec = self.__find_func_define(symb.value, symb.func_paras, declare=True)
+            symb_dec = self.__find_func_define(symb.symbol, para_sizes(symb), declare=True)
             if symb_dec:
                 symb = symb_dec
                 func_entry = symb.func_entry
@@ -805,46 +1003,33 @@ class Analyzer:
             self.__result.append(func)
             self.__result.extend(func_paras_def)
             if func_type == "int":
-                ret_reg = self.__set_reg("retg")
-                self.__return_reg = {
-                    "type": Reg_Type.INT_REG,
-                    "reg": ret_reg,
-                    "size": 32
-                }
-                ret_sym = Symbol(symbol_type="int var", value="retg", reg=ret_reg)
-                ret_sen = Sentence(Sentence_Type.DEFINE_LOCAL_VAR, value="retg", lineno=0)
-                ret_sen.info = self.__return_reg
+                ret_reg = self.__set_reg("retg", RETG)
+                self.__return_reg = Reg(Reg_Type.INT_REG, ret_reg, 32)
+                ret_sym = Symbol(symbol_type="int var", value="retg", reg=ret_reg, symbol=RETG)
+                ret_sen = VarDefine(Sentence_Type.DEFINE_LOCAL_VAR, value="retg", lineno=0, var=self.__return_reg)
                 self.__insert_var_table(ret_sym)
                 self.__result.append(ret_sen)
 
             # self.__last_label = func_entry
-            self.__a_statement(function.info['funcbody'])
+            self.__a_statement(function.funcbody)
 
             if self.__last_label:
-                curr = Sentence(Sentence_Type.JMP, lineno=function.lineno)
+                curr = Jump(function.lineno, self.__func_ret)
                 curr.label = self.__last_label
                 self.__last_label = None
-                curr.info['label'] = self.__func_ret
                 self.__result.append(curr)
 
             self.__last_label = self.__func_ret
             # add ret instruction
             if self.__return_reg:
-                curr = Sentence(Sentence_Type.LOAD, lineno=function.lineno)
-                ret_t = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 32
-                }
-                curr.info['lvar'] = ret_t
-                curr.info['rvar'] = self.__return_reg
-                curr.info['avar'] = ret_t
+                ret_t = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 32)
+                curr = Operation(Sentence_Type.LOAD, lineno=function.lineno, avar=ret_t, lvar=ret_t,
+                                 rvar=self.__return_reg)
                 self.__set_label_and_keep_base_block(curr)
                 self.__result.append(curr)
             else:
                 ret_t = self.__return_reg
-            curr = Sentence(Sentence_Type.RETURN, lineno=function.lineno)
-            curr.info['return_reg'] = ret_t
+            curr = FuncReturn(function.lineno, ret_t)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
 
@@ -859,7 +1044,7 @@ class Analyzer:
 
     def __a_statement(self, statement: Node) -> None:
         if statement.node_type is NodeType.BLOCK:
-            for sub in statement.info['subprogram']:
+            for sub in statement.subprogram:
                 self.__a_statement(sub)
         elif statement.node_type is NodeType.INT_VAR:
             sent, symb = self.__a_define_var(statement)
@@ -898,25 +1083,22 @@ class Analyzer:
 
         # add branch for base block
         if self.__result[-1].sentence_type not in [Sentence_Type.JMP, Sentence_Type.IF_JMP]:
-            curr = Sentence(Sentence_Type.JMP, lineno=0)
-            curr.info['label'] = self.__condition_entry
-            self.__result.append(curr)
+            self.__result.append(Jump(0, self.__condition_entry))
 
         self.__last_label = self.__condition_entry
-        condition_reg = self.__a_expr(while_node.info['condition'])
+        condition_reg = self.__a_expr(while_node.condition)
         self.__create_jump_sentences(condition_reg, true_label, false_label)
         # given statement is a sub-block(node_type may not be BLOCK), we need to push stack
         self.__push_var_table()
         self.__last_label = true_label
-        self.__a_statement(while_node.info['statement'])
+        self.__a_statement(while_node.statement)
         # after we left statement process, we need to restore all stack info
         self.__pop_var_table()
         # add loop jump
-        curr = Sentence(Sentence_Type.JMP, lineno=while_node.lineno)
+        curr = Jump(while_node.lineno, self.__condition_entry)
         if self.__last_label is not None:
             curr.label = self.__last_label
             self.__last_label = None
-        curr.info['label'] = self.__condition_entry
         self.__result.append(curr)
 
         # before leave loop block, should pass loop leave label to next sentence correctly
@@ -932,40 +1114,36 @@ class Analyzer:
 
         # add branch for base block
         if self.__result[-1].sentence_type not in [Sentence_Type.JMP, Sentence_Type.IF_JMP]:
-            curr = Sentence(Sentence_Type.JMP, lineno=0)
-            curr.info['label'] = condition_entry
-            self.__result.append(curr)
+            self.__result.append(Jump(0, condition_entry))
 
         self.__last_label = condition_entry
-        condition_reg = self.__a_expr(if_node.info['condition'])
+        condition_reg = self.__a_expr(if_node.condition)
         self.__create_jump_sentences(condition_reg, true_leave, false_leave)
         # given statement is a sub-block(node_type may not be BLOCK), we need to push stack
         self.__push_var_table()
         self.__last_label = true_leave
-        self.__a_statement(if_node.info['statement'])
+        self.__a_statement(if_node.statement)
         # after we left statement process, we need to restore all stack info
         self.__pop_var_table()
 
-        curr = Sentence(Sentence_Type.JMP, lineno=if_node.lineno)
+        curr = Jump(if_node.lineno, block_leave)
         if self.__last_label is not None:
             curr.label = self.__last_label
             self.__last_label = None
-        curr.info['label'] = block_leave
         self.__result.append(curr)
 
         self.__last_label = false_leave
-        if if_node.info['elsestat'] is not None:
+        if if_node.elsestat is not None:
             self.__push_var_table()
-            self.__a_statement(if_node.info['elsestat'].info['statement'])
+            self.__a_statement(if_node.elsestat.statement)
             self.__pop_var_table()
 
         # if exit labels have conflict, set a branch instruction jump to outer exit label
         # FIXME:it will make system more complex
-        curr = Sentence(Sentence_Type.JMP, lineno=if_node.lineno)
+        curr = Jump(if_node.lineno, block_leave)
         if self.__last_label is not None:
             curr.label = self.__last_label
             self.__last_label = None
-        curr.info['label'] = block_leave
         self.__result.append(curr)
 
         # before leave if block, should pass loop leave label to next sentence correctly
@@ -987,37 +1165,33 @@ class Analyzer:
                 return
             target_label = self.__block_leave
 
-        curr = Sentence(Sentence_Type.JMP, lineno=node.lineno)
+        curr = Jump(node.lineno, target_label)
         if self.__last_label:
             curr.label = self.__last_label
             self.__last_label = None
-        curr.info['label'] = target_label
         self.__result.append(curr)
 
     def __a_return(self, node: Node):
         if self.__func_ret is None:
             self.__error("Can't find function block to set 'return'", node.lineno)
-        if node.info.get('return_expr'):
+        if node.return_expr is not None:
             if self.__return_reg is None:
                 self.__error("Return type 'void' can't have return value", node.lineno)
                 return
-            expr_res = self.__a_expr(node.info['return_expr'])
-            curr = Sentence(Sentence_Type.ASSIGN, lineno=node.lineno)
-            curr.info['lvar'] = self.__return_reg
-            curr.info['avar'] = self.__return_reg
-            curr.info['rvar'] = expr_res
+            expr_res = self.__a_expr(node.return_expr)
+            curr = Operation(Sentence_Type.ASSIGN, lineno=node.lineno, avar=self.__return_reg,
+                             lvar=self.__return_reg, rvar=expr_res, layout=OPERANDS_LAR)
             if self.__last_label:
                 curr.label = self.__last_label
                 self.__last_label = None
             self.__result.append(curr)
-        curr = Sentence(Sentence_Type.JMP, lineno=node.lineno)
+        curr = Jump(node.lineno, self.__func_ret)
         if self.__last_label:
             curr.label = self.__last_label
             self.__last_label = None
-        curr.info['label'] = self.__func_ret
         self.__result.append(curr)
 
-    def __a_expr(self, expr: Node) -> dict:
+    def __a_expr(self, expr: Node) -> Operand:
         """
         use to translate expression to a couple of base calculation sentences
 
@@ -1025,55 +1199,45 @@ class Analyzer:
         :return:
         """
         if expr.node_type is NodeType.ASSIGN:
-            curr = Sentence(Sentence_Type.ASSIGN, lineno=expr.lineno)
             # left value
-            if expr.info['lvar'].node_type is NodeType.NUM:
+            if expr.lvar.node_type is NodeType.NUM:
                 self.__error("Number can't be evaluated", expr.lineno)
-                curr.info['lvar'] = {"type": None, "reg": None, "size": None}
-            elif expr.info['lvar'].node_type in (NodeType.IDENT, NodeType.ARRAY):
-                curr.info['lvar'] = self.__process_var_use(expr.info['lvar'], False)
+                lvar = Reg(None, None, None)
+            elif expr.lvar.node_type in (NodeType.IDENT, NodeType.ARRAY):
+                lvar = self.__process_var_use(expr.lvar, False)
             else:
                 self.__error("Excepted left identifier of '='", expr.lineno)
-                curr.info['lvar'] = {"type": None, "reg": None, "size": None}
+                lvar = Reg(None, None, None)
 
             # right value
-            curr.info['rvar'] = self.__process_side_val(expr.info['rvar'])
-            if curr.info['rvar']['size'] != 32:
-                tmp = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 32
-                }
-                trans = self.__convert_i1_i32(tmp, curr.info['rvar'])
+            rvar = self.__process_side_val(expr.rvar)
+            if rvar.size != 32:
+                tmp = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 32)
+                trans = self.__convert_i1_i32(tmp, rvar)
                 self.__result.append(trans)
-                curr.info['rvar'] = tmp
+                rvar = tmp
 
-            curr.info['avar'] = curr.info['lvar']  # for assignment, the left value is evaluated value
+            # for assignment, the left value is evaluated value
+            curr = Operation(Sentence_Type.ASSIGN, lineno=expr.lineno, avar=lvar, lvar=lvar, rvar=rvar)
             if self.__last_label:
                 curr.label = self.__last_label
                 self.__last_label = None
             self.__result.append(curr)
-            return curr.info['avar']
+            return curr.avar
         elif expr.node_type is NodeType.UNARY_LEFT:  # ++, --, -, !
-            target: Node = expr.info['target']
-            lop: Node = expr.info['lop']
+            target: Node = expr.target
+            lop: Node = expr.lop
             value_pass_reg = self.__create_tmp_reg()
-            value_pass = {
-                "type": Reg_Type.TMP_REG,
-                "reg": value_pass_reg,
-                "size": 32
-            }
+            value_pass = Reg(Reg_Type.TMP_REG, value_pass_reg, 32)
             if target.node_type in (NodeType.NUM, NodeType.IDENT, NodeType.ARRAY):
                 rvar = self.__process_var_use(target, False)
             else:  # target.node_type in (NodeType.UNARY_LEFT, NodeType.UNARY_RIGHT):
                 rvar = self.__a_expr(target)
-            value_pass['size'] = rvar['size']
+            value_pass.size = rvar.size
             if lop.node_type in (NodeType.SELF_PLUS, NodeType.SELF_MINUS):
                 # t = a
-                curr = Sentence(Sentence_Type.LOAD, lineno=expr.lineno)
-                curr.info['avar'] = value_pass
-                curr.info['lvar'] = value_pass
-                curr.info['rvar'] = rvar
+                curr = Operation(Sentence_Type.LOAD, lineno=expr.lineno, avar=value_pass, lvar=value_pass, rvar=rvar,
+                                 layout=OPERANDS_ALR)
                 if self.__last_label:
                     curr.label = self.__last_label
                     self.__last_label = None
@@ -1081,211 +1245,124 @@ class Analyzer:
 
                 # t = a +/- 1
                 tmp_reg = self.__create_tmp_reg()
-                tmp_info = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": tmp_reg,
-                    "size": 32
-                }
+                tmp_info = Reg(Reg_Type.TMP_REG, tmp_reg, 32)
                 if lop.node_type is NodeType.SELF_PLUS:
-                    curr = Sentence(Sentence_Type.ADD, lineno=expr.lineno)
+                    sentence_type = Sentence_Type.ADD
                 else:
-                    curr = Sentence(Sentence_Type.MINUS, lineno=expr.lineno)
-                curr.info['avar'] = tmp_info
-                curr.info['lvar'] = value_pass
-                curr.info['rvar'] = {
-                    "type": "num",
-                    "value": "1",
-                    "size": 32
-                }
-                self.__result.append(curr)
+                    sentence_type = Sentence_Type.MINUS
+                self.__result.append(Operation(sentence_type, lineno=expr.lineno, avar=tmp_info, lvar=value_pass,
+                                               rvar=Const("1"), layout=OPERANDS_ALR))
 
                 # a = t
-                curr = Sentence(Sentence_Type.ASSIGN, lineno=expr.lineno)
-                curr.info['avar'] = rvar
-                curr.info['lvar'] = rvar
-                curr.info['rvar'] = tmp_info
-                self.__result.append(curr)
+                self.__result.append(Operation(Sentence_Type.ASSIGN, lineno=expr.lineno, avar=rvar, lvar=rvar,
+                                               rvar=tmp_info, layout=OPERANDS_ALR))
                 value_pass = tmp_info
             else:
-                if rvar.get('reg') and (rvar.get("type") is not Reg_Type.TMP_REG and not rvar.get('dimension')):
+                if rvar.reg and (rvar.type is not Reg_Type.TMP_REG and not rvar.dimension):
                     print(rvar)
-                    curr = Sentence(Sentence_Type.LOAD, lineno=expr.lineno)
-                    curr.info['avar'] = value_pass
-                    curr.info['lvar'] = value_pass
-                    curr.info['rvar'] = rvar
+                    curr = Operation(Sentence_Type.LOAD, lineno=expr.lineno, avar=value_pass, lvar=value_pass,
+                                     rvar=rvar, layout=OPERANDS_ALR)
                     self.__set_label_and_keep_base_block(curr)
                     self.__result.append(curr)
                 else:
                     value_pass = rvar
                 if lop.node_type is NodeType.NEGATIVE:
+                    # i1 operand (comparison, logic, !) is widened first, as C negates the int value
+                    if value_pass.size == 1:
+                        value_pass = self.__convert_to_target_length(value_pass, 32, expr.lineno)
                     # t = 0 - a
-                    curr = Sentence(Sentence_Type.MINUS, lineno=expr.lineno)
-                    curr.info['avar'] = {
-                        "type": Reg_Type.TMP_REG,
-                        "reg": self.__create_tmp_reg(),
-                        "size": rvar['size']
-                    }
-                    curr.info['lvar'] = {
-                        "type": "num",
-                        "value": "0",
-                        "size": rvar['size']
-                    }
-                    curr.info['rvar'] = value_pass
+                    curr = Operation(Sentence_Type.MINUS, lineno=expr.lineno,
+                                     avar=Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), value_pass.size),
+                                     lvar=Const("0", value_pass.size), rvar=value_pass, layout=OPERANDS_ALR)
                     self.__set_label_and_keep_base_block(curr)
                     self.__result.append(curr)
-                    value_pass = curr.info['avar']
+                    value_pass = curr.avar
                 else:
                     # t1 = a != 0
-                    neq = Sentence(Sentence_Type.NEQ, lineno=expr.lineno)
-                    neq.info['avar'] = {
-                        "type": Reg_Type.TMP_REG,
-                        "reg": self.__create_tmp_reg(),
-                        "size": 1
-                    }
-                    neq.info['lvar'] = value_pass
-                    neq.info['rvar'] = {
-                        "type": "num",
-                        "value": "0",
-                        "size": 32
-                    }
+                    neq = Operation(Sentence_Type.NEQ, lineno=expr.lineno,
+                                    avar=Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1),
+                                    lvar=value_pass, rvar=Const("0"), layout=OPERANDS_ALR)
                     self.__set_label_and_keep_base_block(neq)
                     self.__result.append(neq)
 
                     # t2 = t1 xor true
-                    curr = Sentence(Sentence_Type.XOR, lineno=expr.lineno)
-                    curr.info['avar'] = {
-                        "type": Reg_Type.TMP_REG,
-                        "reg": self.__create_tmp_reg(),
-                        "size": 1
-                    }
-                    curr.info['lvar'] = neq.info['avar']
-                    curr.info['rvar'] = {
-                        "type": "num",
-                        "value": "1",
-                        "size": 1
-                    }
+                    curr = Operation(Sentence_Type.XOR, lineno=expr.lineno,
+                                     avar=Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1),
+                                     lvar=neq.avar, rvar=Const("1", 1), layout=OPERANDS_ALR)
                     self.__set_label_and_keep_base_block(curr)
                     self.__result.append(curr)
-                    value_pass = curr.info['avar']
+                    value_pass = curr.avar
             return value_pass
         elif expr.node_type is NodeType.UNARY_RIGHT:  # ++, --
-            target: Node = expr.info['target']
-            rop: Node = expr.info['rop']
+            target: Node = expr.target
+            rop: Node = expr.rop
             value_pass_reg = self.__create_tmp_reg()
-            value_pass = {
-                "type": Reg_Type.TMP_REG,
-                "reg": value_pass_reg,
-                "size": 32
-            }
+            value_pass = Reg(Reg_Type.TMP_REG, value_pass_reg, 32)
             if target.node_type in (NodeType.IDENT, NodeType.ARRAY):
                 rvar = self.__process_var_use(target, False)
             elif target.node_type in (NodeType.UNARY_LEFT, NodeType.UNARY_RIGHT):
                 rvar = self.__a_expr(target)
             else:
                 self.__error("lvalue required as decrement operand", expr.lineno)
-                return {
-                    "type": None,
-                    "reg": None
-                }
+                return Reg(None, None, None)
 
             # t1 = a
-            curr = Sentence(Sentence_Type.LOAD, lineno=expr.lineno)
+            curr = Operation(Sentence_Type.LOAD, lineno=expr.lineno, avar=value_pass, lvar=value_pass, rvar=rvar,
+                             layout=OPERANDS_LAR)
             self.__set_label_and_keep_base_block(curr)
-            curr.info['lvar'] = value_pass
-            curr.info['avar'] = value_pass
-            curr.info['rvar'] = rvar
             self.__result.append(curr)
 
             # t2 = a +/- 1
             tmp_reg = self.__create_tmp_reg()
-            tmp_info = {
-                "type": Reg_Type.TMP_REG,
-                "reg": tmp_reg,
-                "size": 32
-            }
+            tmp_info = Reg(Reg_Type.TMP_REG, tmp_reg, 32)
             if rop.node_type is NodeType.SELF_PLUS:
-                curr = Sentence(Sentence_Type.ADD, lineno=expr.lineno)
+                sentence_type = Sentence_Type.ADD
             else:
-                curr = Sentence(Sentence_Type.MINUS, lineno=expr.lineno)
-            curr.info['avar'] = tmp_info
-            curr.info['lvar'] = value_pass
-            curr.info['rvar'] = {
-                "type": "num",
-                "value": "1",
-                "size": 32
-            }
-            self.__result.append(curr)
+                sentence_type = Sentence_Type.MINUS
+            self.__result.append(Operation(sentence_type, lineno=expr.lineno, avar=tmp_info, lvar=value_pass,
+                                           rvar=Const("1"), layout=OPERANDS_ALR))
 
             # a = t2
-            curr = Sentence(Sentence_Type.ASSIGN, lineno=expr.lineno)
-            curr.info['avar'] = rvar
-            curr.info['lvar'] = rvar
-            curr.info['rvar'] = tmp_info
-            self.__result.append(curr)
+            self.__result.append(Operation(Sentence_Type.ASSIGN, lineno=expr.lineno, avar=rvar, lvar=rvar,
+                                           rvar=tmp_info, layout=OPERANDS_ALR))
 
             return value_pass
         elif expr.node_type is NodeType.LOGIC_AND:
             all_leave_label = self.__set_label()
             l_true_label = self.__set_label()
-            and_res = {
-                "type": Reg_Type.TMP_REG,
-                "reg": self.__create_tmp_reg(),
-                "size": 1
-            }
-            curr = Sentence(Sentence_Type.DEFINE_LOCAL_VAR, lineno=0)
-            curr.info = and_res
+            and_res = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
+            curr = VarDefine(Sentence_Type.DEFINE_LOCAL_VAR, lineno=0, var=and_res)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
 
 
-            l_reg = self.__process_side_val(expr.info['lvar'])
-            if l_reg['size'] != 1:
-                l_j_info = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 1
-                }
+            l_reg = self.__process_side_val(expr.lvar)
+            if l_reg.size != 1:
+                l_j_info = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
                 l_trans = self.__convert_i32_i1(l_j_info, l_reg, expr.lineno)
                 self.__result.append(l_trans)
                 l_reg = l_j_info
-            curr = Sentence(Sentence_Type.ASSIGN, lineno=0)
-            curr.info['lvar'] = and_res
-            curr.info['rvar'] = l_reg
-            curr.info['avar'] = and_res
+            curr = Operation(Sentence_Type.ASSIGN, lineno=0, avar=and_res, lvar=and_res, rvar=l_reg)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
 
             self.__create_jump_sentences(l_reg, l_true_label, all_leave_label)
 
             self.__last_label = l_true_label
-            r_reg = self.__process_side_val(expr.info['rvar'])
-            if r_reg['size'] != 1:
-                r_j_info = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 1
-                }
+            r_reg = self.__process_side_val(expr.rvar)
+            if r_reg.size != 1:
+                r_j_info = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
                 r_trans = self.__convert_i32_i1(r_j_info, r_reg, expr.lineno)
                 self.__result.append(r_trans)
                 r_reg = r_j_info
 
-            curr = Sentence(Sentence_Type.ASSIGN, lineno=0)
-            curr.info['lvar'] = and_res
-            curr.info['rvar'] = r_reg
-            curr.info['avar'] = and_res
+            curr = Operation(Sentence_Type.ASSIGN, lineno=0, avar=and_res, lvar=and_res, rvar=r_reg)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
 
             self.__last_label = all_leave_label
-            tmp_info = {
-                "type": Reg_Type.TMP_REG,
-                "reg": self.__create_tmp_reg(),
-                "size": 1
-            }
-            curr = Sentence(Sentence_Type.LOAD, lineno=0)
-            curr.info['lvar'] = tmp_info
-            curr.info['rvar'] = and_res
-            curr.info['avar'] = tmp_info
+            tmp_info = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
+            curr = Operation(Sentence_Type.LOAD, lineno=0, avar=tmp_info, lvar=tmp_info, rvar=and_res)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
             and_res = tmp_info
@@ -1294,117 +1371,57 @@ class Analyzer:
         elif expr.node_type is NodeType.LOGIC_OR:
             all_leave_label = self.__set_label()
             l_false_label = self.__set_label()
-            or_res = {
-                "type": Reg_Type.TMP_REG,
-                "reg": self.__create_tmp_reg(),
-                "size": 1
-            }
-            curr = Sentence(Sentence_Type.DEFINE_LOCAL_VAR, lineno=0)
-            curr.info = or_res
+            or_res = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
+            curr = VarDefine(Sentence_Type.DEFINE_LOCAL_VAR, lineno=0, var=or_res)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
 
 
-            l_reg = self.__process_side_val(expr.info['lvar'])
-            if l_reg['size'] != 1:
-                l_j_info = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 1
-                }
+            l_reg = self.__process_side_val(expr.lvar)
+            if l_reg.size != 1:
+                l_j_info = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
                 l_trans = self.__convert_i32_i1(l_j_info, l_reg, expr.lineno)
                 self.__result.append(l_trans)
                 l_reg = l_j_info
 
-            curr = Sentence(Sentence_Type.ASSIGN, lineno=0)
-            curr.info['lvar'] = or_res
-            curr.info['rvar'] = l_reg
-            curr.info['avar'] = or_res
+            curr = Operation(Sentence_Type.ASSIGN, lineno=0, avar=or_res, lvar=or_res, rvar=l_reg)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
 
             self.__create_jump_sentences(l_reg, all_leave_label, l_false_label)
 
             self.__last_label = l_false_label
-            r_reg = self.__process_side_val(expr.info['rvar'])
-            if r_reg['size'] != 1:
-                r_j_info = {
-                    "type": Reg_Type.TMP_REG,
-                    "reg": self.__create_tmp_reg(),
-                    "size": 1
-                }
+            r_reg = self.__process_side_val(expr.rvar)
+            if r_reg.size != 1:
+                r_j_info = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
                 l_trans = self.__convert_i32_i1(r_j_info, r_reg, expr.lineno)
                 self.__result.append(l_trans)
                 r_reg = r_j_info
-            curr = Sentence(Sentence_Type.ASSIGN, lineno=0)
-            curr.info['lvar'] = or_res
-            curr.info['rvar'] = r_reg
-            curr.info['avar'] = or_res
+            curr = Operation(Sentence_Type.ASSIGN, lineno=0, avar=or_res, lvar=or_res, rvar=r_reg)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
 
             self.__last_label = all_leave_label
-            tmp_info = {
-                "type": Reg_Type.TMP_REG,
-                "reg": self.__create_tmp_reg(),
-                "size": 1
-            }
-            curr = Sentence(Sentence_Type.LOAD, lineno=0)
-            curr.info['lvar'] = tmp_info
-            curr.info['rvar'] = or_res
-            curr.info['avar'] = tmp_info
+            tmp_info = Reg(Reg_Type.TMP_REG, self.__create_tmp_reg(), 1)
+            curr = Operation(Sentence_Type.LOAD, lineno=0, avar=tmp_info, lvar=tmp_info, rvar=or_res)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
             or_res = tmp_info
 
             return or_res
         else:
-            aval_reg_size = 32
-            if expr.node_type is NodeType.PLUS:
-                curr = Sentence(Sentence_Type.ADD, lineno=expr.lineno)
-            elif expr.node_type is NodeType.MINUS:
-                curr = Sentence(Sentence_Type.MINUS, lineno=expr.lineno)
-            elif expr.node_type is NodeType.TIMES:
-                curr = Sentence(Sentence_Type.TIMES, lineno=expr.lineno)
-            elif expr.node_type is NodeType.DIVIDE:
-                curr = Sentence(Sentence_Type.DIVIDE, lineno=expr.lineno)
-            elif expr.node_type is NodeType.MOD:
-                curr = Sentence(Sentence_Type.MOD, lineno=expr.lineno)
-            elif expr.node_type is NodeType.EQ:
-                curr = Sentence(Sentence_Type.EQ, lineno=expr.lineno)
-                aval_reg_size = 1
-            elif expr.node_type is NodeType.NEQ:
-                curr = Sentence(Sentence_Type.NEQ, lineno=expr.lineno)
-                aval_reg_size = 1
-            elif expr.node_type is NodeType.GT:
-                curr = Sentence(Sentence_Type.GT, lineno=expr.lineno)
-                aval_reg_size = 1
-            elif expr.node_type is NodeType.GEQ:
-                curr = Sentence(Sentence_Type.GEQ, lineno=expr.lineno)
-                aval_reg_size = 1
-            elif expr.node_type is NodeType.LT:
-                curr = Sentence(Sentence_Type.LT, lineno=expr.lineno)
-                aval_reg_size = 1
-            elif expr.node_type is NodeType.LEQ:
-                curr = Sentence(Sentence_Type.LEQ, lineno=expr.lineno)
-                aval_reg_size = 1
-            elif expr.node_type is NodeType.NOT:
-                curr = Sentence(Sentence_Type.NOT, lineno=expr.lineno)
-            else:  # NUM, IDENT, ARRAY, FUNC CALL
+            binary = BINARY_SENTENCES.get(expr.node_type)
+            if binary is None:  # NUM, IDENT, ARRAY, FUNC CALL
                 return self.__process_var_use(expr)
-            l_reg = self.__process_side_val(expr.info['lvar'])
-            r_reg = self.__process_side_val(expr.info['rvar'])
-
-            curr.info['lvar'] = self.__convert_to_target_length(l_reg, 32, expr.lineno)
-            curr.info['rvar'] = self.__convert_to_target_length(r_reg, 32, expr.lineno)
+            sentence_type, aval_reg_size = binary
+            l_reg = self.__process_side_val(expr.lvar)
+            r_reg = self.__process_side_val(expr.rvar)
+            lvar = self.__convert_to_target_length(l_reg, 32, expr.lineno)
+            rvar = self.__convert_to_target_length(r_reg, 32, expr.lineno)
 
             aval_reg = self.__create_tmp_reg()
-            aval_reg_info = {
-                "type": Reg_Type.TMP_REG,
-                "reg": aval_reg,
-                "size": aval_reg_size
-            }
-            curr.info['avar'] = aval_reg_info
+            aval_reg_info = Reg(Reg_Type.TMP_REG, aval_reg, aval_reg_size)
+            curr = Operation(sentence_type, lineno=expr.lineno, avar=aval_reg_info, lvar=lvar, rvar=rvar)
             self.__set_label_and_keep_base_block(curr)
             self.__result.append(curr)
             return aval_reg_info
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：batch.py
+@Author ：OrangeJ
+@Date ：2026/10/18 23:20
+"""
+
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+import traceback
+
+"""
+多文件批量编译
+
+命令行给出多个输入文件、通配符或清单文件（@list.txt，每行一个路径或通配符，#开头为注释）时，
+在ProcessPoolExecutor中并行编译：每个工作进程只导入一次编译器，依次编译分配给它的多个文件。
+各文件的产物写入输出目录下与源文件相对路径一致的文件，屏幕输出被捕获后按输入顺序汇总。
+单个输入时命令行也会调用expand_inputs，multiprocessing等模块只在批量编译时导入。
+"""
+
+GLOB_CHARS = "*?["
+MANIFEST_PREFIX = "@"
+
+
+def expand_inputs(inputs: list[str]) -> tuple[list[str], bool]:
+    """
+    展开通配符与清单文件，重复的文件只保留第一次出现
+
+    :param inputs: 命令行中的输入
+    :return: (源文件列表, 是否为批量编译)
+    """
+    files = []
+    batch = len(inputs) > 1
+    for item in inputs:
+        if item.startswith(MANIFEST_PREFIX) and not os.path.exists(item):
+            batch = True
+            with open(item[len(MANIFEST_PREFIX):], "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f]
+            files += expand_inputs([i for i in lines if i and not i.startswith("#")])[0]
+        elif not os.path.exists(item) and any(c in item for c in GLOB_CHARS):
+            batch = True
+            files += sorted(glob.glob(item, recursive=True))
+        else:
+            files.append(item)
+    return list(dict.fromkeys(files)), batch
+
+
+def forward_args(argv: list[str], inputs: list[str]) -> list[str]:
+    """
+    去掉命令行参数中的输入、-o与--jobs，其余参数原样用于每个文件
+
+    :param argv: 命令行参数
+    :param inputs: 命令行中的输入（展开前）
+    :return: 参数列表
+    """
+    pending = list(inputs)
+    forward = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in pending:
+            pending.remove(arg)
+        elif arg in ("-o", "--jobs"):
+            skip = True
+        elif not (arg.startswith("-o") or arg.startswith("--jobs=")):
+            forward.append(arg)
+    return forward
+
+
+def output_path(source: str, root: str, directory: str, suffix: str) -> str:
+    """
+    产物路径：输出目录 + 源文件相对于root的路径，扩展名替换为suffix
+    """
+    relative = os.path.relpath(os.path.abspath(source), root)
+    return os.path.join(directory, os.path.splitext(relative)[0] + suffix)
+
+
+def run_captured(argv: list[str]) -> dict:
+    """
+    在当前进程中执行一次命令行编译，捕获屏幕输出与退出码
+
+    :param argv: 命令行参数
+    :return: {"exit": 退出码, "stdout": 标准输出, "stderr": 标准错误}
+    """
+    from miniC import main
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            main(argv)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return {"exit": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def _compile(job: tuple[str, list[str], str]) -> dict:
+    source, argv, output = job
+    try:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    except OSError as e:
+        # 单个文件的输出路径不可写时只记为该文件失败
+        result = {"exit": 1, "stdout": "", "stderr": f"[ERROR] {e}\n"}
+    else:
+        result = run_captured([source] + argv + ["-o", output])
+    result["source"] = source
+    result["output"] = output
+    return result
+
+
+def compile_batch(sources: list[str], argv: list[str], directory: str, suffix: str, jobs: int = None,
+                  success: int = 0) -> int:
+    """
+    并行编译多个源文件，按输入顺序输出各文件的状态与屏幕输出，最后输出汇总
+
+    :param sources: 源文件列表
+    :param argv: 用于每个文件的参数（不含输入与-o）
+    :param directory: 输出目录
+    :param suffix: 产物扩展名
+    :param jobs: 进程数，默认为CPU核数
+    :param success: 编译成功时单个文件的退出码（生成控制流图成功时为99）
+    :return: 退出码，有文件失败时为1
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(i)) for i in sources])
+    tasks = [(i, argv, output_path(i, root, directory, suffix)) for i in sources]
+    workers = min(jobs or os.cpu_count() or 1, len(tasks))
+    # 每个进程分到若干批任务，减少进程间通信次数，同时保留一定的负载均衡
+    chunksize = max(1, len(tasks) // (workers * 4))
+    failed = 0
+    start = time.perf_counter()
+    # 常驻服务的工作进程为守护进程，不能再创建子进程，此时串行编译
+    daemon = multiprocessing.current_process().daemon
+    with contextlib.nullcontext() if daemon or workers == 1 else ProcessPoolExecutor(workers) as pool:
+        results = map(_compile, tasks) if pool is None else pool.map(_compile, tasks, chunksize=chunksize)
+        for res in results:
+            if res["exit"] == success:
+                print(f"[ OK  ] {res['source']} -> {res['output']}")
+            else:
+                failed += 1
+                print(f"[ERROR] {res['source']} exited with {res['exit']}")
+            sys.stdout.write(res["stdout"])
+            sys.stderr.write(res["stderr"])
+            sys.stdout.flush()
+    cost = time.perf_counter() - start
+    print(f"{len(tasks)} files, {len(tasks) - failed} succeeded, {failed} failed, "
+          f"{cost:.2f}s, jobs={workers if pool is not None else 1}")
+    return 1 if failed else 0
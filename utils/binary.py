@@ -0,0 +1,469 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：binary.py
+@Author ：OrangeJ
+@Date ：2026/10/18 19:40
+"""
+
+import contextlib
+from array import array
+from collections.abc import Iterable, Iterator
+from enum import Enum
+from typing import BinaryIO, Any
+
+from utils.lex import SYMBOLS, TOKEN_TYPES, TOKEN_KINDS, LineIndex, Token
+from utils.yacc import NodeType, Node, Root, FuncDef, ArrayDef, Block, While, If, Else, Return, BinOp, UnaryLeft, \
+    UnaryRight, ArrayRef, Call
+from utils.analyzer import Sentence_Type, Sentence, Jump, Branch, VarDefine, FuncDefine, FuncCall, FuncReturn, \
+    Operation, Operand, Reg, Const, ArrayRef as ArrayOperand
+
+"""
+二进制交换格式
+
+用于在进程或机器之间传递Token序列、语法树与语义分析得到的Sentence列表，仅依赖标准库。
+文件结构：
+    魔数 b"MNCB"
+    版本号                          // varint，当前为FORMAT_VERSION
+    内容种类                         // varint，见Payload
+    字符串表                         // varint个数，随后每项为varint字节数 + UTF-8字节
+    内容                            // 见下
+整数均为LEB128 varint，有符号数先做zigzag变换；字符串均以字符串表下标引用，
+NodeType、Sentence_Type与Token类型以整数编码（前两者为枚举的value，Token类型为lex.TOKEN_KINDS中的下标）。
+标识符ID（symbol）只在进程内有效，因此只记录是否存在，读取时以其拼写在当前进程的SYMBOLS中重新登记。
+
+Token序列：
+    行首偏移表个数，每个表为 起始行号 + 偏移个数 + 差分编码的行首偏移
+    Token个数，每个Token为 类型编码*2+是否为标识符 + 值 + 与上一个Token的偏移差 + 行首偏移表下标
+语法树与Sentence列表：
+    单个带标签的值，标签见下方T_*，结点为 结点类编码 + 结点类型编码 + 是否有symbol + 其余各字段的值（按Node.fields顺序）
+    Sentence为 Sentence类编码 + Sentence_Type编码 + 其余各字段的值（按Sentence.fields顺序），
+    操作数为 操作数类编码 + 各字段的值（按Operand.fields顺序）
+"""
+
+MAGIC = b"MNCB"
+FORMAT_VERSION = 2
+
+
+class Payload(Enum):
+    TOKENS = 1
+    AST = 2
+    SENTENCES = 3
+
+
+PAYLOAD_KINDS = frozenset(i.value for i in Payload)
+
+
+class BinaryFormatError(ValueError):
+    """
+    文件不是本格式、版本不受支持、内容种类不符，或内容被截断、损坏
+    """
+
+
+# 值标签
+T_NONE = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3
+T_STR = 4
+T_LIST = 5
+T_TUPLE = 6
+T_DICT = 7
+T_NODE = 8
+T_SENTENCE = 9
+T_OPERAND = 10
+
+# 结点类编码，只能在末尾追加，调整顺序需提升FORMAT_VERSION
+NODE_CLASSES = (Node, Root, FuncDef, ArrayDef, Block, While, If, Else, Return, BinOp, UnaryLeft, UnaryRight,
+                ArrayRef, Call)
+NODE_CLASS_CODES = {cls: code for code, cls in enumerate(NODE_CLASSES)}
+# Sentence类与操作数类编码，规则同上
+SENTENCE_CLASSES = (Sentence, Jump, Branch, VarDefine, FuncDefine, FuncCall, FuncReturn, Operation)
+SENTENCE_CLASS_CODES = {cls: code for code, cls in enumerate(SENTENCE_CLASSES)}
+OPERAND_CLASSES = (Reg, Const, ArrayOperand)
+OPERAND_CLASS_CODES = {cls: code for code, cls in enumerate(OPERAND_CLASSES)}
+# 结点类编码 -> 结点类型与symbol之外需要写出的字段
+NODE_VALUE_FIELDS = tuple(tuple(name for name in cls.fields[1:] if name != 'symbol') for cls in NODE_CLASSES)
+
+
+class _Writer:
+    def __init__(self, payload: Payload):
+        self.payload = payload
+        self.body = bytearray()
+        self.strings: dict[str, int] = {}
+
+    def uint(self, n: int) -> None:
+        body = self.body
+        while n > 0x7f:
+            body.append(n & 0x7f | 0x80)
+            n >>= 7
+        body.append(n)
+
+    def int(self, n: int) -> None:
+        self.uint(n << 1 if n >= 0 else (-n << 1) - 1)
+
+    def str(self, s: str) -> None:
+        index = self.strings.get(s)
+        if index is None:
+            index = self.strings[s] = len(self.strings)
+        self.uint(index)
+
+    def value(self, o: Any) -> None:
+        # 深层嵌套的语法树（如数千个操作数的表达式链）不能递归写出：以显式栈按先序写出，
+        # 栈中为各层尚未写出的字段值的迭代器，标量直接写出，遇到容器或结点时写出其头部并压栈
+        body = self.body
+        stack = [iter((o,))]
+        while stack:
+            for o in stack[-1]:
+                # bool为int的子类，需先于int判断
+                if o is None:
+                    body.append(T_NONE)
+                elif o is True:
+                    body.append(T_TRUE)
+                elif o is False:
+                    body.append(T_FALSE)
+                elif isinstance(o, str):
+                    body.append(T_STR)
+                    self.str(o)
+                elif isinstance(o, int):
+                    body.append(T_INT)
+                    self.int(o)
+                else:
+                    stack.append(self.header(o))
+                    break
+            else:
+                stack.pop()
+
+    def header(self, o: Any) -> Iterator[Any]:
+        """
+        写出容器、结点、Sentence或操作数的头部
+
+        :return: 其后需依次写出的值
+        """
+        if isinstance(o, Node):
+            code = NODE_CLASS_CODES.get(type(o))
+            if code is None:
+                raise TypeError(f"can't serialize {type(o).__name__}")
+            self.body.append(T_NODE)
+            self.uint(code)
+            self.int(o.node_type.value)
+            # 有symbol的结点其value即为标识符拼写
+            self.body.append(o.symbol >= 0)
+            return (getattr(o, name) for name in NODE_VALUE_FIELDS[code])
+        elif isinstance(o, Operand):
+            code = OPERAND_CLASS_CODES.get(type(o))
+            if code is None:
+                raise TypeError(f"can't serialize {type(o).__name__}")
+            self.body.append(T_OPERAND)
+            self.uint(code)
+            return (getattr(o, name) for name in OPERAND_CLASSES[code].fields)
+        elif isinstance(o, (list, tuple)):
+            self.body.append(T_LIST if isinstance(o, list) else T_TUPLE)
+            self.uint(len(o))
+            return iter(o)
+        elif isinstance(o, dict):
+            self.body.append(T_DICT)
+            self.uint(len(o))
+            return (i for item in o.items() for i in item)
+        elif isinstance(o, Sentence):
+            code = SENTENCE_CLASS_CODES.get(type(o))
+            if code is None:
+                raise TypeError(f"can't serialize {type(o).__name__}")
+            self.body.append(T_SENTENCE)
+            self.uint(code)
+            self.int(o.sentence_type.value)
+            return (getattr(o, name) for name in SENTENCE_CLASSES[code].fields[1:])
+        raise TypeError(f"can't serialize {type(o).__name__}")
+
+    def write(self, fp: BinaryIO) -> None:
+        head = _Writer(self.payload)
+        head.body += MAGIC
+        head.uint(FORMAT_VERSION)
+        head.uint(self.payload.value)
+        head.uint(len(self.strings))
+        for s in self.strings:
+            raw = s.encode("utf-8", "surrogatepass")
+            head.uint(len(raw))
+            head.body += raw
+        fp.write(head.body)
+        fp.write(self.body)
+
+
+class _Reader:
+    def __init__(self, data: bytes, payload: Payload):
+        if data[:len(MAGIC)] != MAGIC:
+            raise BinaryFormatError("not a miniC binary file")
+        self.data = data
+        self.pos = len(MAGIC)
+        version = self.uint()
+        if version != FORMAT_VERSION:
+            raise BinaryFormatError(f"unsupported format version {version}, expected {FORMAT_VERSION}")
+        kind = self.uint()
+        if kind != payload.value:
+            found = Payload(kind).name if kind in PAYLOAD_KINDS else f"unknown ({kind})"
+            raise BinaryFormatError(f"expected {payload.name} payload, found {found}")
+        strings = []
+        with self.checked():
+            for _ in range(self.uint()):
+                size = self.uint()
+                if self.pos + size > len(data):
+                    raise BinaryFormatError(f"truncated string at offset {self.pos}")
+                strings.append(str(data[self.pos:self.pos + size], "utf-8", "surrogatepass"))
+                self.pos += size
+        self.strings = strings
+
+    @contextlib.contextmanager
+    def checked(self) -> Iterator[None]:
+        """
+        截断或损坏的内容（越界的下标、未知的枚举值等）统一报告为BinaryFormatError
+        """
+        try:
+            yield
+        except BinaryFormatError:
+            raise
+        except (IndexError, TypeError, ValueError) as e:
+            raise BinaryFormatError(f"corrupt data at offset {self.pos}: {e}") from None
+
+    def uint(self) -> int:
+        data = self.data
+        pos = self.pos
+        try:
+            byte = data[pos]
+            pos += 1
+            if byte < 0x80:
+                self.pos = pos
+                return byte
+            n = byte & 0x7f
+            shift = 7
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                n |= (byte & 0x7f) << shift
+                shift += 7
+        except IndexError:
+            raise BinaryFormatError(f"truncated varint at offset {self.pos}") from None
+        self.pos = pos
+        return n
+
+    def int(self) -> int:
+        n = self.uint()
+        return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+    def str(self) -> str:
+        return self.strings[self.uint()]
+
+    def value(self) -> Any:
+        """
+        读取一个带标签的值
+
+        与_Writer.value相同不使用递归：容器、结点、Sentence与操作数读出头部后压栈，
+        标量直接填入栈顶，栈顶的字段值读满时出栈，作为上一层的字段值继续填入
+        """
+        data = self.data
+        # 栈底为虚拟的单元素列表，其中即为最终结果
+        frame = [T_LIST, None, None, 1, []]
+        stack = [frame]
+        while True:
+            _, _, _, count, values = frame
+            while len(values) < count:
+                tag = data[self.pos]
+                self.pos += 1
+                if tag == T_INT:
+                    values.append(self.int())
+                elif tag == T_STR:
+                    values.append(self.strings[self.uint()])
+                elif tag == T_NONE:
+                    values.append(None)
+                elif tag == T_FALSE:
+                    values.append(False)
+                elif tag == T_TRUE:
+                    values.append(True)
+                else:
+                    child = self.header(tag)
+                    if not child[3]:
+                        values.append(self.build(child))
+                        continue
+                    stack.append(child)
+                    break
+            else:
+                stack.pop()
+                if not stack:
+                    return values[0]
+                stack[-1][4].append(self.build(frame))
+            frame = stack[-1]
+
+    def header(self, tag: int) -> list:
+        """
+        读出容器、结点、Sentence或操作数的头部
+
+        :return: [标签, 对象, 字段名, 字段值个数, 已读出的字段值]
+        """
+        if tag == T_LIST or tag == T_TUPLE:
+            return [tag, None, None, self.uint(), []]
+        elif tag == T_DICT:
+            return [tag, None, None, self.uint() * 2, []]
+        elif tag == T_NODE:
+            code = self.uint()
+            cls = NODE_CLASSES[code]
+            node = cls.__new__(cls)
+            node.node_type = NodeType(self.int())
+            # 暂存是否有symbol，字段读满后再登记
+            node.symbol = self.data[self.pos]
+            self.pos += 1
+            names = NODE_VALUE_FIELDS[code]
+            return [tag, node, names, len(names), []]
+        elif tag == T_SENTENCE:
+            cls = SENTENCE_CLASSES[self.uint()]
+            sentence = cls.__new__(cls)
+            sentence.sentence_type = Sentence_Type(self.int())
+            names = cls.fields[1:]
+            return [tag, sentence, names, len(names), []]
+        elif tag == T_OPERAND:
+            cls = OPERAND_CLASSES[self.uint()]
+            return [tag, cls.__new__(cls), cls.fields, len(cls.fields), []]
+        raise BinaryFormatError(f"unknown tag {tag} at offset {self.pos - 1}")
+
+    @staticmethod
+    def build(frame: list) -> Any:
+        """
+        字段值读满后构造对象
+        """
+        tag, obj, names, _, values = frame
+        if tag == T_LIST:
+            return values
+        elif tag == T_TUPLE:
+            return tuple(values)
+        elif tag == T_DICT:
+            return dict(zip(values[::2], values[1::2]))
+        for name, value in zip(names, values):
+            setattr(obj, name, value)
+        if tag == T_NODE:
+            obj.symbol = SYMBOLS.intern(obj.value) if obj.symbol else -1
+        return obj
+
+    def expect_value(self, tag: int) -> Any:
+        if self.pos >= len(self.data):
+            raise BinaryFormatError(f"missing content at offset {self.pos}")
+        if self.data[self.pos] != tag:
+            raise BinaryFormatError(f"unexpected tag {self.data[self.pos]} at offset {self.pos}")
+        with self.checked():
+            return self.value()
+
+
+def dump_tokens(tokens: Iterable[Token], fp: BinaryIO) -> None:
+    """
+    写出Token序列，Token所引用的行首偏移表一并写出（会扫描至源码末尾）
+
+    :param tokens: Token生成器或序列（包括TokenBuffer）
+    :param fp: 二进制文件流
+    :return:
+    """
+    w = _Writer(Payload.TOKENS)
+    line_tables: dict[int, int] = {}
+    tables: list[LineIndex] = []
+    encoded = _Writer(Payload.TOKENS)
+    encoded.strings = w.strings
+    count = 0
+    offset = 0
+    for token in tokens:
+        table = line_tables.get(id(token.lines))
+        if table is None:
+            table = line_tables[id(token.lines)] = len(tables)
+            tables.append(token.lines)
+        encoded.uint(TOKEN_KINDS[token.type] << 1 | (token.symbol >= 0))
+        encoded.str(token.value)
+        encoded.int(token.offset - offset)
+        encoded.uint(table)
+        offset = token.offset
+        count += 1
+    w.uint(len(tables))
+    for lines in tables:
+        lines.build()
+        w.int(lines.first_line)
+        w.uint(len(lines.starts))
+        previous = 0
+        for start in lines.starts:
+            w.int(start - previous)
+            previous = start
+    w.uint(count)
+    w.body += encoded.body
+    w.write(fp)
+
+
+def load_tokens(fp: BinaryIO) -> list[Token]:
+    """
+    读取Token序列，标识符在当前进程的SYMBOLS中重新登记
+
+    :param fp: 二进制文件流
+    :return: Token列表，行号与列号可正常访问
+    """
+    r = _Reader(fp.read(), Payload.TOKENS)
+    with r.checked():
+        tables = []
+        for _ in range(r.uint()):
+            lines = LineIndex(None, line=r.int())
+            starts = array('q')
+            start = 0
+            for _ in range(r.uint()):
+                start += r.int()
+                starts.append(start)
+            lines.starts = starts
+            tables.append(lines)
+        tokens = []
+        offset = 0
+        for _ in range(r.uint()):
+            code = r.uint()
+            value = r.str()
+            offset += r.int()
+            tokens.append(Token(TOKEN_TYPES[code >> 1], value, offset, tables[r.uint()],
+                                SYMBOLS.intern(value) if code & 1 else -1))
+        return tokens
+
+
+def dump_ast(ast: Node, fp: BinaryIO) -> None:
+    """
+    写出语法树
+
+    :param ast: 语法树根结点（或任一子树）
+    :param fp: 二进制文件流
+    :return:
+    """
+    if type(ast) not in NODE_CLASS_CODES:
+        raise TypeError(f"can't serialize {type(ast).__name__}")
+    w = _Writer(Payload.AST)
+    w.value(ast)
+    w.write(fp)
+
+
+def load_ast(fp: BinaryIO) -> Node:
+    """
+    读取语法树，可直接交给Analyzer
+
+    :param fp: 二进制文件流
+    :return: 语法树根结点
+    """
+    return _Reader(fp.read(), Payload.AST).expect_value(T_NODE)
+
+
+def dump_sentences(sentences: list[Sentence], fp: BinaryIO) -> None:
+    """
+    写出语义分析结果
+
+    :param sentences: Analyzer.analysis()的返回值
+    :param fp: 二进制文件流
+    :return:
+    """
+    w = _Writer(Payload.SENTENCES)
+    w.value(list(sentences))
+    w.write(fp)
+
+
+def load_sentences(fp: BinaryIO) -> list[Sentence]:
+    """
+    读取语义分析结果，可直接交给IRGenerator
+
+    :param fp: 二进制文件流
+    :return: Sentence列表
+    """
+    return _Reader(fp.read(), Payload.SENTENCES).expect_value(T_LIST)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：cache.py
+@Author ：OrangeJ
+@Date ：2026/10/18 20:30
+"""
+
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any, BinaryIO, Optional
+
+"""
+编译产物缓存
+
+以 源码哈希 + 编译器指纹 + 影响产物的参数 为键，在缓存目录中保存各阶段的产物（Token、语法树、Sentence列表、IR）。
+编译器指纹由版本号与utils下全部模块的源码计算，修改编译器后旧缓存自然失效。
+
+目录结构为 <缓存目录>/<键的前2位>/<键>.<阶段>，每个文件的内容为
+    4字节小端序的日志长度 + 该阶段产生的屏幕输出（UTF-8） + 产物
+写入时先写临时文件再以os.replace原子替换，多个进程同时写入同一条目时读者只会看到完整的文件。
+命中时更新文件的修改时间，总大小超出上限时按修改时间从旧到新淘汰（LRU），直至低于上限的90%。
+缓存目录下的.usage为总大小的估计值：每次写入追加一条8字节的增量记录，只有估计值超出上限或记录过多时才扫描整个目录，
+扫描后以实际总大小重写该文件。多个进程同时写入时个别增量可能丢失，由下一次扫描校正。
+"""
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+# 写入中断遗留的临时文件超过该时间（秒）后在淘汰时清理
+STALE_TEMP_SECONDS = 3600
+TEMP_PREFIX = ".tmp-"
+LOG_LENGTH = struct.Struct("<I")
+USAGE_FILE = ".usage"
+USAGE_RECORD = struct.Struct("<q")
+# 增量记录超过该条数时扫描缓存目录，校正估计值并压缩记录
+USAGE_RESCAN_RECORDS = 4096
+# 淘汰时降到上限的该比例以下，留出余量，避免缓存已满时每次写入都扫描目录
+EVICT_TARGET = 0.9
+
+
+def compiler_fingerprint(version: str) -> str:
+    """
+    由版本号与utils下各模块源码计算编译器指纹
+
+    :param version: 编译器版本号
+    :return: 十六进制摘要
+    """
+    digest = hashlib.sha256(str(version).encode())
+    package = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package)):
+        if name.endswith(".py"):
+            digest.update(name.encode())
+            with open(os.path.join(package, name), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """
+    内容寻址的编译产物缓存
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, version: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = compiler_fingerprint(version)
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, path: str, flags: str = "") -> str:
+        """
+        计算源文件对应的缓存键
+
+        :param path: 源文件路径
+        :param flags: 影响产物的参数
+        :return: 十六进制键
+        """
+        digest = hashlib.sha256()
+        digest.update(self.fingerprint.encode())
+        digest.update(b"\0" + flags.encode() + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(2 ** 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def __path(self, key: str, phase: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{phase}")
+
+    def get(self, key: str, phase: str) -> Optional[tuple[bytes, str]]:
+        """
+        读取缓存条目
+
+        :param key: 缓存键
+        :param phase: 阶段名
+        :return: (产物, 日志)，未命中时返回None
+        """
+        path = self.__path(key, phase)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            # 不存在或刚被其他进程淘汰
+            return None
+        if len(data) >= LOG_LENGTH.size:
+            size, = LOG_LENGTH.unpack_from(data)
+            start = LOG_LENGTH.size + size
+            if start <= len(data):
+                try:
+                    return data[start:], data[LOG_LENGTH.size:start].decode("utf-8")
+                except UnicodeDecodeError:
+                    pass
+        # 文件损坏（如磁盘写满或被外部修改），删除后视为未命中
+        self.__remove(path)
+        return None
+
+    def put(self, key: str, phase: str, payload: bytes, log: str = "") -> None:
+        """
+        写入缓存条目，随后按需淘汰
+
+        :param key: 缓存键
+        :param phase: 阶段名
+        :param payload: 产物
+        :param log: 该阶段产生的屏幕输出，命中时原样输出
+        :return:
+        """
+        path = self.__path(key, phase)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        raw = log.encode("utf-8")
+        size = LOG_LENGTH.size + len(raw) + len(payload)
+        try:
+            replaced = os.stat(path).st_size
+        except OSError:
+            replaced = 0
+        fd, temp = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(LOG_LENGTH.pack(len(raw)))
+                f.write(raw)
+                f.write(payload)
+            os.replace(temp, path)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+        self.__record_usage(size - replaced)
+
+    def __record_usage(self, delta: int) -> None:
+        """
+        追加一条总大小的增量记录，估计值超出上限或记录过多时扫描目录并淘汰
+
+        :param delta: 本次写入使总大小增加的字节数
+        :return:
+        """
+        usage = os.path.join(self.directory, USAGE_FILE)
+        try:
+            fd = os.open(usage, os.O_RDWR | os.O_APPEND)
+        except FileNotFoundError:
+            # 尚无估计值（新目录或旧版本的缓存），扫描一次并写入
+            self.evict()
+            return
+        try:
+            os.write(fd, USAGE_RECORD.pack(delta))
+            os.lseek(fd, 0, os.SEEK_SET)
+            data = b"".join(iter(lambda: os.read(fd, 2 ** 16), b""))
+        finally:
+            os.close(fd)
+        count = len(data) // USAGE_RECORD.size
+        total = sum(i for i, in USAGE_RECORD.iter_unpack(data[:count * USAGE_RECORD.size]))
+        if total > self.max_bytes or count > USAGE_RESCAN_RECORDS:
+            self.evict()
+
+    def load(self, key: str, phase: str, loader: Callable[[BinaryIO], Any]) -> Optional[tuple[Any, str]]:
+        """
+        读取缓存条目并以loader反序列化
+
+        :return: (产物, 日志)，未命中或条目无法反序列化时返回None
+        """
+        entry = self.get(key, phase)
+        if entry is None:
+            return None
+        try:
+            return loader(io.BytesIO(entry[0])), entry[1]
+        except (EOFError, IndexError, ValueError):
+            # 损坏的条目（binary.BinaryFormatError与json.JSONDecodeError均为ValueError）删除后视为未命中
+            self.__remove(self.__path(key, phase))
+            return None
+
+    def store(self, key: str, phase: str, dumper: Callable[[Any, BinaryIO], None], obj: Any, log: str = "") -> None:
+        """
+        以dumper序列化obj后写入缓存
+        """
+        buffer = io.BytesIO()
+        dumper(obj, buffer)
+        self.put(key, phase, buffer.getvalue(), log)
+
+    def evict(self) -> None:
+        """
+        总大小超出上限时按修改时间淘汰最久未使用的条目，并清理过期的临时文件，随后重写总大小的估计值
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.startswith(TEMP_PREFIX):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        self.__remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total > self.max_bytes:
+            target = int(self.max_bytes * EVICT_TARGET)
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                self.__remove(path)
+                total -= size
+        self.__write_usage(total)
+
+    def __write_usage(self, total: int) -> None:
+        fd, temp = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(USAGE_RECORD.pack(total))
+            os.replace(temp, os.path.join(self.directory, USAGE_FILE))
+        except OSError:
+            self.__remove(temp)
+
+    @staticmethod
+    def __remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            # 其他进程已淘汰
+            pass
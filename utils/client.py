@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：client.py
+@Author ：OrangeJ
+@Date ：2026/10/18 22:40
+"""
+
+import json
+import os
+import socket
+import sys
+
+"""
+常驻编译服务的瘦客户端
+
+只依赖标准库中的少数模块，不导入编译器与服务端（asyncio、multiprocessing），使--connect的启动开销接近空解释器。
+"""
+
+# 转发给服务端的环境变量前缀
+ENV_PREFIX = "MINIC_"
+
+
+def connect(path: str, argv: list[str]) -> int:
+    """
+    瘦客户端：将命令行参数转发给编译服务，原样输出结果
+
+    :param path: Unix域套接字路径
+    :param argv: 不含--connect的命令行参数
+    :return: 退出码
+    """
+    request = {
+        "id": 0,
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)},
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        print("[ERROR] compile server closed the connection without a response", file=sys.stderr)
+        return 1
+    response = json.loads(line)
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit"]
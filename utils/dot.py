@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：dot.py
+@Author ：OrangeJ
+@Date ：2026/10/18 15:40
+"""
+
+from typing import TextIO, Union
+
+from utils.yacc import Node, NodeType
+
+BINARY_LABELS = {
+    NodeType.ASSIGN: "=",
+    NodeType.LOGIC_OR: "||",
+    NodeType.LOGIC_AND: "&&",
+    NodeType.PLUS: "+",
+    NodeType.MINUS: "-",
+    NodeType.TIMES: "*",
+    NodeType.DIVIDE: "/",
+    NodeType.MOD: "%",
+}
+
+COMPARE_TYPES = (NodeType.GT, NodeType.GEQ, NodeType.LT, NodeType.LEQ, NodeType.EQ, NodeType.NEQ)
+
+DEFINE_LABELS = {
+    NodeType.INT_VAR: "int",
+    NodeType.POINTER_INT_VAR: "int*",
+    NodeType.INT_ARRAY: "int",
+}
+
+# gv图中的一个点：(标签, 子结点, 形状)，子结点可以是AST结点也可以是仅用于展示的点
+Vertex = tuple[str, list, Union[str, None]]
+
+
+def _quote(label: str) -> str:
+    return '"' + label.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class DotGenerator:
+    """
+    AST转gv图（DOT格式）
+
+    遍历AST逐行生成DOT语句，不构造graphviz.Digraph，可以直接流式写入文件。
+    遍历使用显式栈，不受AST深度限制。
+    """
+
+    def __init__(self, ast: Node):
+        self.ast = ast
+
+    def lines(self):
+        """
+        DOT语句生成器
+
+        :return: 逐行产生DOT源码
+        """
+        yield "digraph G {"
+        counter = 0
+        stack = [(counter, self.ast)]
+        while stack:
+            vid, item = stack.pop()
+            label, children, shape = self.__expand(item)
+            if shape is None:
+                yield f"\t{vid} [label={_quote(label)}]"
+            else:
+                yield f"\t{vid} [label={_quote(label)} shape={shape}]"
+            pending = []
+            for child in children:
+                counter += 1
+                yield f"\t{vid} -> {counter}"
+                pending.append((counter, child))
+            stack.extend(reversed(pending))
+        yield "}"
+
+    def write(self, stream: TextIO) -> None:
+        """
+        将DOT源码写入stream
+
+        :param stream: 文本流
+        :return:
+        """
+        for line in self.lines():
+            stream.write(line)
+            stream.write("\n")
+
+    @staticmethod
+    def render(path: str, fmt: str = "png") -> str:
+        """
+        调用graphviz将已写出的DOT文件渲染为图片
+
+        :param path: DOT文件路径
+        :param fmt: 图片格式
+        :return: 图片路径
+        """
+        import graphviz
+        return graphviz.render("dot", fmt, path)
+
+    @staticmethod
+    def __define(node: Node) -> Vertex:
+        """
+        变量、数组、参数定义：类型 -> 标识符 -> 维度
+        """
+        label = DEFINE_LABELS[node.node_type]
+        dims = []
+        if node.node_type is NodeType.INT_ARRAY:
+            label += "[]" * len(node.dims)
+            # 参数中的数组维度可能省略，以ANY表示
+            dims = [i or ("ANY", [], None) for i in node.dims]
+        return label, [(node.value, dims, None)], None
+
+    def __expand(self, item: Union[Node, Vertex]) -> Vertex:
+        if isinstance(item, tuple):
+            return item
+        node_type = item.node_type
+        if node_type is NodeType.ROOT:
+            return "root", [("program", item.program, "rectangle")], "rectangle"
+        elif node_type in (NodeType.INT_FUNC, NodeType.VOID_FUNC):
+            paras = ("paras", [self.__define(i) for i in item.paras], None)
+            children = [paras] if item.funcbody is None else [paras, item.funcbody]
+            label = "int func" if node_type is NodeType.INT_FUNC else "void func"
+            return label, [(item.value, children, None)], None
+        elif node_type in DEFINE_LABELS:
+            return self.__define(item)
+        elif node_type is NodeType.BLOCK:
+            return "Block", item.subprogram, None
+        elif node_type is NodeType.WHILE:
+            return "while", [i for i in (item.condition, item.statement) if i is not None], None
+        elif node_type is NodeType.IF:
+            return "if", [i for i in (item.condition, item.statement, item.elsestat) if i is not None], None
+        elif node_type is NodeType.ELSE:
+            return "else", [] if item.statement is None else [item.statement], None
+        elif node_type is NodeType.RETURN:
+            return "return", [] if item.return_expr is None else [item.return_expr], None
+        elif node_type in BINARY_LABELS:
+            return BINARY_LABELS[node_type], [item.lvar, item.rvar], None
+        elif node_type in COMPARE_TYPES:
+            return item.value, [item.lvar, item.rvar], None
+        elif node_type is NodeType.UNARY_LEFT:
+            return "UL", [item.lop, item.target], None
+        elif node_type is NodeType.UNARY_RIGHT:
+            return "UR", [item.rop, item.target], None
+        elif node_type is NodeType.ARRAY:
+            return item.value + "[]" * len(item.indices), list(item.indices), None
+        elif node_type is NodeType.FUNC:
+            return item.value + "()", list(item.args), None
+        else:
+            # NUM、IDENT、BREAK、CONTINUE以及一元运算符
+            return item.value, [], None
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：fold.py
+@Author ：OrangeJ
+@Date ：2026/10/18 23:50
+"""
+
+from collections.abc import Callable
+from typing import Optional
+
+from utils.yacc import Node, NodeType, Root, FuncDef, Block, While, If, Return, BinOp, UnaryLeft, UnaryRight, \
+    ArrayRef, Call
+
+"""
+常量折叠与代数化简
+
+在语法分析与语义分析之间原地改写AST：
+1. 两侧均为NUM的二元运算、NUM上的取负与逻辑非按C语言32位int语义求值，替换为NUM结点，
+   除数为0以及INT_MIN / -1、INT_MIN % -1（溢出）保持原样，由运行时决定；
+2. x + 0、0 + x、x - 0、x * 1、1 * x、x / 1化简为x，x为32位的整型值（变量、数组元素或算术运算）时才化简，
+   比较与逻辑运算的结果在语义分析中为i1，化简后位宽会改变；
+3. x && 非0、非0 && x、x || 0、0 || x化简为x != 0，省去短路求值所需的标签与跳转。
+化简只丢弃常量操作数，含变量、函数调用与赋值的子表达式不会被删除，语义错误与副作用均保持不变；
+赋值与自增自减的操作对象只化简其内部的子表达式，结点本身保持不变。
+"""
+
+INT_BITS = 32
+INT_MIN = -2 ** (INT_BITS - 1)
+
+
+def wrap_int(value: int) -> int:
+    """
+    按32位补码截断
+    """
+    return (value - INT_MIN) % 2 ** INT_BITS + INT_MIN
+
+
+def _divide(a: int, b: int) -> Optional[int]:
+    # C语言的除法向0取整，除数为0与溢出时不折叠
+    if b == 0 or (a == INT_MIN and b == -1):
+        return None
+    quotient = abs(a) // abs(b)
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+def _mod(a: int, b: int) -> Optional[int]:
+    quotient = _divide(a, b)
+    return None if quotient is None else a - b * quotient
+
+
+# 二元运算结点类型 -> 两侧均为常量时的求值函数，返回None表示不折叠
+BINARY_FOLDS: dict[NodeType, Callable[[int, int], Optional[int]]] = {
+    NodeType.PLUS: lambda a, b: wrap_int(a + b),
+    NodeType.MINUS: lambda a, b: wrap_int(a - b),
+    NodeType.TIMES: lambda a, b: wrap_int(a * b),
+    NodeType.DIVIDE: _divide,
+    NodeType.MOD: _mod,
+    NodeType.LT: lambda a, b: int(a < b),
+    NodeType.LEQ: lambda a, b: int(a <= b),
+    NodeType.GT: lambda a, b: int(a > b),
+    NodeType.GEQ: lambda a, b: int(a >= b),
+    NodeType.EQ: lambda a, b: int(a == b),
+    NodeType.NEQ: lambda a, b: int(a != b),
+    NodeType.LOGIC_AND: lambda a, b: int(a != 0 and b != 0),
+    NodeType.LOGIC_OR: lambda a, b: int(a != 0 or b != 0),
+}
+
+# 前缀一元运算符结点类型 -> 操作数为常量时的求值函数
+UNARY_FOLDS: dict[NodeType, Callable[[int], int]] = {
+    NodeType.NEGATIVE: lambda a: wrap_int(-a),
+    NodeType.NOT: lambda a: int(a == 0),
+}
+
+# 算术运算结点类型 -> (左侧单位元, 右侧单位元)，None表示该侧没有单位元
+IDENTITIES: dict[NodeType, tuple[Optional[int], Optional[int]]] = {
+    NodeType.PLUS: (0, 0),
+    NodeType.MINUS: (None, 0),
+    NodeType.TIMES: (1, 1),
+    NodeType.DIVIDE: (None, 1),
+}
+
+# 在语义分析中求值为32位整型的表达式结点
+INT_VALUED = frozenset((NodeType.IDENT, NodeType.ARRAY, NodeType.PLUS, NodeType.MINUS, NodeType.TIMES,
+                        NodeType.DIVIDE, NodeType.MOD))
+
+# 每个表达式结点都要判断，经由NodeType访问枚举成员较慢
+_NUM = NodeType.NUM
+_ASSIGN = NodeType.ASSIGN
+
+
+def fold_constants(ast: Root) -> Root:
+    """
+    对各函数体中的表达式进行常量折叠与代数化简
+
+    :param ast: 语法分析得到的AST，原地修改
+    :return: 修改后的AST
+    """
+    for node in ast.program:
+        if isinstance(node, FuncDef) and node.funcbody is not None:
+            _fold_statement(node.funcbody)
+    return ast
+
+
+def _num(value: int, lineno: int) -> Node:
+    return Node(NodeType.NUM, lineno, str(value))
+
+
+def _fold_statement(statement: Optional[Node]) -> Optional[Node]:
+    if statement is None:
+        return None
+    if isinstance(statement, Block):
+        statement.subprogram = [_fold_statement(i) for i in statement.subprogram]
+    elif isinstance(statement, While):
+        statement.condition = _fold(statement.condition)
+        statement.statement = _fold_statement(statement.statement)
+    elif isinstance(statement, If):
+        statement.condition = _fold(statement.condition)
+        statement.statement = _fold_statement(statement.statement)
+        if statement.elsestat is not None:
+            statement.elsestat.statement = _fold_statement(statement.elsestat.statement)
+    elif isinstance(statement, Return):
+        if statement.return_expr is not None:
+            statement.return_expr = _fold(statement.return_expr)
+    elif statement.node_type not in (NodeType.INT_VAR, NodeType.POINTER_INT_VAR, NodeType.INT_ARRAY,
+                                     NodeType.BREAK, NodeType.CONTINUE):
+        return _fold(statement)
+    return statement
+
+
+def _fold(expr: Node) -> Node:
+    """
+    折叠表达式
+
+    宏展开后的常量链可达数千层，与Yacc.__y_expr相同以显式栈后序遍历，不受递归深度限制
+
+    :param expr: 表达式结点
+    :return: 替换该结点的结点，可能为expr本身
+    """
+    # (结点, 子表达式是否已折叠)；子表达式的替换结点按顺序压入values
+    stack = [(expr, False)]
+    values = []
+    while stack:
+        node, ready = stack.pop()
+        cls = node.__class__
+        if cls is Node:
+            # 叶子结点（NUM、IDENT）直接返回
+            values.append(node)
+        elif ready:
+            values.append(_fold_node(node, cls, values))
+        else:
+            stack.append((node, True))
+            stack.extend((i, False) for i in reversed(_operands(node, cls)))
+    return values[0]
+
+
+def _operands(node: Node, cls: type) -> tuple[Node, ...]:
+    if cls is BinOp:
+        return node.lvar, node.rvar
+    elif cls is UnaryLeft or cls is UnaryRight:
+        return node.target,
+    elif cls is ArrayRef:
+        return node.indices
+    elif cls is Call:
+        return node.args
+    return ()
+
+
+def _fold_node(node: Node, cls: type, values: list[Node]) -> Node:
+    """
+    子表达式均已折叠后折叠结点本身
+
+    :param values: 末尾为该结点各子表达式的替换结点，取出后删除
+    :return: 替换该结点的结点
+    """
+    if cls is BinOp:
+        rvar = node.rvar = values.pop()
+        lvar = values.pop()
+        if node.node_type is _ASSIGN:
+            # 左值只化简其内部的子表达式，不替换结点本身，保持原有的错误信息
+            return node
+        node.lvar = lvar
+        if lvar.node_type is _NUM or rvar.node_type is _NUM:
+            return _fold_binary(node)
+    elif cls is UnaryLeft:
+        target = values.pop()
+        fold = UNARY_FOLDS.get(node.lop.node_type)
+        # ++, --的操作对象只化简其内部的子表达式
+        if fold is not None:
+            node.target = target
+            if target.node_type is _NUM:
+                return _num(fold(wrap_int(int(target.value))), node.lineno)
+    elif cls is UnaryRight:
+        values.pop()
+    elif cls is ArrayRef:
+        count = len(node.indices)
+        if count:
+            node.indices = tuple(values[-count:])
+            del values[-count:]
+    elif cls is Call:
+        count = len(node.args)
+        if count:
+            node.args = tuple(values[-count:])
+            del values[-count:]
+    return node
+
+
+def _fold_binary(expr: BinOp) -> Node:
+    lvar, rvar = expr.lvar, expr.rvar
+    l_const = wrap_int(int(lvar.value)) if lvar.node_type is _NUM else None
+    r_const = wrap_int(int(rvar.value)) if rvar.node_type is _NUM else None
+    if l_const is not None and r_const is not None:
+        value = BINARY_FOLDS[expr.node_type](l_const, r_const)
+        return expr if value is None else _num(value, expr.lineno)
+
+    n_type = expr.node_type
+    identities = IDENTITIES.get(n_type)
+    if identities is not None:
+        l_identity, r_identity = identities
+        if r_const is not None and r_const == r_identity and lvar.node_type in INT_VALUED:
+            return lvar
+        if l_const is not None and l_const == l_identity and rvar.node_type in INT_VALUED:
+            return rvar
+    elif n_type is NodeType.LOGIC_AND or n_type is NodeType.LOGIC_OR:
+        # 常量一侧不影响结果时，逻辑运算等价于另一侧与0比较
+        neutral = (lambda c: c != 0) if n_type is NodeType.LOGIC_AND else (lambda c: c == 0)
+        if r_const is not None and neutral(r_const):
+            return BinOp(NodeType.NEQ, expr.lineno, lvar, _num(0, expr.lineno), "!=")
+        if l_const is not None and neutral(l_const):
+            return BinOp(NodeType.NEQ, expr.lineno, rvar, _num(0, expr.lineno), "!=")
+    return expr
@@ -6,22 +6,17 @@
 @Author ：OrangeJ
 @Date ：2022/5/18 20:30
 """
-import sys
 import io
 from typing import Union
 
-try:
-    import imageio
-    from matplotlib import pyplot as plt
-except ImportError as e:
-    print(f"[ERROR] {e}")
-    sys.exit(0)
+# imageio and matplotlib are imported on first use, callers handle the ImportError if they are missing
 
 
 class GifGenerator:
 
     @staticmethod
     def png2gif(frames: list, gif_name, duration=1.0):
+        import imageio
         imageio.mimsave(gif_name, frames, 'GIF', duration=duration)
 
     @staticmethod
@@ -46,6 +41,8 @@ class GifGenerator:
         :param background_color:
         :return:
         """
+        import imageio
+        from matplotlib import pyplot as plt
         plt.figure(figsize=(width, height), facecolor=background_color, dpi=dpi)
         plt.axis('off')
         out = io.BytesIO()
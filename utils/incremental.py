@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：incremental.py
+@Author ：OrangeJ
+@Date ：2026/10/18 14:26
+"""
+
+from bisect import bisect_left, bisect_right
+
+from utils.lex import Lex, LineIndex
+from utils.yacc import Yacc, Node, Root
+
+
+class Segment:
+    """
+    一个顶层定义（<segment>）解析得到的结点
+
+    结点的行号相对于定义的起始行（起始行为第1行），定义的起始偏移与行号记录在IncrementalParser中
+    """
+    __slots__ = ('nodes',)
+
+    def __init__(self, nodes: list[Node]):
+        self.nodes = nodes
+
+
+def _shift_lineno(nodes: list[Node], delta: int) -> None:
+    """
+    平移结点及其全部子结点的行号
+    """
+    stack = list(nodes)
+    visited = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        node.lineno += delta
+        stack.extend(node.children())
+
+
+class IncrementalParser:
+    """
+    增量词法、语法分析
+
+    记录每个顶层定义的起始偏移与行号。源码被修改后，从受影响的第一个定义开始重新词法分析、语法分析，
+    直到Token重新对齐到某个未被修改的定义的起点为止，新结点拼接回ast.program，其余定义的结点原样保留。
+
+    与lex.LineIndex相同，结点只记录相对于所在定义起始行的行号，绝对行号由定义的起始行换算（见lineno）。
+    各定义的起始偏移、起始行号与首个结点在ast.program中的下标保存在三张表中，修改点之后的表项
+    不逐项平移，而是记录一个待平移量，由下标不小于__gap的表项共享，下一次修改时只需在两个修改点之间
+    结算。重新分析的开销只与被修改的定义的大小以及两次修改的距离有关，与文件大小无关。
+    """
+
+    def __init__(self, source: str = ""):
+        self.source = ""
+        self.segments: list[Segment] = []
+        # 下标不小于__gap的表项尚需加上__pending中对应的平移量
+        self.__starts: list[int] = []
+        self.__lines: list[int] = []
+        self.__firsts: list[int] = []
+        self.__gap = 0
+        self.__pending = (0, 0, 0)
+        self.ast = Root()
+        self.update(0, 0, source)
+
+    def segment_start(self, index: int) -> int:
+        """
+        第index个定义的起始偏移
+        """
+        return self.__starts[index] + (self.__pending[0] if index >= self.__gap else 0)
+
+    def segment_line(self, index: int) -> int:
+        """
+        第index个定义的起始行号
+        """
+        return self.__lines[index] + (self.__pending[1] if index >= self.__gap else 0)
+
+    def lineno(self, index: int, node: Node) -> int:
+        """
+        第index个定义中的结点在源码中的行号
+        """
+        return self.segment_line(index) + node.lineno - 1
+
+    def __first_node(self, index: int) -> int:
+        # 第index个定义的首个结点在ast.program中的下标，index可以为定义个数
+        if index == len(self.__firsts):
+            return len(self.ast.program)
+        return self.__firsts[index] + (self.__pending[2] if index >= self.__gap else 0)
+
+    def __find(self, offset: int, lo: int = 0, right: bool = False) -> int:
+        """
+        在起始偏移表中二分查找，同bisect_left（right为True时同bisect_right）
+        """
+        search = bisect_right if right else bisect_left
+        starts, gap = self.__starts, self.__gap
+        if lo < gap:
+            i = search(starts, offset, lo, gap)
+            if i < gap:
+                return i
+            lo = gap
+        return search(starts, offset - self.__pending[0], lo, len(starts))
+
+    def __move_gap(self, gap: int) -> None:
+        """
+        将待平移量的起点移动到gap，只结算两者之间的表项
+        """
+        old = self.__gap
+        d_start, d_line, d_node = self.__pending
+        if d_start or d_line or d_node:
+            starts, lines, firsts = self.__starts, self.__lines, self.__firsts
+            if gap < old:
+                d_start, d_line, d_node = -d_start, -d_line, -d_node
+            for i in range(min(old, gap), max(old, gap)):
+                starts[i] += d_start
+                lines[i] += d_line
+                firsts[i] += d_node
+        self.__gap = gap
+
+    def update(self, start: int, end: int, text: str) -> Node:
+        """
+        将源码中[start, end)替换为text，并增量更新语法树
+
+        语法错误时抛出YaccError，此前的状态保持不变
+
+        :param start: 修改起始偏移（基于修改前的源码）
+        :param end: 修改结束偏移（基于修改前的源码）
+        :param text: 替换内容
+        :return: 更新后的语法树根结点，结点行号相对于所在定义的起始行
+        """
+        old = self.source
+        if not 0 <= start <= end <= len(old):
+            raise ValueError(f"invalid edit range [{start}, {end}) for source of length {len(old)}")
+        source = old[:start] + text + old[end:]
+        delta = len(text) - (end - start)
+        delta_lines = text.count('\n') - old.count('\n', start, end)
+        segments = self.segments
+
+        # 修改所在的定义，紧贴定义起点的修改也可能影响前一个定义，因此按start - 1查找
+        first = max(self.__find(start - 1, right=True) - 1, 0)
+        # 起点不早于修改结束位置的定义内容未变，可作为重新对齐的候选
+        resume = self.__find(end)
+        if segments and self.segment_start(first) <= start:
+            pos, line = self.segment_start(first), self.segment_line(first)
+        else:
+            pos, line = 0, 1
+        column = pos - source.rfind('\n', 0, pos)
+
+        sync = len(segments)
+
+        def stop(offset: int) -> bool:
+            nonlocal sync
+            j = self.__find(offset - delta, resume)
+            if j < len(segments) and self.segment_start(j) == offset - delta:
+                sync = j
+                return True
+            return False
+
+        lines = LineIndex(source, pos, line, column)
+        yy = Yacc(Lex(source).get_token(pos, lines), recover=False)
+        parsed = []
+        for offset, nodes in yy.segments(stop):
+            seg_line = lines.line(offset)
+            _shift_lineno(nodes, 1 - seg_line)
+            parsed.append((offset, seg_line, nodes))
+
+        # 拼接：[first, sync)被重新解析的定义替换，sync之后的定义只累加待平移量
+        self.__move_gap(sync)
+        begin = self.__first_node(first)
+        count = self.__first_node(sync) - begin
+        program_nodes, firsts = [], []
+        for _, _, nodes in parsed:
+            firsts.append(begin + len(program_nodes))
+            program_nodes.extend(nodes)
+        d_start, d_line, d_node = self.__pending
+        self.__pending = (d_start + delta, d_line + delta_lines, d_node + len(program_nodes) - count)
+        self.ast.program[begin:begin + count] = program_nodes
+        self.__starts[first:sync] = [offset for offset, _, _ in parsed]
+        self.__lines[first:sync] = [seg_line for _, seg_line, _ in parsed]
+        self.__firsts[first:sync] = firsts
+        segments[first:sync] = [Segment(nodes) for _, _, nodes in parsed]
+        self.__gap = first + len(parsed)
+        if self.__gap == len(segments):
+            self.__pending = (0, 0, 0)
+        self.source = source
+        return self.ast
@@ -8,17 +8,18 @@
 """
 
 import re
-import hashlib
-import random
 from collections import namedtuple
 
-from utils.analyzer import Sentence, Sentence_Type
+from utils.analyzer import Sentence, Sentence_Type, Operand, Reg, Const, ArrayRef, Reg_Type, VarDefine, FuncCall, \
+    FuncReturn, Operation
 
 DEFINE = "define"
 DECLARE = "declare"
 
 GLOBAL_PREFIX = "@"
 LOCAL_PREFIX = "%"
+# separator of array element pointer names (%aad.1, %aad.1.load); identifiers can't contain it
+ARRAY_PTR_SEPARATOR = "."
 
 VAR_NAME_PATTERN = r'[-a-zA-Z_][-a-zA-Z0-9_]*'
 
@@ -173,24 +174,6 @@ attributes #1 = { "correctly-rounded-divide-sqrt-fp-math"="false" "disable-tail-
 T_V = namedtuple("T_V", ["type", "value"])
 
 
-def rand(typ: int = 0, length: int = 6) -> str:
-    Digit = "0123456789"
-    LAlpha = "abcdefghijklmnopqrstuvwxyz"
-    BAlpha = "ABCDEFGHIJKLMNOPQRISUVWXYZ"
-    if typ < 1:
-        target = Digit + LAlpha + BAlpha
-    elif typ < 2:
-        target = Digit + LAlpha
-    elif typ < 3:
-        target = LAlpha + BAlpha
-    else:
-        target = Digit
-    res = ""
-    for i in range(length):
-        res += random.choice(target)
-    return res
-
-
 class LLVM:
     """
     仅实现最基础的（miniC会用到的）部分。后续重构会完善
@@ -486,8 +469,20 @@ class IRGenerator:
                    Sentence_Type.GEQ]
         self.J = [Sentence_Type.JMP, Sentence_Type.IF_JMP]
         self.F = [Sentence_Type.DEFINE_FUNC, Sentence_Type.FUNC_END]
+        # sentence type -> handler, one lookup per sentence instead of a chain of membership tests
+        self.__handlers = {Sentence_Type.CALL: self.__g_CALL,
+                           Sentence_Type.RETURN: self.__g_RETURN,
+                           Sentence_Type.ZEXT: self.__g_ZEXT,
+                           Sentence_Type.LOAD: self.__g_LOAD,
+                           Sentence_Type.PHI: self.__g_PHI}
+        for types, handler in ((self.GDS, self.__g_GDS), (self.LDS, self.__g_LDS), (self.BC, self.__g_BC),
+                               (self.LC, self.__g_LC), (self.J, self.__g_J), (self.F, self.__g_F)):
+            self.__handlers.update(dict.fromkeys(types, handler))
         self.res = []
         self.used_label = set()
+        # per-instance counter for names of temporary pointers, keeps the output deterministic
+        # and lets several generators run in different threads
+        self.__suffix_counter = 0
 
     def get_ir(self) -> list[str]:
         self.res.append(STD_FILE)
@@ -499,97 +494,88 @@ class IRGenerator:
         return self.res
 
     def __process(self):
+        handlers = self.__handlers
         for i in self.sentences:
             if i.label is not None:
                 self.res.append(self.ir.set_label_(i.label))
-            if i.sentence_type in self.GDS:
-                self.__g_GDS(i)
-            elif i.sentence_type in self.LDS:
-                self.__g_LDS(i)
-            elif i.sentence_type in self.BC:
-                self.__g_BC(i)
-            elif i.sentence_type in self.LC:
-                self.__g_LC(i)
-            elif i.sentence_type in self.J:
-                self.__g_J(i)
-            elif i.sentence_type in self.F:
-                self.__g_F(i)
-            elif i.sentence_type is Sentence_Type.CALL:
-                args = []
-                f_type = "i32" if i.info['func_type'] == 'int' else 'void'
-                avar = i.info.get('avar', None)
-                if avar and avar.get('dimension') is not None:
-                    avar = self.__proc_array(avar)
-                for para in i.info['args']:
-                    if para.get('dimension', None):
-                        para = self.__proc_array(para)
-                        v_type = self.ir.set_type(para['size'])
-                    elif para.get('define_dime', None):
-                        dd = para.get('define_dime', None)
-                        t = [{"type": "num", "value": 0, "size": 32} for i in range(len(dd))]
-                        n_para = {
-                            "type": para.get("type"),
-                            "reg": para.get("reg"),
-                            "size": para.get("size"),
-                            "dimension": t,
-                            "define_dime": dd
-                        }
-                        para = self.__proc_array(n_para, False)
-                        v_type = self.ir.set_type(para['size'], [None])
-                    else:
-                        v_type = self.ir.set_type(para['size'])
-                    val = para.get('reg') if para.get('reg') else para.get('value')
-                    args.append(T_V(v_type, val))
-                ir = self.ir.call_(f_type, i.info['func'], args)
-                if avar:
-                    ir = self.ir.set_res(avar['reg'], ir)
-                self.res.append(self.ir.set_tab(ir))
-            elif i.sentence_type is Sentence_Type.RETURN:
-                ret = i.info.get('return_reg', None)
-                if ret:
-                    if ret.get('dimension', None):
-                        ret = self.__proc_array(ret)
-                    val = ret.get('reg') if ret.get('reg') else ret.get('value')
-                    v_type = self.ir.set_type(ret['size'])
-                    ir = self.ir.ret_(v_type, val)
-                else:
-                    ir = self.ir.ret_()
-                self.res.append(self.ir.set_tab(ir))
-            elif i.sentence_type is Sentence_Type.ZEXT:
-                rvar = i.info['rvar']
-                avar = i.info['avar']
-                s_type = self.ir.set_type(rvar['size'])
-                t_type = self.ir.set_type(avar['size'])
-                ir = self.ir.zext_(s_type, rvar['reg'], t_type)
-                ir = self.ir.set_res(avar['reg'], ir)
-                self.res.append(self.ir.set_tab(ir))
-            elif i.sentence_type is Sentence_Type.LOAD:
-                avar: dict = i.info['avar']
-                if isinstance(avar.get('dimension'), list):
-                    avar = self.__proc_array(avar)
-                rvar: dict = i.info['rvar']
-                if isinstance(rvar.get('dimension'), list):
-                    rvar = self.__proc_array(rvar)
-                    r_type = self.ir.set_type(rvar['size'])
-                else:
-                    r_type = self.ir.set_type(avar['size'], rvar.get('define_dime'))
-                a_val = avar.get('reg')
-                r_val = rvar.get('reg')
-                ir = self.ir.load_(r_type, r_val)
-                ir = self.ir.set_res(a_val, ir)
-                self.res.append(self.ir.set_tab(ir))
-            elif i.sentence_type is Sentence_Type.PHI:
-                avar: dict = i.info['avar']
-                if isinstance(avar.get('dimension'), list):
-                    avar = self.__proc_array(avar)
-                t_ty = self.ir.set_type(i.info['size'])
-                flags = i.info['flags']
-                ir = self.ir.phi_(t_ty, flags)
-                ir = self.ir.set_res(avar.get('reg'), ir)
-                self.res.append(self.ir.set_tab(ir))
+            handler = handlers.get(i.sentence_type)
+            if handler is not None:
+                handler(i)
             else:
                 print(f"Unknown Sentence Type {i.sentence_type.name}")
 
+    def __g_CALL(self, sent: FuncCall) -> None:
+        args = []
+        f_type = "i32" if sent.func_type == 'int' else 'void'
+        avar = sent.avar
+        if avar and avar.dimension is not None:
+            avar = self.__proc_array(avar)
+        for para in sent.args:
+            if para.dimension:
+                para = self.__proc_array(para)
+                v_type = self.ir.set_type(para.size)
+            elif para.define_dime:
+                dd = para.define_dime
+                t = [Const(0) for _ in range(len(dd))]
+                n_para = ArrayRef(para.type, para.reg, para.size, t, dd)
+                para = self.__proc_array(n_para, False)
+                v_type = self.ir.set_type(para.size, [None])
+            else:
+                v_type = self.ir.set_type(para.size)
+            val = para.reg if para.reg else para.value
+            args.append(T_V(v_type, val))
+        ir = self.ir.call_(f_type, sent.func, args)
+        if avar:
+            ir = self.ir.set_res(avar.reg, ir)
+        self.res.append(self.ir.set_tab(ir))
+
+    def __g_RETURN(self, sent: FuncReturn) -> None:
+        ret = sent.return_reg
+        if ret:
+            if ret.dimension:
+                ret = self.__proc_array(ret)
+            val = ret.reg if ret.reg else ret.value
+            v_type = self.ir.set_type(ret.size)
+            ir = self.ir.ret_(v_type, val)
+        else:
+            ir = self.ir.ret_()
+        self.res.append(self.ir.set_tab(ir))
+
+    def __g_ZEXT(self, sent: Operation) -> None:
+        rvar = sent.rvar
+        avar = sent.avar
+        s_type = self.ir.set_type(rvar.size)
+        t_type = self.ir.set_type(avar.size)
+        ir = self.ir.zext_(s_type, rvar.reg, t_type)
+        ir = self.ir.set_res(avar.reg, ir)
+        self.res.append(self.ir.set_tab(ir))
+
+    def __g_LOAD(self, sent: Operation) -> None:
+        avar = sent.avar
+        if isinstance(avar.dimension, list):
+            avar = self.__proc_array(avar)
+        rvar = sent.rvar
+        if isinstance(rvar.dimension, list):
+            rvar = self.__proc_array(rvar)
+            r_type = self.ir.set_type(rvar.size)
+        else:
+            r_type = self.ir.set_type(avar.size, rvar.define_dime)
+        a_val = avar.reg
+        r_val = rvar.reg
+        ir = self.ir.load_(r_type, r_val)
+        ir = self.ir.set_res(a_val, ir)
+        self.res.append(self.ir.set_tab(ir))
+
+    def __g_PHI(self, sent: Sentence) -> None:
+        avar: Operand = sent.info['avar']
+        if isinstance(avar.dimension, list):
+            avar = self.__proc_array(avar)
+        t_ty = self.ir.set_type(sent.info['size'])
+        flags = sent.info['flags']
+        ir = self.ir.phi_(t_ty, flags)
+        ir = self.ir.set_res(avar.reg, ir)
+        self.res.append(self.ir.set_tab(ir))
+
     def __remove_unused_label(self):
         label_pattern = "[%s]*(L[0-9a-zA-Z]+):[%s]*"
         for i in self.res:
@@ -599,16 +585,20 @@ class IRGenerator:
                 if label not in self.used_label:
                     self.res.remove(i)
 
-    def __proc_array(self, var: dict, load: bool = True) -> dict:
-        d = var.get('dimension')
-        dd = var.get('define_dime')
+    def __next_suffix(self) -> str:
+        self.__suffix_counter += 1
+        return str(self.__suffix_counter)
+
+    def __proc_array(self, var: Operand, load: bool = True) -> Reg:
+        d = var.dimension
+        dd = var.define_dime
         dd = dd[:]
-        ptr = var.get('reg')
+        ptr = var.reg
         t_ptr = ptr.replace("@", "%")
         if not dd[0]:
-            suffix = hashlib.md5(rand().encode('utf-8')).hexdigest()[:6]
-            t_ptr = f"{t_ptr}_{suffix}"
-            t_type = self.ir.set_type(var.get('size'), dd)
+            suffix = self.__next_suffix()
+            t_ptr = f"{t_ptr}{ARRAY_PTR_SEPARATOR}{suffix}"
+            t_type = self.ir.set_type(var.size, dd)
             ir = self.ir.load_(t_type, ptr)
             ir = self.ir.set_res(t_ptr, ir)
             self.res.append(self.ir.set_tab(ir))
@@ -620,28 +610,28 @@ class IRGenerator:
             else:
                 dd = dd[1:]
                 d = d[1:]
-            if t.get('dimension'):
+            if t.dimension:
                 t = self.__proc_array(t)
-            suffix = hashlib.md5(rand().encode('utf-8')).hexdigest()[:6]
-            t_ptr = f"{t_ptr}_{suffix}"
-            t_type = self.ir.set_type(var.get('size'), dd)
-            v_type = self.ir.set_type(t.get('size'))
-            val = t.get('reg') if t.get('reg') else t.get('value')
+            suffix = self.__next_suffix()
+            t_ptr = f"{t_ptr}{ARRAY_PTR_SEPARATOR}{suffix}"
+            t_type = self.ir.set_type(var.size, dd)
+            v_type = self.ir.set_type(t.size)
+            val = t.reg if t.reg else t.value
             ir = self.ir.getelementptr_(t_type, f"{t_type}*", ptr, v_type, val, True)
             ir = self.ir.set_res(t_ptr, ir)
             self.res.append(self.ir.set_tab(ir))
             ptr = t_ptr
         for curr in d:
-            if curr.get('dimension'):
+            if curr.dimension:
                 curr = self.__proc_array(curr)
-            suffix = hashlib.md5(rand().encode('utf-8')).hexdigest()[:6]
-            t_ptr = f"{t_ptr}_{suffix}"
-            val = curr.get('reg') if curr.get('reg') else curr.get('value')
-            v_type = self.ir.set_type(curr.get('size'))
+            suffix = self.__next_suffix()
+            t_ptr = f"{t_ptr}{ARRAY_PTR_SEPARATOR}{suffix}"
+            val = curr.reg if curr.reg else curr.value
+            v_type = self.ir.set_type(curr.size)
             if len(dd) == 1 and not dd[0]:
-                a_type = self.ir.set_type(var.get('size'))
+                a_type = self.ir.set_type(var.size)
             else:
-                a_type = self.ir.set_type(var.get('size'), dd)
+                a_type = self.ir.set_type(var.size, dd)
             ir = self.ir.getelementptr_(a_type, f"{a_type}*", ptr, v_type, val)
             ir = self.ir.set_res(t_ptr, ir)
             self.res.append(self.ir.set_tab(ir))
@@ -650,55 +640,54 @@ class IRGenerator:
                 dd = dd[1:]
 
         if load:
-            r_ptr = f"{t_ptr}_load"
-            ir = self.ir.load_(self.ir.set_type(var.get('size')), t_ptr)
+            r_ptr = f"{t_ptr}{ARRAY_PTR_SEPARATOR}load"
+            ir = self.ir.load_(self.ir.set_type(var.size), t_ptr)
             ir = self.ir.set_res(r_ptr, ir)
             self.res.append(self.ir.set_tab(ir))
         else:
             r_ptr = t_ptr
-        return {
-            "reg": r_ptr,
-            "size": var.get('size')
-        }
-
-    def __g_GDS(self, sent: Sentence) -> None:
-        if sent.info.get("dimension", None) is None:
-            v_type = self.ir.set_type(sent.info['size'])
+        return Reg(Reg_Type.TMP_REG, r_ptr, var.size)
+
+    def __g_GDS(self, sent: VarDefine) -> None:
+        var = sent.var
+        if var.dimension is None:
+            v_type = self.ir.set_type(var.size)
             ir = self.ir.set_global_var_(v_type)
         else:
-            v_type = self.ir.set_type(sent.info['size'], sent.info['define_dime'])
+            v_type = self.ir.set_type(var.size, var.define_dime)
             ir = self.ir.set_global_var_(v_type, False)
-        ir = self.ir.set_res(sent.info['reg'], ir)
+        ir = self.ir.set_res(var.reg, ir)
         self.res.append(self.ir.set_tab(ir))
 
-    def __g_LDS(self, sent: Sentence) -> None:
-        if sent.info.get("dimension", None) is None:
-            v_type = self.ir.set_type(sent.info['size'])
+    def __g_LDS(self, sent: VarDefine) -> None:
+        var = sent.var
+        if var.dimension is None:
+            v_type = self.ir.set_type(var.size)
             ir = self.ir.alloca_(v_type, align=4)
         else:
-            v_type = self.ir.set_type(sent.info['size'], sent.info['define_dime'])
+            v_type = self.ir.set_type(var.size, var.define_dime)
             ir = self.ir.alloca_(v_type, align=16)
-        ir = self.ir.set_res(sent.info['reg'], ir)
+        ir = self.ir.set_res(var.reg, ir)
         self.res.append(self.ir.set_tab(ir))
 
-    def __g_BC(self, sent: Sentence) -> None:
-        rvar: dict = sent.info['rvar']
-        if isinstance(rvar.get('dimension'), list):
+    def __g_BC(self, sent: Operation) -> None:
+        rvar = sent.rvar
+        if isinstance(rvar.dimension, list):
             rvar = self.__proc_array(rvar)
-            r_type = self.ir.set_type(rvar['size'])
+            r_type = self.ir.set_type(rvar.size)
         else:
-            r_type = self.ir.set_type(rvar['size'], rvar.get('define_dime'))
-        avar: dict = sent.info['avar']
-        if isinstance(avar.get('dimension'), list):
+            r_type = self.ir.set_type(rvar.size, rvar.define_dime)
+        avar = sent.avar
+        if isinstance(avar.dimension, list):
             avar = self.__proc_array(avar, False)
-        r_val = rvar.get('reg') if rvar.get('reg') else rvar.get('value')
+        r_val = rvar.reg if rvar.reg else rvar.value
         if sent.sentence_type is Sentence_Type.ASSIGN:
-            ir = self.ir.store_(r_type, r_val, avar.get('reg'))
+            ir = self.ir.store_(r_type, r_val, avar.reg)
         else:
-            lvar: dict = sent.info['lvar']
-            if lvar.get('dimension'):
+            lvar = sent.lvar
+            if lvar.dimension:
                 lvar = self.__proc_array(lvar)
-            l_val = lvar.get('reg') if lvar.get('reg') else lvar.get('value')
+            l_val = lvar.reg if lvar.reg else lvar.value
             if sent.sentence_type is Sentence_Type.ADD:
                 ir = self.ir.add_(r_type, l_val, r_val, nsw=True)
             elif sent.sentence_type is Sentence_Type.MINUS:
@@ -711,10 +700,10 @@ class IRGenerator:
                 ir = self.ir.srem_(r_type, l_val, r_val)
             else:  # sent.sentence_type is Sentence_Type.XOR
                 ir = self.ir.xor_(r_type, l_val, r_val)
-            ir = self.ir.set_res(avar['reg'], ir)
+            ir = self.ir.set_res(avar.reg, ir)
         self.res.append(self.ir.set_tab(ir))
 
-    def __g_LC(self, sent: Sentence) -> None:
+    def __g_LC(self, sent: Operation) -> None:
         if sent.sentence_type is Sentence_Type.EQ:
             logic = self.ir.eq_
         elif sent.sentence_type is Sentence_Type.NEQ:
@@ -727,45 +716,45 @@ class IRGenerator:
             logic = self.ir.sgt_
         else:  # sent.sentence_type is Sentence_Type.GEQ
             logic = self.ir.sge_
-        lvar: dict = sent.info['lvar']
-        if lvar.get('dimension') is not None:
+        lvar = sent.lvar
+        if lvar.dimension is not None:
             lvar = self.__proc_array(lvar)
-        rvar: dict = sent.info['rvar']
-        if rvar.get('dimension') is not None:
+        rvar = sent.rvar
+        if rvar.dimension is not None:
             rvar = self.__proc_array(rvar)
-        avar: dict = sent.info['avar']
-        if avar.get('dimension') is not None:
+        avar = sent.avar
+        if avar.dimension is not None:
             avar = self.__proc_array(avar)
-        l_type = self.ir.set_type(lvar['size'])
-        r_type = self.ir.set_type(rvar['size'])
-        l_val = lvar.get('reg') if lvar.get('reg') else lvar.get('value')
-        r_val = rvar.get('reg') if rvar.get('reg') else rvar.get('value')
+        l_type = self.ir.set_type(lvar.size)
+        r_type = self.ir.set_type(rvar.size)
+        l_val = lvar.reg if lvar.reg else lvar.value
+        r_val = rvar.reg if rvar.reg else rvar.value
         ir = logic(l_type, l_val, r_val)
-        ir = self.ir.set_res(avar['reg'], ir)
+        ir = self.ir.set_res(avar.reg, ir)
         self.res.append(self.ir.set_tab(ir))
 
     def __g_J(self, sent: Sentence) -> None:
         if sent.sentence_type is Sentence_Type.JMP:
-            ir = self.ir.br_(dest=sent.info['label'])
-            self.used_label.add(sent.info['label'])
+            ir = self.ir.br_(dest=sent.target)
+            self.used_label.add(sent.target)
         else:  # sent.sentence_type is Sentence_Type.IF_JMP
-            val = sent.info['var'].get('reg') if sent.info['var'].get('reg') else sent.info['var'].get('value')
-            ir = self.ir.br_(val, sent.info['tl'], sent.info['fl'])
-            self.used_label.add(sent.info['tl'])
-            self.used_label.add(sent.info['fl'])
+            var = sent.var
+            ir = self.ir.br_(var.reg if var.reg else var.value, sent.tl, sent.fl)
+            self.used_label.add(sent.tl)
+            self.used_label.add(sent.fl)
         self.res.append(self.ir.set_tab(ir))
 
     def __g_F(self, sent: Sentence) -> None:
         if sent.sentence_type is Sentence_Type.DEFINE_FUNC:
             paras = []
-            f_type = "i32" if sent.info['type'] == 'int' else 'void'
-            for para in sent.info['paras']:
-                para = para.info
-                if para.get('dimension', None):
-                    v_type = self.ir.set_type(para['size'], para['define_dime'])
+            f_type = "i32" if sent.func_type == 'int' else 'void'
+            for para in sent.paras:
+                para = para.var
+                if para.dimension:
+                    v_type = self.ir.set_type(para.size, para.define_dime)
                 else:
-                    v_type = self.ir.set_type(para['size'])
-                paras.append(T_V(v_type, para['reg']))
+                    v_type = self.ir.set_type(para.size)
+                paras.append(T_V(v_type, para.reg))
             ir = self.ir.set_func_(sent.value, f_type, paras)
             self.ir.tab_counter += 1
         else:  # sent.sentence_type is Sentence_Type.FUNC_END
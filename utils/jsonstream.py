@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：jsonstream.py
+@Author ：OrangeJ
+@Date ：2026/10/18 18:55
+"""
+
+import json
+from enum import Enum
+from collections.abc import Iterable, Iterator
+from typing import TextIO, TYPE_CHECKING
+
+from utils.lex import Token
+
+if TYPE_CHECKING:
+    from utils.yacc import Node
+
+"""
+流式JSON输出
+
+Token、AST与符号栈流直接逐段写入文件流，不先拼接出完整的字符串。
+Token以生成器逐个编码，内存占用与Token个数无关；AST与符号栈流借助json.dump的iterencode逐段写出。
+AST与符号栈流的编码器在写出时才导入，只输出Token时不导入语法与语义分析模块。
+"""
+
+COMPACT_SEPARATORS = (',', ':')
+
+
+class JsonStyle(Enum):
+    INDENT = 0  # 缩进4格，与json.dumps(..., indent=4)的输出完全一致
+    COMPACT = 1  # 无缩进与多余空格
+    NDJSON = 2  # 每行一条记录
+
+
+# Token的字段固定，按模板拼接，各字段仍由json.dumps转义，与逐个json.dumps(dict)的结果一致
+TOKEN_TEMPLATES = {
+    JsonStyle.INDENT: '\n        {{\n            "type": {},\n            "value": {},\n'
+                      '            "line": {},\n            "column": {}\n        }}',
+    JsonStyle.COMPACT: '{{"type":{},"value":{},"line":{},"column":{}}}',
+    JsonStyle.NDJSON: '{{"type":{},"value":{},"line":{},"column":{}}}\n',
+}
+
+
+def _iter_tokens(tokens: Iterable[Token], template: str) -> Iterator[str]:
+    dumps = json.dumps
+    for token in tokens:
+        yield template.format(dumps(token.type), dumps(token.value), dumps(token.line), dumps(token.column))
+
+
+def dump_tokens(tokens: Iterable[Token], fp: TextIO, style: JsonStyle = JsonStyle.INDENT) -> None:
+    """
+    写出Token序列，格式为{"tokens": [...]}，NDJSON时每行一个Token
+
+    :param tokens: Token生成器或序列
+    :param fp: 文本流
+    :param style: 输出格式
+    :return:
+    """
+    encoded = _iter_tokens(tokens, TOKEN_TEMPLATES[style])
+    if style is JsonStyle.NDJSON:
+        for text in encoded:
+            fp.write(text)
+        return
+    fp.write('{"tokens":[' if style is JsonStyle.COMPACT else '{\n    "tokens": [')
+    first = True
+    for text in encoded:
+        if not first:
+            fp.write(',')
+        first = False
+        fp.write(text)
+    if first:
+        fp.write(']}' if style is JsonStyle.COMPACT else ']\n}')
+    else:
+        fp.write(']}' if style is JsonStyle.COMPACT else '\n    ]\n}')
+
+
+def dump_ast(ast: "Node", fp: TextIO, style: JsonStyle = JsonStyle.INDENT) -> None:
+    """
+    写出语法树，格式为{"root": ...}，NDJSON时每行一个顶层定义
+
+    :param ast: 语法树根结点
+    :param fp: 文本流
+    :param style: 输出格式
+    :return:
+    """
+    from utils.yacc import CustomYaccEncoder
+    if style is JsonStyle.NDJSON:
+        for node in ast.program:
+            json.dump(node, fp, cls=CustomYaccEncoder, separators=COMPACT_SEPARATORS)
+            fp.write("\n")
+    elif style is JsonStyle.COMPACT:
+        json.dump({"root": ast}, fp, cls=CustomYaccEncoder, separators=COMPACT_SEPARATORS)
+    else:
+        json.dump({"root": ast}, fp, cls=CustomYaccEncoder, indent=4)
+
+
+def dump_stack_flow(variable_stack_flow: list, function_stack_flow: list, fp: TextIO,
+                    style: JsonStyle = JsonStyle.INDENT) -> None:
+    """
+    写出符号栈流，格式为{"VSF": {步骤: 栈}, "FSF": {步骤: 栈}}，NDJSON时每行一个步骤
+
+    :param variable_stack_flow: 变量栈流
+    :param function_stack_flow: 函数栈流
+    :param fp: 文本流
+    :param style: 输出格式
+    :return:
+    """
+    from utils.analyzer import CustomAnaEncoder
+    if style is JsonStyle.NDJSON:
+        for flow, frames in (("VSF", variable_stack_flow), ("FSF", function_stack_flow)):
+            for step, stack in enumerate(frames):
+                json.dump({"flow": flow, "step": step, "stack": stack}, fp, cls=CustomAnaEncoder,
+                          separators=COMPACT_SEPARATORS)
+                fp.write("\n")
+        return
+    flows = {
+        "VSF": dict(enumerate(variable_stack_flow)),
+        "FSF": dict(enumerate(function_stack_flow))
+    }
+    if style is JsonStyle.COMPACT:
+        json.dump(flows, fp, cls=CustomAnaEncoder, separators=COMPACT_SEPARATORS)
+    else:
+        json.dump(flows, fp, cls=CustomAnaEncoder, indent=4)
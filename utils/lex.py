@@ -7,8 +7,14 @@
 @Date ：2022/4/27 13:07
 """
 
+import os
 import re
+import mmap
+import threading
 import collections
+from array import array
+from bisect import bisect_right
+from typing import Union
 
 
 IDENT = r'(?P<IDENT>[a-zA-Z_][a-zA-Z0-9_]*)'
@@ -70,7 +76,304 @@ patterns = [HEX, OCT, DIG, LOGIC_AND, LOGIC_OR, SELF_PLUS, SELF_MINUS, EQ, NEQ,
             NL, WS, IDENT, UNKNOWN]
 
 
-Token = collections.namedtuple('Token', ['type', 'value', 'line'])
+class LineIndex:
+    """
+    行首偏移表
+
+    按需向后扫描换行符，记录每一行的起始偏移，行号与列号通过二分查找得到。
+    可以指定从源码中间某个位置开始建立索引（增量分析），此时需给出该位置的行号与列号。
+    """
+
+    def __init__(self, content: Union[str, bytes, mmap.mmap], start: int = 0, line: int = 1, column: int = 1):
+        self.content = content
+        # starts[0]为start所在行（第line行）的虚拟行首
+        self.starts = array('q', [start - column + 1])
+        self.first_line = line
+        self.__newline = '\n' if isinstance(content, str) else b'\n'
+        # 偏移小于scanned的换行符均已记录
+        self.__scanned = start
+
+    def __extend(self, offset: int) -> None:
+        content = self.content
+        newline = self.__newline
+        starts = self.starts
+        scanned = self.__scanned
+        while scanned <= offset:
+            found = content.find(newline, scanned)
+            if found < 0:
+                scanned = len(content) + 1
+                break
+            scanned = found + 1
+            starts.append(scanned)
+        self.__scanned = scanned
+
+    def build(self) -> None:
+        """
+        扫描至源码末尾，此后不再持有源码
+        """
+        if self.content is not None:
+            self.__extend(len(self.content))
+            self.content = None
+
+    def line(self, offset: int) -> int:
+        if offset >= self.__scanned and self.content is not None:
+            self.__extend(offset)
+        return bisect_right(self.starts, offset) + self.first_line - 1
+
+    def column(self, offset: int) -> int:
+        return self.position(offset)[1]
+
+    def position(self, offset: int) -> tuple[int, int]:
+        line = self.line(offset)
+        return line, offset - self.starts[line - self.first_line] + 1
+
+
+class StringTable:
+    """
+    标识符字符串表
+
+    词法分析时为每个不同的标识符分配一个自增的整数ID，语法树与符号表均以ID为键，
+    原始拼写可通过spelling()取回。表为进程内全局共享，查找命中时无需加锁。
+    """
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.spellings: list[str] = []
+        # 字节模式下以原始字节为键的缓存，避免重复解码
+        self.__raw: dict[bytes, int] = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.spellings)
+
+    def intern(self, spelling: str) -> int:
+        sid = self.ids.get(spelling)
+        if sid is None:
+            with self.__lock:
+                sid = self.ids.get(spelling)
+                if sid is None:
+                    sid = len(self.spellings)
+                    self.spellings.append(spelling)
+                    self.ids[spelling] = sid
+        return sid
+
+    def intern_bytes(self, raw: Union[bytes, memoryview]) -> int:
+        sid = self.__raw.get(raw)
+        if sid is None:
+            raw = bytes(raw)
+            sid = self.intern(raw.decode('utf-8', 'replace'))
+            self.__raw[raw] = sid
+        return sid
+
+    def spelling(self, sid: int) -> str:
+        return self.spellings[sid]
+
+
+SYMBOLS = StringTable()
+
+
+class Token(collections.namedtuple('Token', ['type', 'value', 'offset', 'lines', 'symbol'], defaults=(-1,))):
+    """
+    Token只记录其在源码中的偏移，行号与列号在访问时由lines（LineIndex）计算
+
+    标识符的symbol为其在SYMBOLS中的ID，其余Token为-1
+    """
+    __slots__ = ()
+
+    @property
+    def line(self) -> int:
+        return self.lines.line(self.offset)
+
+    @property
+    def column(self) -> int:
+        return self.lines.column(self.offset)
+
+    def __repr__(self) -> str:
+        return f"Token(type={self.type!r}, value={self.value!r}, line={self.line})"
+
+
+# 以下为手写表驱动扫描器所用的状态转移表，其识别结果与上方正则完全一致
+C_OTHER = 0  # 无法识别字符，产生UNKNOWN
+C_ALPHA = 1  # 标识符首字符 [a-zA-Z_]
+C_DIGIT = 2  # [1-9]
+C_ZERO = 3  # 0
+C_OP = 4  # 可能由两个字符组成的运算符
+C_PUNCT = 5  # 单字符运算符与界符
+C_SLASH = 6  # '/'，可能为除号或注释
+C_WS = 7  # 空白字符
+
+KEYWORDS = {
+    'int': 'INT',
+    'void': 'VOID',
+    'while': 'WHILE',
+    'for': 'FOR',
+    'if': 'IF',
+    'else': 'ELSE',
+    'switch': 'SWITCH',
+    'case': 'CASE',
+    'break': 'BREAK',
+    'continue': 'CONTINUE',
+    'return': 'RETURN',
+}
+
+# 运算符前缀树：首字符 -> (单字符类型, {第二个字符: 双字符类型})
+OPERATORS = {
+    '&': ('AND', {'&': 'LOGIC_AND'}),
+    '|': ('OR', {'|': 'LOGIC_OR'}),
+    '+': ('PLUS', {'+': 'SELF_PLUS'}),
+    '-': ('MINUS', {'-': 'SELF_MINUS'}),
+    '=': ('ASSIGN', {'=': 'EQ'}),
+    '!': ('NOT', {'=': 'NEQ'}),
+    '<': ('LT', {'=': 'LEQ'}),
+    '>': ('GT', {'=': 'GEQ'}),
+}
+
+PUNCTUATIONS = {
+    '*': 'TIMES',
+    '%': 'MOD',
+    '(': 'LPAREN',
+    ')': 'RPAREN',
+    '[': 'LBRACE',
+    ']': 'RBRACE',
+    '{': 'LBRACKET',
+    '}': 'RBRACKET',
+    ',': 'COMMA',
+    ';': 'SEMICOLON',
+}
+
+IDENT_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+DEC_CHARS = frozenset('0123456789')
+OCT_CHARS = frozenset('01234567')
+HEX_CHARS = frozenset('0123456789abcdefABCDEF')
+
+
+def _build_char_class() -> dict:
+    table = {}
+    for i in range(128):
+        ch = chr(i)
+        if ch.isalpha() or ch == '_':
+            table[ch] = C_ALPHA
+        elif ch == '0':
+            table[ch] = C_ZERO
+        elif ch.isdigit():
+            table[ch] = C_DIGIT
+        elif ch in OPERATORS:
+            table[ch] = C_OP
+        elif ch in PUNCTUATIONS:
+            table[ch] = C_PUNCT
+        elif ch == '/':
+            table[ch] = C_SLASH
+        elif ch.isspace():
+            table[ch] = C_WS
+        else:
+            table[ch] = C_OTHER
+    return table
+
+
+CHAR_CLASS = _build_char_class()
+
+
+def _is_word(ch: str) -> bool:
+    """
+    与正则中\\b的判定保持一致（Unicode单词字符）
+    """
+    return ch.isalnum() or ch == '_'
+
+
+# Token类型编码表，用于TokenBuffer中的紧凑存储
+TOKEN_TYPES = ('IDENT', 'DIG', 'HEX', 'OCT', 'DIVIDE', 'UNKNOWN') + tuple(KEYWORDS.values()) \
+              + tuple(PUNCTUATIONS.values()) \
+              + tuple(t for single, double in OPERATORS.values() for t in (single, *double.values()))
+TOKEN_KINDS = {t: i for i, t in enumerate(TOKEN_TYPES)}
+
+# 值固定的Token类型，其值无需从源码中切片或解码
+FIXED_VALUES = {'DIVIDE': '/'}
+FIXED_VALUES.update({v: k for k, v in KEYWORDS.items()})
+FIXED_VALUES.update({v: k for k, v in PUNCTUATIONS.items()})
+for _k, (_single, _double) in OPERATORS.items():
+    FIXED_VALUES[_single] = _k
+    FIXED_VALUES.update({_v: _k + _d for _d, _v in _double.items()})
+
+
+class TokenBuffer:
+    """
+    列式存储的Token序列
+
+    Token类型编码与起止偏移分别存放于紧凑的array中，不为每个Token创建对象，行号由LineIndex按需计算。
+    Token的值在访问时才从源码中获取：源码为bytes/mmap时view()返回零拷贝的memoryview，
+    源码为str时返回切片。通过下标访问时才会临时构造Token。
+    """
+
+    def __init__(self, source: Union[str, bytes, mmap.mmap]):
+        self.source = source
+        self.kinds = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+        # 标识符在SYMBOLS中的ID，其余Token为-1
+        self.symbols = array('l')
+        self.lines = LineIndex(source)
+        self.__view = None if isinstance(source, str) else memoryview(source)
+
+    def append(self, t_type: str, start: int, end: int) -> None:
+        self.kinds.append(TOKEN_KINDS[t_type])
+        self.starts.append(start)
+        self.ends.append(end)
+        if t_type == 'IDENT':
+            if self.__view is None:
+                self.symbols.append(SYMBOLS.intern(self.source[start:end]))
+            else:
+                self.symbols.append(SYMBOLS.intern_bytes(self.source[start:end]))
+        else:
+            self.symbols.append(-1)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> Token:
+        return Token(TOKEN_TYPES[self.kinds[index]], self.value(index), self.starts[index], self.lines,
+                     self.symbols[index])
+
+    def type(self, index: int) -> str:
+        return TOKEN_TYPES[self.kinds[index]]
+
+    def line(self, index: int) -> int:
+        return self.lines.line(self.starts[index])
+
+    def column(self, index: int) -> int:
+        return self.lines.column(self.starts[index])
+
+    def view(self, index: int) -> Union[str, memoryview]:
+        """
+        Token在源码中对应的片段，源码为bytes/mmap时不发生拷贝
+        """
+        if self.__view is None:
+            return self.source[self.starts[index]:self.ends[index]]
+        return self.__view[self.starts[index]:self.ends[index]]
+
+    def symbol(self, index: int) -> int:
+        return self.symbols[index]
+
+    def value(self, index: int) -> str:
+        sid = self.symbols[index]
+        if sid >= 0:
+            return SYMBOLS.spelling(sid)
+        value = FIXED_VALUES.get(TOKEN_TYPES[self.kinds[index]])
+        if value is None:
+            value = self.view(index)
+            if not isinstance(value, str):
+                value = str(value, 'utf-8', 'replace')
+        return value
+
+    def close(self) -> None:
+        """
+        释放对源码的引用，源码为mmap时将其关闭
+        """
+        self.lines.build()
+        if self.__view is not None:
+            self.__view.release()
+            self.__view = None
+        if isinstance(self.source, mmap.mmap):
+            self.source.close()
 
 
 class Lex:
@@ -78,15 +381,225 @@ class Lex:
         self.content = content
         self.token_map = re.compile('|'.join(patterns))
 
-    def get_token(self):
-        line = 1
+    def get_token(self, pos: int = 0, lines: LineIndex = None):
+        """
+        表驱动词法分析：按首字符类别分派，运算符按前缀树最长匹配，标识符扫描结束后查表识别关键字
+
+        :param pos: 开始扫描的偏移，必须位于Token边界
+        :param lines: 行首偏移表，从中间开始扫描时需给出对应起点的LineIndex
+        :return: Token生成器
+        """
+        content = self.content
+        if lines is None:
+            lines = LineIndex(content)
+        intern = SYMBOLS.intern
+        spellings = SYMBOLS.spellings
+        for t_type, start, end in self.scan(pos):
+            if t_type == 'IDENT':
+                sid = intern(content[start:end])
+                yield Token(t_type, spellings[sid], start, lines, sid)
+            else:
+                yield Token(t_type, content[start:end], start, lines)
+
+    def get_buffer(self) -> "TokenBuffer":
+        """
+        词法分析结果以列式TokenBuffer返回，不为每个Token单独创建对象
+
+        :return: TokenBuffer
+        """
+        buffer = TokenBuffer(self.content)
+        append = buffer.append
+        for t_type, start, end in self.scan():
+            append(t_type, start, end)
+        return buffer
+
+    def scan(self, pos: int = 0):
+        """
+        扫描器核心，仅产生(类型, 起始偏移, 结束偏移)
+
+        :param pos: 开始扫描的偏移
+        :return: 生成器
+        """
+        content = self.content
+        length = len(content)
+        char_class = CHAR_CLASS
+        while pos < length:
+            ch = content[pos]
+            cls = char_class.get(ch)
+            if cls is None:
+                # 非ASCII字符
+                cls = C_WS if ch.isspace() else C_OTHER
+            if cls == C_WS:
+                pos += 1
+            elif cls == C_ALPHA:
+                end = pos + 1
+                while end < length and content[end] in IDENT_CHARS:
+                    end += 1
+                t_type = KEYWORDS.get(content[pos:end])
+                if t_type is None or (pos and _is_word(content[pos - 1])) or (end < length and _is_word(content[end])):
+                    t_type = 'IDENT'
+                yield t_type, pos, end
+                pos = end
+            elif cls == C_PUNCT:
+                yield PUNCTUATIONS[ch], pos, pos + 1
+                pos += 1
+            elif cls == C_OP:
+                single, double = OPERATORS[ch]
+                t_type = double.get(content[pos + 1]) if pos + 1 < length else None
+                if t_type is None:
+                    yield single, pos, pos + 1
+                    pos += 1
+                else:
+                    yield t_type, pos, pos + 2
+                    pos += 2
+            elif cls == C_DIGIT:
+                end = pos + 1
+                while end < length and content[end] in DEC_CHARS:
+                    end += 1
+                yield 'DIG', pos, end
+                pos = end
+            elif cls == C_ZERO:
+                nxt = content[pos + 1] if pos + 1 < length else ''
+                if nxt == 'x' and pos + 2 < length and content[pos + 2] in HEX_CHARS:
+                    t_type, chars, end = 'HEX', HEX_CHARS, pos + 3
+                elif nxt in OCT_CHARS:
+                    t_type, chars, end = 'OCT', OCT_CHARS, pos + 2
+                else:
+                    t_type, chars, end = 'DIG', None, pos + 1
+                if chars is not None:
+                    while end < length and content[end] in chars:
+                        end += 1
+                yield t_type, pos, end
+                pos = end
+            elif cls == C_SLASH:
+                nxt = content[pos + 1] if pos + 1 < length else ''
+                if nxt == '/':
+                    end = content.find('\n', pos)
+                    pos = length if end < 0 else end
+                else:
+                    end = content.find('*/', pos + 2) if nxt == '*' else -1
+                    if end < 0:
+                        yield 'DIVIDE', pos, pos + 1
+                        pos += 1
+                    else:
+                        pos = end + 2
+            else:
+                yield 'UNKNOWN', pos, pos + 1
+                pos += 1
+
+    def get_token_regex(self):
+        """
+        基于单一正则的原始实现，保留用于对照验证与性能基准
+
+        :return: Token生成器
+        """
+        lines = LineIndex(self.content)
         scanner = self.token_map.scanner(self.content)
         for m in iter(scanner.match, None):
-            tok = Token(m.lastgroup, m.group(), line)
-            if tok.type == 'NL' or tok.type == 'LINE_COMMENT':
-                line += 1
-            elif tok.type == 'BLOCK_COMMENT':
-                line_count = len(re.findall(r'\n', tok.value))
-                line += line_count
-            elif tok.type != 'WS':
-                yield tok
+            if m.lastgroup == 'IDENT':
+                yield Token(m.lastgroup, m.group(), m.start(), lines, SYMBOLS.intern(m.group()))
+            elif m.lastgroup not in ('NL', 'WS', 'LINE_COMMENT', 'BLOCK_COMMENT'):
+                yield Token(m.lastgroup, m.group(), m.start(), lines)
+
+
+# 字节模式（mmap）扫描所用的正则，分组数量远少于上方的patterns，具体类型再由查表确定
+BYTES_PATTERN = re.compile(b'|'.join([
+    rb'(?P<WS>[ \t\f\v\r\n]+)',
+    rb'(?P<IDENT>[a-zA-Z_][a-zA-Z0-9_]*)',
+    rb'(?P<NUM>0x[0-9a-fA-F]+|0[0-7]+|[1-9][0-9]*|0)',
+    rb'(?P<LINE_COMMENT>//[^\n]*)',
+    rb'(?P<BLOCK_COMMENT>/\*[\s\S]*?\*/)',
+    rb'(?P<OP>&&|\|\||\+\+|--|==|!=|<=|>=|[-+*/%!&|=<>()\[\]{},;])',
+    rb'(?P<UNKNOWN>[\xc0-\xff][\x80-\xbf]*|[\s\S])',
+]))
+
+BYTES_KEYWORDS = {k.encode(): v for k, v in KEYWORDS.items()}
+BYTES_OPERATORS = {v.encode(): k for k, v in FIXED_VALUES.items() if k not in KEYWORDS.values()}
+WORD_BYTES = frozenset(i for i in range(256) if chr(i) in IDENT_CHARS)
+
+
+class MmapLex:
+    """
+    基于mmap的字节模式词法分析器，用于超大源文件
+
+    源文件不会整体读入内存，Token在迭代时才生成；关键字与运算符的值直接取自常量表，
+    只有标识符与数字会从映射区间中解码。
+
+    与Lex的差异：单词边界与空白按ASCII判定，非ASCII字符（按UTF-8编码整体）产生UNKNOWN
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def get_token(self):
+        with open(self.path, "rb") as f:
+            # 空文件无法映射
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                lines = LineIndex(content)
+                intern = SYMBOLS.intern_bytes
+                spellings = SYMBOLS.spellings
+                try:
+                    for t_type, start, end in self.scan(content):
+                        if t_type == 'IDENT':
+                            sid = intern(content[start:end])
+                            yield Token(t_type, spellings[sid], start, lines, sid)
+                            continue
+                        value = FIXED_VALUES.get(t_type)
+                        if value is None:
+                            value = content[start:end].decode('utf-8', 'replace')
+                        yield Token(t_type, value, start, lines)
+                finally:
+                    # 映射关闭前完成行首偏移表，Token在此之后仍可计算行号
+                    lines.build()
+
+    def get_buffer(self) -> TokenBuffer:
+        """
+        词法分析结果以TokenBuffer返回，其持有文件映射，使用完毕后应调用close()
+
+        :return: TokenBuffer
+        """
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return TokenBuffer(b'')
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = TokenBuffer(content)
+        append = buffer.append
+        for t_type, start, end in self.scan(content):
+            append(t_type, start, end)
+        return buffer
+
+    @staticmethod
+    def scan(content: Union[bytes, mmap.mmap]):
+        """
+        扫描器核心，仅产生(类型, 起始偏移, 结束偏移)
+
+        :param content: 源码字节
+        :return: 生成器
+        """
+        keywords = BYTES_KEYWORDS
+        operators = BYTES_OPERATORS
+        for m in BYTES_PATTERN.finditer(content):
+            kind = m.lastgroup
+            if kind == 'IDENT':
+                start, end = m.span()
+                keyword = keywords.get(content[start:end])
+                if keyword is None or (start and content[start - 1] in WORD_BYTES):
+                    yield 'IDENT', start, end
+                else:
+                    yield keyword, start, end
+            elif kind == 'OP':
+                yield operators[m.group()], m.start(), m.end()
+            elif kind == 'NUM':
+                start, end = m.span()
+                if end - start > 1 and content[start + 1] == 0x78:
+                    # 0x...
+                    yield 'HEX', start, end
+                elif end - start > 1 and content[start] == 0x30:
+                    # 0[0-7]+
+                    yield 'OCT', start, end
+                else:
+                    yield 'DIG', start, end
+            elif kind == 'UNKNOWN':
+                yield 'UNKNOWN', m.start(), m.end()
@@ -9,10 +9,9 @@
 
 import re
 import sys
+from collections.abc import Callable
 from typing import Any
 
-import graphviz
-
 from enum import Enum
 from utils.analyzer import Sentence, Sentence_Type
 
@@ -46,6 +45,8 @@ class BaseBlock:
 class Optimizer:
     def __init__(self, sentences: list[Sentence]):
         self.sentences = sentences
+        # graphviz is only needed to build the control flow graph
+        import graphviz
         self.graph = graphviz.Digraph(graph_attr={'compound': 'true',
                                                   'margin': "0,0",
                                                   'ranksep': '0.75',
@@ -84,12 +85,12 @@ class Optimizer:
             sent = self.sentences[pos]
             if sent.sentence_type is Sentence_Type.JMP:
                 bb.add_block_content(sent)
-                bb.add_block_to(sent.info['label'])
+                bb.add_block_to(sent.target)
                 break
             elif sent.sentence_type is Sentence_Type.IF_JMP:
                 bb.add_block_content(sent)
-                bb.add_block_to(sent.info['tl'])
-                bb.add_block_to(sent.info['fl'])
+                bb.add_block_to(sent.tl)
+                bb.add_block_to(sent.fl)
                 break
             elif sent.sentence_type is Sentence_Type.RETURN:
                 bb.add_block_content(sent)
@@ -101,7 +102,7 @@ class Optimizer:
         self.base_blocks.append(bb)
         return pos + 1
 
-    def get_control_graph(self) -> tuple[str, graphviz.Digraph.render]:
+    def get_control_graph(self) -> tuple[str, Callable[..., str]]:
         self.get_base_block()
         for block in self.base_blocks:
             if block.block_label is None:
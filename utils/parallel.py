@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：parallel.py
+@Author ：OrangeJ
+@Date ：2026/10/18 17:05
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Optional
+
+from utils.lex import SYMBOLS, TOKEN_KINDS, TokenBuffer
+from utils.yacc import Yacc, Node, Root, Diagnostic
+
+LBRACKET = TOKEN_KINDS['LBRACKET']
+RBRACKET = TOKEN_KINDS['RBRACKET']
+SEMICOLON = TOKEN_KINDS['SEMICOLON']
+
+# 工作进程中的TokenBuffer，由_init_worker设置
+_buffer: Optional[TokenBuffer] = None
+
+
+def split_segments(buffer: TokenBuffer) -> Optional[list[int]]:
+    """
+    按花括号深度划分顶层定义（<segment>）
+
+    花括号深度为0处的';'（全局变量定义、函数声明）与'}'（函数定义）即为顶层定义的结尾。
+    安装了NumPy时以向量化的前缀和计算深度，否则逐个累加。
+
+    :param buffer: TokenBuffer
+    :return: 各顶层定义结束位置（不含）的Token下标，花括号不配对时返回None
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    kinds = buffer.kinds
+    if np is not None:
+        kinds = np.frombuffer(kinds, dtype=np.uint8)
+        depth = np.cumsum((kinds == LBRACKET).astype(np.int64) - (kinds == RBRACKET))
+        if len(depth) and (depth.min() < 0 or depth[-1] != 0):
+            return None
+        ends = (np.flatnonzero((depth == 0) & ((kinds == SEMICOLON) | (kinds == RBRACKET))) + 1).tolist()
+    else:
+        depth = list(accumulate((k == LBRACKET) - (k == RBRACKET) for k in kinds))
+        if depth and (min(depth) < 0 or depth[-1] != 0):
+            return None
+        ends = [i + 1 for i, k in enumerate(kinds) if depth[i] == 0 and (k == SEMICOLON or k == RBRACKET)]
+    # 末尾不完整的定义单独成段，由语法分析报错
+    if len(kinds) and (not ends or ends[-1] != len(kinds)):
+        ends.append(len(kinds))
+    return ends
+
+
+def _chunk(ends: list[int], count: int) -> list[tuple[int, int]]:
+    """
+    将相邻的顶层定义按Token数大致均分为count组，减少进程间通信次数
+    """
+    total = ends[-1]
+    ranges = []
+    begin = 0
+    for end in ends:
+        if end - begin >= total / count or end == total:
+            ranges.append((begin, end))
+            begin = end
+    return ranges
+
+
+def _init_worker(buffer: TokenBuffer, spellings: list[str]) -> None:
+    global _buffer
+    _buffer = buffer
+    # 以spawn方式启动的进程中SYMBOLS为空，按相同顺序重建以保证标识符ID一致
+    for sid, spelling in enumerate(spellings):
+        if SYMBOLS.intern(spelling) != sid:
+            raise RuntimeError(f"symbol table mismatch at '{spelling}'")
+
+
+def _parse_range(token_range: tuple[int, int]) -> tuple[list[Node], list[Diagnostic]]:
+    begin, end = token_range
+    yy = Yacc(_buffer[i] for i in range(begin, end))
+    yy.parser()
+    return yy.ast.program, yy.diagnostics
+
+
+def parse_parallel(buffer: TokenBuffer, workers: int = None, chunks_per_worker: int = 4) -> tuple[Root, list[Diagnostic]]:
+    """
+    并行语法分析
+
+    顶层定义之间相互独立，按花括号深度切分后分组交给进程池中的Yacc解析，结果按源码顺序合并到一个ROOT结点，
+    各组的语法错误也按源码顺序合并。
+    进程数为1、源码不是str（mmap读入）或花括号不配对时退化为串行分析。
+
+    :param buffer: TokenBuffer
+    :param workers: 进程数，默认为CPU核数
+    :param chunks_per_worker: 每个进程平均分到的任务组数
+    :return: (语法树根结点, 语法错误列表)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    ends = split_segments(buffer) if workers > 1 and isinstance(buffer.source, str) else None
+    if not ends or len(ends) < 2:
+        yy = Yacc(buffer)
+        yy.parser()
+        return yy.ast, yy.diagnostics
+    ranges = _chunk(ends, workers * chunks_per_worker)
+    # 行首偏移表预先建好，工作进程无需各自扫描源码
+    buffer.lines.build()
+    ast = Root()
+    diagnostics = []
+    with ProcessPoolExecutor(min(workers, len(ranges)), initializer=_init_worker,
+                             initargs=(buffer, SYMBOLS.spellings)) as pool:
+        for nodes, errors in pool.map(_parse_range, ranges):
+            ast.program.extend(nodes)
+            diagnostics.extend(errors)
+    return ast, diagnostics
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：profiler.py
+@Author ：OrangeJ
+@Date ：2026/10/18 18:20
+"""
+
+import json
+import time
+from typing import TextIO
+
+from utils.yacc import Yacc
+
+# Yacc中产生式方法名的前缀（私有方法经过名称改写）
+PRODUCTION_PREFIX = "_Yacc__y_"
+
+
+class ProductionProfiler:
+    """
+    语法分析产生式剖析
+
+    instrument()只替换单个Yacc实例上的__y_*方法，未被剖析的实例与类本身不受影响，关闭剖析时没有任何额外开销。
+    每个产生式记录调用次数、消耗的Token数、累计耗时与自身耗时（不含其调用的其他产生式），
+    产生式递归调用自身时，Token数与累计耗时只在最外层调用结束时计入。
+    """
+
+    def __init__(self):
+        # 产生式名 -> [调用次数, Token数, 累计耗时ns, 自身耗时ns]
+        self.stats: dict[str, list[int]] = {}
+        self.__children: list[int] = []
+        self.__active: dict[str, int] = {}
+
+    def instrument(self, yacc: Yacc) -> Yacc:
+        """
+        为yacc的全部产生式方法加上计数与计时
+
+        :param yacc: 语法分析器
+        :return: yacc
+        """
+        for attr in dir(Yacc):
+            if attr.startswith(PRODUCTION_PREFIX):
+                name = "__y_" + attr[len(PRODUCTION_PREFIX):]
+                setattr(yacc, attr, self.__wrap(yacc, name, getattr(yacc, attr)))
+        return yacc
+
+    def __wrap(self, yacc: Yacc, name: str, method):
+        stats = self.stats.setdefault(name, [0, 0, 0, 0])
+        children = self.__children
+        active = self.__active
+        clock = time.perf_counter_ns
+
+        def production(*args, **kwargs):
+            position = yacc.position
+            active[name] = active.get(name, 0) + 1
+            children.append(0)
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                child = children.pop()
+                if children:
+                    children[-1] += elapsed
+                active[name] -= 1
+                stats[0] += 1
+                stats[3] += elapsed - child
+                if not active[name]:
+                    stats[1] += yacc.position - position
+                    stats[2] += elapsed
+
+        return production
+
+    def rows(self) -> list[dict]:
+        """
+        按自身耗时降序排列的统计结果
+
+        :return:
+        """
+        rows = [{
+            "production": name,
+            "calls": calls,
+            "tokens": tokens,
+            "total_ms": total / 1e6,
+            "self_ms": own / 1e6,
+        } for name, (calls, tokens, total, own) in self.stats.items() if calls]
+        rows.sort(key=lambda i: i["self_ms"], reverse=True)
+        return rows
+
+    def report(self, stream: TextIO) -> None:
+        """
+        输出文本报告
+
+        :param stream: 文本流
+        :return:
+        """
+        stream.write(f"{'production':<18}{'calls':>10}{'tokens':>10}{'total(ms)':>12}{'self(ms)':>12}\n")
+        for row in self.rows():
+            stream.write(f"{row['production']:<18}{row['calls']:>10}{row['tokens']:>10}"
+                         f"{row['total_ms']:>12.2f}{row['self_ms']:>12.2f}\n")
+
+    def dump(self, path: str) -> None:
+        """
+        以JSON格式写入文件
+
+        :param path: 文件路径
+        :return:
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"productions": self.rows()}, f, indent=4)
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@Project ：miniCC
+@File ：server.py
+@Author ：OrangeJ
+@Date ：2026/10/18 21:10
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from utils.client import ENV_PREFIX
+
+"""
+常驻编译服务
+
+前端为asyncio，监听Unix域套接字或标准输入，每行一个JSON请求，每行一个JSON响应；
+后端为预先导入了编译器全部模块的工作进程，每个请求在空闲的工作进程中执行一次与命令行完全相同的编译流程。
+请求格式（二选一）：
+    {"id": 1, "argv": ["a.c", "-i"], "cwd": "/path", "env": {"MINIC_CACHE": "..."}, "timeout": 10}
+    {"id": 1, "source": "int main() {...}" | "path": "a.c", "action": "ir", "format": "json", "output": "a.ll"}
+响应格式：
+    {"id": 1, "exit": 0, "stdout": "...", "stderr": "..."}
+超时的请求返回退出码124，执行该请求的工作进程被终止并由新的工作进程替代；timeout须为正数，不合法的请求返回退出码2。
+"""
+
+# 请求中的任务与输出格式 -> 命令行参数
+ACTION_FLAGS = {"lex": ["-l"], "yacc": ["-y"], "analyze": ["-a"], "cg": ["-c"], "ir": ["-i"], "all": []}
+FORMAT_FLAGS = {"std": [], "json": ["-j"], "compact": ["--compact"], "ndjson": ["--ndjson"], "binary": ["-b"]}
+TIMEOUT_EXIT = 124
+DEFAULT_TIMEOUT = 60.0
+# 工作进程执行的请求数上限，达到后由新的工作进程替代，释放lex.SYMBOLS等只增不减的进程级状态
+MAX_REQUESTS_PER_WORKER = 500
+# 单个请求（一行JSON）的最大字节数，请求中可以直接携带源码
+MAX_REQUEST_BYTES = 64 * 2 ** 20
+
+
+def _warm_up() -> None:
+    """
+    工作进程启动时导入编译器的全部模块，包括命令行中按需导入的各阶段模块与graphviz
+    """
+    import miniC  # noqa: F401
+    for name in ("utils.lex", "utils.yacc", "utils.fold", "utils.analyzer", "utils.ir", "utils.optimizer",
+                 "utils.jsonstream", "utils.binary", "utils.dot", "utils.parallel", "utils.profiler", "utils.cache",
+                 "utils.batch", "utils.gif", "graphviz"):
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+
+def _starts_service(argv: list[str]) -> bool:
+    """
+    以命令行解析器判断参数是否启动服务或转发请求，包括--serve=PATH与--ser等缩写形式
+    """
+    from miniC import build_parser
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            opts, _ = build_parser().parse_known_args(argv)
+    except SystemExit:
+        # 参数不合法（或为-h、-v），编译时同样在参数解析阶段退出
+        return False
+    return opts.serve is not None or opts.connect is not None
+
+
+def _argv(request: dict) -> list[str]:
+    """
+    由请求得到命令行参数（不含输入文件），请求不合法时抛出ValueError
+    """
+    if "argv" in request:
+        argv = [str(i) for i in request["argv"]]
+        if _starts_service(argv):
+            raise ValueError("'--serve' and '--connect' can't be sent to the compile server")
+        return argv
+    action = request.get("action", "all")
+    if action not in ACTION_FLAGS:
+        raise ValueError(f"unknown action '{action}', expected one of {', '.join(ACTION_FLAGS)}")
+    output_format = request.get("format", "std")
+    if output_format not in FORMAT_FLAGS:
+        raise ValueError(f"unknown format '{output_format}', expected one of {', '.join(FORMAT_FLAGS)}")
+    argv = ACTION_FLAGS[action] + FORMAT_FLAGS[output_format]
+    if request.get("output") is not None:
+        argv += ["-o", str(request["output"])]
+    return argv
+
+
+def _run(request: dict) -> dict:
+    """
+    在当前进程中执行一次编译，捕获屏幕输出与退出码
+    """
+    from utils.batch import run_captured
+    try:
+        argv = _argv(request)
+    except ValueError as e:
+        return {"exit": 2, "stdout": "", "stderr": f"[ERROR] bad request: {e}\n"}
+    source_file = None
+    saved_env = {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIX)}
+    cwd = os.getcwd()
+    try:
+        if "argv" not in request:
+            path = request.get("path")
+            if path is None:
+                fd, source_file = tempfile.mkstemp(suffix=".c")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(request.get("source", ""))
+                path = source_file
+            argv.insert(0, str(path))
+        for k in saved_env:
+            del os.environ[k]
+        os.environ.update({k: v for k, v in request.get("env", {}).items() if k.startswith(ENV_PREFIX)})
+        os.chdir(request.get("cwd", cwd))
+        return run_captured(argv)
+    except OSError as e:
+        return {"exit": 1, "stdout": "", "stderr": f"[ERROR] {e}\n"}
+    finally:
+        os.chdir(cwd)
+        for k in [k for k in os.environ if k.startswith(ENV_PREFIX)]:
+            del os.environ[k]
+        os.environ.update(saved_env)
+        if source_file is not None:
+            os.remove(source_file)
+
+
+def _worker_main(conn) -> None:
+    _warm_up()
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        conn.send(_run(request))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.requests = 0
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, request: dict) -> dict:
+        self.requests += 1
+        self.conn.send(request)
+        return self.conn.recv()
+
+    def kill(self) -> None:
+        # 不在此关闭管道：等待响应的线程会因工作进程退出而收到EOFError后自行结束
+        self.process.kill()
+        self.process.join()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+
+
+class WorkerPool:
+    """
+    预热的工作进程池
+
+    每个工作进程同一时间只执行一个请求，超时或崩溃的工作进程会被替换，不影响其他请求；
+    执行了max_requests个请求的工作进程在空闲时退出，由新的工作进程替代。
+    """
+
+    def __init__(self, workers: int = None, timeout: float = DEFAULT_TIMEOUT,
+                 max_requests: int = MAX_REQUESTS_PER_WORKER):
+        self.timeout = timeout
+        self.max_requests = max_requests
+        # fork方式下子进程会继承其他工作进程的管道，父进程退出后无法收到EOF，因此优先使用forkserver
+        methods = multiprocessing.get_all_start_methods()
+        self.__context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.__workers = [_Worker(self.__context) for _ in range(workers or os.cpu_count() or 1)]
+        # 每个工作进程对应一个等待响应的线程，被替换的工作进程的线程在其退出后结束
+        self.__threads = ThreadPoolExecutor(2 * len(self.__workers))
+        self.__idle: Optional[asyncio.Queue] = None
+
+    async def submit(self, request: dict) -> dict:
+        """
+        在空闲的工作进程中执行请求
+
+        :param request: 请求
+        :return: 响应
+        """
+        if self.__idle is None:
+            self.__idle = asyncio.Queue()
+            for worker in self.__workers:
+                self.__idle.put_nowait(worker)
+        timeout = request.get("timeout", self.timeout)
+        worker = await self.__idle.get()
+        loop = asyncio.get_running_loop()
+        try:
+            response = await asyncio.wait_for(loop.run_in_executor(self.__threads, worker.call, request), timeout)
+        except asyncio.TimeoutError:
+            worker = self.__replace(worker)
+            response = {"exit": TIMEOUT_EXIT, "stdout": "",
+                        "stderr": f"[ERROR] compile request timed out after {timeout}s\n"}
+        except (EOFError, OSError):
+            worker = self.__replace(worker)
+            response = {"exit": 1, "stdout": "", "stderr": "[ERROR] compile worker exited unexpectedly\n"}
+        else:
+            if worker.requests >= self.max_requests:
+                worker = self.__recycle(worker)
+        finally:
+            self.__idle.put_nowait(worker)
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def __replace(self, worker: _Worker) -> _Worker:
+        worker.kill()
+        index = self.__workers.index(worker)
+        self.__workers[index] = _Worker(self.__context)
+        return self.__workers[index]
+
+    def __recycle(self, worker: _Worker) -> _Worker:
+        index = self.__workers.index(worker)
+        self.__workers[index] = _Worker(self.__context)
+        # 旧的工作进程已空闲，在线程中等待其正常退出，不阻塞事件循环
+        self.__threads.submit(worker.close)
+        return self.__workers[index]
+
+    def close(self) -> None:
+        for worker in self.__workers:
+            worker.close()
+        self.__threads.shutdown(wait=False)
+
+
+def _decode(line: bytes) -> dict:
+    request = None
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        if "timeout" in request:
+            timeout = request["timeout"]
+            # bool是int的子类，null会关闭超时，均不接受
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout < math.inf:
+                raise ValueError(f"'timeout' must be a positive number, got {json.dumps(timeout)}")
+        return request
+    except ValueError as e:
+        error = {"error": str(e)}
+        if isinstance(request, dict) and "id" in request:
+            error["id"] = request["id"]
+        return error
+
+
+async def _respond(pool: WorkerPool, request: dict) -> dict:
+    if "error" in request:
+        response = {"exit": 2, "stdout": "", "stderr": f"[ERROR] bad request: {request['error']}\n"}
+    else:
+        try:
+            return await pool.submit(request)
+        except Exception as e:
+            # 任何请求都要有响应，否则客户端会一直等待或读到空行
+            response = {"exit": 1, "stdout": "", "stderr": f"[ERROR] compile server error: {e!r}\n"}
+    if "id" in request:
+        response["id"] = request["id"]
+    return response
+
+
+async def _serve_socket(pool: WorkerPool, path: str) -> None:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pending = set()
+
+        async def answer(request: dict) -> None:
+            writer.write(json.dumps(await _respond(pool, request)).encode("utf-8") + b"\n")
+            await writer.drain()
+
+        # 同一连接上的多个请求并发执行，响应按完成顺序返回，以id对应
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # 超出MAX_REQUEST_BYTES，无法再按行对齐，关闭连接
+                await answer({"error": "request too large"})
+                break
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.create_task(answer(_decode(line)))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending)
+        writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = await asyncio.start_unix_server(handle, path, limit=MAX_REQUEST_BYTES)
+    async with server:
+        await server.serve_forever()
+
+
+async def _serve_stdio(pool: WorkerPool) -> None:
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    async def answer(request: dict) -> None:
+        sys.stdout.write(json.dumps(await _respond(pool, request)) + "\n")
+        sys.stdout.flush()
+
+    reader = asyncio.StreamReader(limit=MAX_REQUEST_BYTES)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError:
+            await answer({"error": "request too large"})
+            break
+        if not line:
+            break
+        if line.strip():
+            task = asyncio.create_task(answer(_decode(line)))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.wait(pending)
+
+
+def serve(path: str = None, workers: int = None, timeout: float = DEFAULT_TIMEOUT) -> None:
+    """
+    启动编译服务，path为空时从标准输入读取请求、向标准输出写入响应
+
+    :param path: Unix域套接字路径
+    :param workers: 工作进程数，默认为CPU核数
+    :param timeout: 默认的单个请求超时时间（秒）
+    :return:
+    """
+    async def run() -> None:
+        # SIGINT与SIGTERM时停止接收请求，关闭工作进程后退出
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        pool = WorkerPool(workers, timeout)
+        try:
+            await (_serve_socket(pool, path) if path else _serve_stdio(pool))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            pool.close()
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    asyncio.run(run())
@@ -7,21 +7,17 @@
 @Date ：2022/4/27 15:13
 """
 
-from collections import Generator, Iterator
+from collections import namedtuple
+from collections.abc import Generator, Iterator, Iterable, Callable, Mapping, Sequence
 from enum import Enum
 from typing import Union, Optional, Any
 from json import JSONEncoder
-from graphviz import Digraph
 
-from utils.lex import Token
+from utils.lex import Token, TokenBuffer
 
-# TODO: 如下
 """
-这份代码如果不考虑生成gv图的部分还是可以接受的
-我的想法是写一个ast的解析器用于gv图的生成和后续语义分析
-我更想将当前gv图生成部分从其中分离出来（gv图生成已删除）
+gv图的生成已从语法分析中分离，由utils/dot.py中的DotGenerator遍历AST生成
 """
-# TODO: 如上
 
 
 DEBUG = False
@@ -81,6 +77,38 @@ class NodeType(Enum):
     UNARY_RIGHT = 59
 
 
+# 二元运算符：Token类型 -> (优先级, 是否右结合, 结点类型)
+BINARY_OPERATORS = {
+    'ASSIGN': (0, True, NodeType.ASSIGN),
+    'LOGIC_OR': (1, False, NodeType.LOGIC_OR),
+    'LOGIC_AND': (2, False, NodeType.LOGIC_AND),
+    'GEQ': (3, True, NodeType.GEQ),
+    'GT': (3, True, NodeType.GT),
+    'LT': (3, True, NodeType.LT),
+    'LEQ': (3, True, NodeType.LEQ),
+    'EQ': (3, True, NodeType.EQ),
+    'NEQ': (3, True, NodeType.NEQ),
+    'PLUS': (4, False, NodeType.PLUS),
+    'MINUS': (4, False, NodeType.MINUS),
+    'TIMES': (5, False, NodeType.TIMES),
+    'DIVIDE': (5, False, NodeType.DIVIDE),
+    'MOD': (5, False, NodeType.MOD),
+}
+
+# 比较运算结点以运算符文本为value
+COMPARE_OPERATORS = frozenset(('GEQ', 'GT', 'LT', 'LEQ', 'EQ', 'NEQ'))
+
+# 前缀一元运算符：Token类型 -> 运算符结点类型
+PREFIX_OPERATORS = {
+    'NOT': NodeType.NOT,
+    'MINUS': NodeType.NEGATIVE,
+    'AND': NodeType.AND,
+    'TIMES': NodeType.POINTER,
+    'SELF_PLUS': NodeType.SELF_PLUS,
+    'SELF_MINUS': NodeType.SELF_MINUS,
+}
+
+
 class CustomYaccEncoder(JSONEncoder):
     """
     自定义类Node序列化编码器
@@ -94,7 +122,23 @@ class CustomYaccEncoder(JSONEncoder):
 """
 Node类说明
 
-Node类根据自身node_type的不同其info内信息也不同，具体如下
+Node为叶子结点（NUM、IDENT、BREAK、CONTINUE、INT_VAR、POINTER_INT_VAR以及运算符、类型结点），
+含有子结点的结点按种类使用Node的子类，子结点保存在__slots__字段中：
+Root(program)                       // ROOT
+FuncDef(paras, funcbody)            // INT_FUNC | VOID_FUNC，funcbody为None说明该句为声明语句而非函数定义语句
+ArrayDef(dims, local)               // INT_ARRAY，dims为各维度长度结点，参数中省略的维度为None
+Block(subprogram)                   // BLOCK
+While(condition, statement)         // WHILE
+If(condition, statement, elsestat)  // IF
+Else(statement)                     // ELSE
+Return(return_expr)                 // RETURN，无返回值时return_expr为None
+BinOp(lvar, rvar)                   // ASSIGN | PLUS | MINUS | TIMES | DIVIDE | MOD | GT | GEQ | LT | LEQ | EQ | NEQ | LOGIC_AND | LOGIC_OR
+UnaryLeft(lop, target)              // UNARY_LEFT
+UnaryRight(rop, target)             // UNARY_RIGHT
+ArrayRef(indices)                   // ARRAY，数组调用
+Call(args)                          // FUNC，函数调用
+
+Node.info为兼容旧版的只读视图，按旧版info字典的键与顺序访问上述字段，JSON输出格式不变，具体如下
 node_type: INT_VAR // 整型变量定义
     info:{}
     
@@ -108,7 +152,8 @@ node_type: INT_ARRAY // 整型数组定义
         "2": Node(),
         ...
         "i": Node(), // 第i维度长度信息，理论上Node类型为NUM
-        "x": Node()
+        "x": Node(),
+        "array": "" // 仅局部数组定义，数组名及各维度结点文本
     }
     
 node_type: INT_FUNC // 返回值为int的函数定义
@@ -173,8 +218,8 @@ node_type: ELSE
     
 node_type: ASSIGN | PLUS | MINUS | TIMES | DIVIDE | MOD | GT | GEQ | LT | LEQ | EQ | NEQ | LOGIC_AND | LOGIC_OR
     info: {
-        lvar:
         rvar:
+        lvar:
     }
 
 node_type: UNARY_LEFT
@@ -191,60 +236,382 @@ node_type: UNARY_RIGHT:
 """
 
 
+class InfoView(Mapping):
+    """
+    Node.info兼容视图
+
+    按旧版info字典的键与顺序只读访问结点的子结点字段，不额外保存数据
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node: "Node"):
+        self.node = node
+
+    def __getitem__(self, key: str) -> Any:
+        for k, v in self.node.info_items():
+            if k == key:
+                return v
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (k for k, _ in self.node.info_items())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.node.info_items())
+
+    def __repr__(self):
+        return repr(dict(self.node.info_items()))
+
+
 class Node:
     """
     结点
     """
+    __slots__ = ('node_type', 'value', 'symbol', 'lineno')
+    # 包括父类在内的全部字段，用于序列化
+    fields: tuple[str, ...] = __slots__
 
-    def __init__(self, n_type: NodeType, lineno: int, value: str = "", info=None, graph_node: str = ""):
-        if info is None:
-            info = {}
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.fields = cls.__base__.fields + cls.__dict__.get('__slots__', ())
+
+    def __init__(self, n_type: NodeType, lineno: int, value: str = "", symbol: int = -1):
         self.node_type = n_type
         self.value = value
-        self.info = info
+        # 标识符在lex.SYMBOLS中的ID，非标识符结点为-1
+        self.symbol = symbol
         self.lineno = lineno
-        self.graph_node = graph_node
+
+    @property
+    def info(self) -> InfoView:
+        return InfoView(self)
+
+    def info_items(self) -> Iterator[tuple[str, Any]]:
+        """
+        按旧版info字典的顺序产生(键, 值)
+
+        :return:
+        """
+        return iter(())
+
+    def children(self) -> Iterator["Node"]:
+        """
+        直接子结点
+
+        :return:
+        """
+        for _, value in self.info_items():
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, (list, tuple)):
+                yield from (i for i in value if isinstance(i, Node))
+
+    def __reduce__(self):
+        # 按字段顺序的紧凑序列化，供并行分析时在进程间传递结点
+        return _rebuild_node, (self.__class__, *[getattr(self, name) for name in self.fields])
 
     def __repr__(self):
-        return f"node_type->{self.node_type}, value->{self.value}, lineno->{self.lineno}, info->{self.info}, graph_node->{self.graph_node}"
+        return f"node_type->{self.node_type}, value->{self.value}, lineno->{self.lineno}, info->{self.info}"
 
     def __json__(self):
         return {
             "node_type": self.node_type.name,
             "value": self.value,
             "lineno": self.lineno,
-            "info": self.info,
-            "graph_node": self.graph_node
+            "info": dict(self.info_items())
         }
 
 
-S = 0  # for Segment
-B = 0  # for Block
-L = 0  # for Local definition
-T = 0  # for Statement
-P = 0  # for Operator
-F = 0  # for Factor
+def _rebuild_node(cls: type, *values) -> Node:
+    node = cls.__new__(cls)
+    for name, value in zip(cls.fields, values):
+        setattr(node, name, value)
+    return node
+
+
+class Root(Node):
+    __slots__ = ('program',)
+
+    def __init__(self, lineno: int = 0, program: list[Node] = None):
+        super().__init__(NodeType.ROOT, lineno)
+        self.program = [] if program is None else program
+
+    def info_items(self):
+        yield 'program', self.program
+
+
+class FuncDef(Node):
+    __slots__ = ('paras', 'funcbody')
+
+    def __init__(self, n_type: NodeType, lineno: int, paras: tuple[Node, ...], funcbody: Optional["Block"],
+                 value: str = "", symbol: int = -1):
+        super().__init__(n_type, lineno, value, symbol)
+        self.paras = paras
+        self.funcbody = funcbody
+
+    def info_items(self):
+        yield 'paras', self.paras
+        yield 'funcbody', self.funcbody
+
+
+class ArrayDef(Node):
+    __slots__ = ('dims', 'local')
+
+    def __init__(self, lineno: int, dims: tuple[Optional[Node], ...], value: str = "", symbol: int = -1,
+                 local: bool = False):
+        super().__init__(NodeType.INT_ARRAY, lineno, value, symbol)
+        self.dims = dims
+        self.local = local
+
+    def info_items(self):
+        yield 'size', len(self.dims)
+        for i, dim in enumerate(self.dims):
+            yield str(i), dim
+        if self.local:
+            yield 'array', self.value + "".join(f"[{dim}]" for dim in self.dims)
+
+
+class Block(Node):
+    __slots__ = ('subprogram',)
+
+    def __init__(self, lineno: int, subprogram: list[Node]):
+        super().__init__(NodeType.BLOCK, lineno)
+        self.subprogram = subprogram
+
+    def info_items(self):
+        yield 'subprogram', self.subprogram
+
+
+class While(Node):
+    __slots__ = ('condition', 'statement')
+
+    def __init__(self, lineno: int, condition: Node, statement: Optional[Node]):
+        super().__init__(NodeType.WHILE, lineno, 'WHILE')
+        self.condition = condition
+        self.statement = statement
+
+    def info_items(self):
+        yield 'condition', self.condition
+        yield 'statement', self.statement
+
+
+class If(Node):
+    __slots__ = ('condition', 'statement', 'elsestat')
+
+    def __init__(self, lineno: int, condition: Node, statement: Optional[Node], elsestat: Optional["Else"]):
+        super().__init__(NodeType.IF, lineno, 'IF')
+        self.condition = condition
+        self.statement = statement
+        self.elsestat = elsestat
+
+    def info_items(self):
+        yield 'condition', self.condition
+        yield 'statement', self.statement
+        yield 'elsestat', self.elsestat
+
+
+class Else(Node):
+    __slots__ = ('statement',)
+
+    def __init__(self, lineno: int, statement: Optional[Node]):
+        super().__init__(NodeType.ELSE, lineno)
+        self.statement = statement
+
+    def info_items(self):
+        yield 'statement', self.statement
+
+
+class Return(Node):
+    __slots__ = ('return_expr',)
+
+    def __init__(self, lineno: int, return_expr: Optional[Node] = None):
+        super().__init__(NodeType.RETURN, lineno, 'return')
+        self.return_expr = return_expr
+
+    def info_items(self):
+        if self.return_expr is not None:
+            yield 'return_expr', self.return_expr
+
+
+class BinOp(Node):
+    __slots__ = ('lvar', 'rvar')
+
+    def __init__(self, n_type: NodeType, lineno: int, lvar: Node, rvar: Node, value: str = ""):
+        super().__init__(n_type, lineno, value)
+        self.lvar = lvar
+        self.rvar = rvar
+
+    def info_items(self):
+        yield 'rvar', self.rvar
+        yield 'lvar', self.lvar
+
+
+class UnaryLeft(Node):
+    __slots__ = ('lop', 'target')
+
+    def __init__(self, lineno: int, lop: Node, target: Node):
+        super().__init__(NodeType.UNARY_LEFT, lineno)
+        self.lop = lop
+        self.target = target
+
+    def info_items(self):
+        yield 'lop', self.lop
+        yield 'target', self.target
+
+
+class UnaryRight(Node):
+    __slots__ = ('rop', 'target')
+
+    def __init__(self, lineno: int, rop: Node, target: Node):
+        super().__init__(NodeType.UNARY_RIGHT, lineno)
+        self.rop = rop
+        self.target = target
+
+    def info_items(self):
+        yield 'rop', self.rop
+        yield 'target', self.target
+
+
+class ArrayRef(Node):
+    __slots__ = ('indices',)
+
+    def __init__(self, lineno: int, indices: tuple[Node, ...], value: str = "", symbol: int = -1):
+        super().__init__(NodeType.ARRAY, lineno, value, symbol)
+        self.indices = indices
+
+    def info_items(self):
+        yield 'size', len(self.indices)
+        for i, index in enumerate(self.indices):
+            yield str(i), index
+
+
+class Call(Node):
+    __slots__ = ('args',)
+
+    def __init__(self, lineno: int, args: tuple[Node, ...], value: str = "", symbol: int = -1):
+        super().__init__(NodeType.FUNC, lineno, value, symbol)
+        self.args = args
+
+    def info_items(self):
+        yield 'args', self.args
+
+
+class Diagnostic(namedtuple('Diagnostic', ['line', 'column', 'message'])):
+    """
+    语法错误信息，column为None表示错误位于源码末尾
+    """
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        position = f"{self.line}" if self.column is None else f"{self.line}:{self.column}"
+        return f"[ERROR] [YACC] [{position}]: {self.message}"
+
+
+class YaccError(Exception):
+    """
+    语法错误，args[0]为对应的Diagnostic
+    """
+
+
+# 错误恢复的同步Token：语句以';'结束，代码块以'}'结束，类型关键字开始新的定义
+SYNC_TYPES = frozenset(('INT', 'VOID'))
+
+
+class TokenStream:
+    """
+    Token迭代器适配器
+
+    按下标访问时才从迭代器中取出Token并缓存，使生成器也能作为可下标访问的序列交给Yacc，
+    同时保持按需词法分析（增量分析在重新对齐后即停止，不会扫描其余源码）
+    """
+    __slots__ = ('tokens', 'source')
+
+    def __init__(self, source: Iterable[Token]):
+        self.tokens: list[Token] = []
+        self.source = iter(source)
+
+    def __getitem__(self, index: int) -> Token:
+        tokens = self.tokens
+        while len(tokens) <= index:
+            token = next(self.source, None)
+            if token is None:
+                raise IndexError(index)
+            tokens.append(token)
+        return tokens[index]
 
 
 class Yacc:
     """
     语法分析器
+
+    分析状态全部保存在实例中，模块中仅有只读的常量表，不同实例可在多个线程中同时使用
+
+    Token序列按下标读取，以位置游标表示当前Token，可以O(1)向前查看任意个Token或回退到之前的位置
+
+    语法错误记录在diagnostics中。开启错误恢复（默认）时采用panic模式：语句中的错误跳过至';'、'}'或类型关键字，
+    顶层定义中的错误跳过至顶层的';'、'}'或类型关键字，随后继续分析，出错的语句或定义不进入AST，
+    一次分析即可得到全部语法错误与其余部分的AST。关闭时遇到第一个错误即抛出YaccError。
     """
 
-    def __init__(self, tokens: Union[Generator[Token], Iterator[Token]]):
-        self.__tokens = tokens
+    def __init__(self, tokens: Union[Sequence[Token], TokenBuffer, Iterable[Token]], recover: bool = True):
+        # TokenBuffer与列表直接按下标读取，生成器等迭代器经TokenStream适配
+        if isinstance(tokens, (TokenBuffer, Sequence)):
+            self.__tokens = tokens
+        else:
+            self.__tokens = TokenStream(tokens)
+        # 当前Token的下标，第一次__next前为-1
+        self.__pos = -1
         self.__last_token = None
         self.__curr_token = None
-        self.ast = Node(NodeType.ROOT, lineno=0, graph_node="ROOT")
-        self.graph = Digraph("G")
+        self.ast = Root()
+        self.recover = recover
+        self.diagnostics: list[Diagnostic] = []
+
+    def peek(self, k: int = 0) -> Optional[Token]:
+        """
+        查看当前Token之后的第k个Token，不移动游标
+
+        :param k: 偏移，0为当前Token，负数为已读过的Token
+        :return: Token，越界时为None
+        """
+        index = self.__pos + k
+        if index < 0:
+            return None
+        try:
+            return self.__tokens[index]
+        except IndexError:
+            return None
+
+    @property
+    def position(self) -> int:
+        """
+        游标位置，即当前Token的下标
+        """
+        return self.__pos
+
+    def seek(self, position: int) -> None:
+        """
+        将游标移动到position处，用于回溯与错误恢复
+
+        :param position: 由position属性得到的位置
+        :return:
+        """
+        self.__pos = position
+        self.__last_token = self.peek(-1)
+        self.__curr_token = self.peek(0)
 
     def __next(self):
-        self.__last_token, self.__curr_token = self.__curr_token, next(self.__tokens, None)
+        self.__pos += 1
+        try:
+            token = self.__tokens[self.__pos]
+        except IndexError:
+            token = None
+        self.__last_token, self.__curr_token = self.__curr_token, token
         if DEBUG:
             print(self.__curr_token)
 
     def __accept(self, t_type: str) -> bool:
-        if self.__curr_token.type == t_type:
+        if self.__curr_token is not None and self.__curr_token.type == t_type:
             self.__next()
             return True
         else:
@@ -255,10 +622,61 @@ class Yacc:
             self.__error(
                 f"Excepted {t_type}, Found {self.__curr_token.type if self.__curr_token is not None else 'None'}")
 
+    def __found(self) -> str:
+        return self.__curr_token.value if self.__curr_token is not None else 'None'
+
+    def __report(self, msg: str) -> None:
+        """
+        记录语法错误，不中断分析（用于不影响后续Token的错误），关闭错误恢复时抛出YaccError
+        """
+        if self.__curr_token is not None:
+            line, column = self.__curr_token.lines.position(self.__curr_token.offset)
+        else:
+            line, column = (self.__last_token.line + 1 if self.__last_token is not None else 1), None
+        diagnostic = Diagnostic(line, column, msg)
+        # 同一位置上由前一个错误引起的连锁错误不再重复记录
+        if not self.diagnostics or self.diagnostics[-1][:2] != diagnostic[:2]:
+            self.diagnostics.append(diagnostic)
+        if not self.recover:
+            raise YaccError(diagnostic)
+
     def __error(self, msg: str):
-        print(
-            f"[ERROR] [YACC] [{self.__curr_token.line if self.__curr_token is not None else self.__last_token.line + 1}]: {msg}")
-        raise Exception()
+        self.__report(msg)
+        raise YaccError(self.diagnostics[-1])
+
+    def __synchronize(self, start: int, top: bool) -> None:
+        """
+        panic模式错误恢复：跳过Token直至同步点
+
+        语句中：停在'}'与类型关键字之前，或越过';'与完整的'{...}'之后；
+        顶层：'{...}'整体跳过，停在类型关键字之前或越过顶层的';'、'}'之后。
+
+        :param start: 出错的产生式开始时的游标位置，若未消耗任何Token则至少跳过一个，保证分析能够前进
+        :param top: 是否为顶层定义
+        """
+        if self.__pos == start and self.__curr_token is not None:
+            if not top and self.__curr_token.type == 'RBRACKET':
+                return
+            self.__next()
+        depth = 0
+        while self.__curr_token is not None:
+            t_type = self.__curr_token.type
+            if t_type == 'LBRACKET':
+                depth += 1
+            elif t_type == 'RBRACKET':
+                if depth == 0 and not top:
+                    return
+                depth = max(depth - 1, 0)
+                if depth == 0:
+                    self.__next()
+                    return
+            elif depth == 0:
+                if t_type == 'SEMICOLON':
+                    self.__next()
+                    return
+                if t_type in SYNC_TYPES:
+                    return
+            self.__next()
 
     def parser(self) -> None:
         """
@@ -267,15 +685,24 @@ class Yacc:
         :return:
         """
         self.__next()
-        self.ast.info['program'] = self.__y_program()
-        self.graph.node("ROOT", "root", shape="rectangle")
-        self.graph.node("PROGRAM", "program", shape="rectangle")
-        self.graph.edge("ROOT", "PROGRAM")
-        for i in self.ast.info['program']:
-            self.graph.edge("PROGRAM", i.graph_node)
+        self.ast.program = self.__y_program()
+
+    def segments(self, stop: Callable[[int], bool] = None) -> Generator[tuple[int, list[Node]], None, None]:
+        """
+        逐个解析顶层定义（<segment>），供增量分析使用
+
+        :param stop: 每个定义开始解析前以其起始偏移调用，返回True时停止解析
+        :return: (定义起始偏移, 定义产生的结点列表)生成器
+        """
+        self.__next()
+        while self.__curr_token is not None:
+            offset = self.__curr_token.offset
+            if stop is not None and stop(offset):
+                break
+            tmp = self.__y_segment()
+            yield offset, [tmp] if isinstance(tmp, Node) else tmp
 
     def __y_program(self) -> list[Node]:
-        global S
         """
         解析代码段
 
@@ -285,15 +712,21 @@ class Yacc:
         while True:
             if self.__curr_token is None:
                 break
-            tmp = self.__y_segment()
-            if type(tmp) == Node:
+            start = self.__pos
+            try:
+                tmp = self.__y_segment()
+            except YaccError:
+                if not self.recover:
+                    raise
+                self.__synchronize(start, top=True)
+                continue
+            if isinstance(tmp, Node):
                 y_segments.append(tmp)
             else:
                 y_segments.extend(tmp)
         return y_segments
 
     def __y_segment(self) -> Union[list[Node], Node]:
-        global S
         """
         解析
 
@@ -302,83 +735,32 @@ class Yacc:
         y_defvars = []
         y_type = self.__y_type()
         y_def = self.__y_def()
-        if type(y_def) == Node:
+        if isinstance(y_def, Node):
             # function
             if y_type.node_type == NodeType.INT:
                 y_def.node_type = NodeType.INT_FUNC
-                i_type = 'int func'
             else:
                 y_def.node_type = NodeType.VOID_FUNC
-                i_type = 'void func'
-            # for graphviz
-            func_head = f"S{S}"
-            S += 1
-            paras = f"S{S}"
-            S += 1
-            self.graph.node(func_head, i_type)
-            self.graph.node(paras, "paras")
-            self.graph.edge(func_head, y_def.graph_node)
-            self.graph.edge(y_def.graph_node, paras)
-            if y_def.info['funcbody'] is not None:
-                self.graph.edge(y_def.graph_node, y_def.info['funcbody'].graph_node)
-            for j in y_def.info['paras']:
-                if j.node_type == NodeType.INT_VAR:
-                    arg_head = f"S{S}"
-                    S += 1
-                    self.graph.node(arg_head, "int")
-                    self.graph.edge(arg_head, j.graph_node)
-                elif j.node_type == NodeType.POINTER_INT_VAR:
-                    arg_head = f"S{S}"
-                    S += 1
-                    self.graph.node(arg_head, "int*")
-                    self.graph.edge(arg_head, j.graph_node)
-                elif j.node_type == NodeType.INT_ARRAY:
-                    arg_head = f"S{S}"
-                    S += 1
-                    self.graph.node(arg_head, "int" + "[]" * j.info['size'])
-                    self.graph.edge(arg_head, j.graph_node)
-                    for k in range(j.info['size']):
-                        # if j.info[f'{j}'] is not None:
-                        #     self.graph.edge(j.graph_node, j.info[f'{j}'].graph_node)
-                        # else:
-                        self.graph.node(f"S{S}", "ANY")
-                        self.graph.edge(j.graph_node, f"S{S}")
-                        S += 1
-                self.graph.edge(paras, arg_head)
-            y_def.graph_node = func_head
-            # end of graphviz
             return y_def
         else:
             for i in y_def:
                 if i[0].node_type == NodeType.POINTER:
                     # pointer variable
                     if y_type.node_type == NodeType.INT:
-                        defvar = Node(NodeType.POINTER_INT_VAR, value=i[1].value, lineno=i[1].lineno, graph_node=f"S{S}")
-                        self.graph.node(defvar.graph_node, "int*")
-                        self.graph.edge(defvar.graph_node, i[1].graph_node)
+                        defvar = Node(NodeType.POINTER_INT_VAR, value=i[1].value, symbol=i[1].symbol, lineno=i[1].lineno)
                         y_defvars.append(defvar)
                     else:
-                        self.__error("VOID Can't be used for POINTER!")
+                        self.__report("VOID Can't be used for POINTER!")
                 else:
                     if y_type.node_type == NodeType.INT:
                         # variable or array
                         if len(i[1]):
-                            defvar = Node(NodeType.INT_ARRAY, value=i[0].value, lineno=i[0].lineno, graph_node=f"S{S}")
-                            self.graph.node(defvar.graph_node, "int" + "[]" * len(i[1]))
-                            self.graph.edge(defvar.graph_node, i[0].graph_node)
-                            info = {"size": len(i[1])}
-                            for j in range(info['size']):
-                                info[f'{j}'] = i[1][j]
-                                self.graph.edge(i[0].graph_node, i[1][j].graph_node)
-                            defvar.info = info
+                            defvar = ArrayDef(lineno=i[0].lineno, dims=tuple(i[1]), value=i[0].value, symbol=i[0].symbol)
                         else:
-                            defvar = Node(NodeType.INT_VAR, value=i[0].value, lineno=i[0].lineno, graph_node=f"S{S}")
-                            self.graph.node(defvar.graph_node, "int")
-                            self.graph.edge(defvar.graph_node, i[0].graph_node)
+                            defvar = Node(NodeType.INT_VAR, value=i[0].value, symbol=i[0].symbol, lineno=i[0].lineno)
                         y_defvars.append(defvar)
                     else:
-                        self.__error("VOID Can't be used for VAR or ARRAY")
-                S += 1
+                        self.__report("VOID Can't be used for VAR or ARRAY")
             return y_defvars
 
     def __y_type(self) -> Node:
@@ -392,9 +774,9 @@ class Yacc:
         elif self.__accept('VOID'):
             return Node(NodeType.VOID, lineno=self.__last_token.line)
         else:
-            self.__error(f"Excepted INT or VOID, Found '{self.__curr_token.value}'")
+            self.__error(f"Excepted INT or VOID, Found '{self.__found()}'")
 
-    def __y_def(self) -> Union[list[list[Node, Node]], Node]:
+    def __y_def(self) -> Union[list[list[Node, Node]], FuncDef]:
         """
         解析定义
 
@@ -413,10 +795,10 @@ class Yacc:
             # variable or array
             y_ident = self.__y_ident()
             y_idtail = self.__y_idtail()
-            if type(y_idtail) == Node:
+            if isinstance(y_idtail, Node):
                 # for function
                 y_idtail.value = y_ident.value
-                y_idtail.graph_node = y_ident.graph_node
+                y_idtail.symbol = y_ident.symbol
                 y_defvar = y_idtail
             else:
                 # for variable or array
@@ -425,7 +807,7 @@ class Yacc:
                     y_defvar.extend(y_idtail[1:])
             return y_defvar
         # else:
-        #     self._error(f"Except IDENT or '*' in define, Found '{self.__curr_token.value}'")
+        #     self._error(f"Except IDENT or '*' in define, Found '{self.__found()}'")
 
     def __y_deflist(self) -> Union[list[list[Node, Node]], None]:
         """
@@ -446,7 +828,7 @@ class Yacc:
             # end of define
             return None
         else:
-            self.__error(f"Excepted ';' or ',' at the first of define_list, Found '{self.__curr_token.value}'")
+            self.__error(f"Excepted ';' or ',' at the first of define_list, Found '{self.__found()}'")
 
     def __y_defdata(self) -> Union[list[Node, Node], list[Node, list[Node]]]:
         """
@@ -478,19 +860,18 @@ class Yacc:
             y_vars.append(num)
         return y_vars
 
-    def __y_idtail(self) -> Union[list[list[Node], Node], Node]:
+    def __y_idtail(self) -> Union[list[list[Node], Node], FuncDef]:
         """
         对于一个标识符定义，若为函数定义，则其尾部为'(){}'或'();'；若为变量定义，则其后可能跟随若干相同的变量定义。
 
         :return: 若为函数定义，则返回[参数列表，函数体]。若为变量定义，则为[上个标识符维度，[后续变量定义]]
         """
         if self.__accept('LPAREN'):
-            y_func = Node(NodeType.FUNC, lineno=self.__last_token.line)
+            lineno = self.__last_token.line
             y_para = self.__y_para()
             self.__except('RPAREN')
             y_functail = self.__y_functail()
-            y_func.info = {"paras": y_para, "funcbody": y_functail}
-            return y_func
+            return FuncDef(NodeType.FUNC, lineno=lineno, paras=tuple(y_para), funcbody=y_functail)
         else:
             y_vardef = self.__y_vardef()
             y_deflist = self.__y_deflist()
@@ -499,8 +880,7 @@ class Yacc:
                 tmp.extend(y_deflist)
             return tmp
 
-    def __y_functail(self) -> Union[Node, None]:
-        global B
+    def __y_functail(self) -> Optional[Block]:
         """
         解析函数体，函数体可能为空
 
@@ -509,19 +889,12 @@ class Yacc:
         if self.__accept('SEMICOLON'):
             return None
         elif self.__accept('LBRACKET'):
-            y_block = Node(NodeType.BLOCK, lineno=self.__last_token.line, graph_node=f"B{B}")
-            # for graphviz
-            self.graph.node(y_block.graph_node, "Block")
-            B += 1
+            lineno = self.__last_token.line
             y_subprogram = self.__y_subprogram()
-            # for graphviz
-            for i in y_subprogram:
-                self.graph.edge(y_block.graph_node, i.graph_node)
-            y_block.info["subprogram"] = y_subprogram
             self.__except('RBRACKET')
-            return y_block
+            return Block(lineno=lineno, subprogram=y_subprogram)
         else:
-            self.__error(f"Excepted ';' or '{{' in function body, Found '{self.__curr_token.value}'")
+            self.__error(f"Excepted ';' or '{{' in function body, Found '{self.__found()}'")
 
     def __y_para(self) -> list[Node]:
         """
@@ -530,13 +903,14 @@ class Yacc:
         :return: parameter结点列表
         """
         para_list = []
-        if self.__curr_token.type != 'RPAREN':
+        if self.__curr_token is not None and self.__curr_token.type != 'RPAREN':
             para_list.append(self.__y_onepara())
             while self.__accept('COMMA'):
                 para_list.append(self.__y_onepara())
-        return para_list
+        # 类型错误的参数已记录错误，不进入参数列表
+        return [i for i in para_list if i is not None]
 
-    def __y_onepara(self) -> Node:
+    def __y_onepara(self) -> Optional[Node]:
         """
         单个参数解析
 
@@ -546,23 +920,20 @@ class Yacc:
         y_paradata = self.__y_paradata()
         if y_paradata[0].node_type == NodeType.POINTER:
             if y_type.node_type == NodeType.INT:
-                para = Node(NodeType.POINTER_INT_VAR, value=y_paradata[1].value, lineno=y_paradata[1].lineno, graph_node=y_paradata[1].graph_node)
+                para = Node(NodeType.POINTER_INT_VAR, value=y_paradata[1].value, symbol=y_paradata[1].symbol, lineno=y_paradata[1].lineno)
                 return para
             else:
-                self.__error("VOID Can't be used for POINTER!")
+                self.__report("VOID Can't be used for POINTER!")
         else:
             if y_type.node_type == NodeType.INT:
                 if len(y_paradata[1]):
-                    para = Node(NodeType.INT_ARRAY, value=y_paradata[0].value, lineno=y_paradata[0].lineno, graph_node=y_paradata[0].graph_node)
-                    info = {"size": len(y_paradata[1])}
-                    for i in range(info['size']):
-                        info[f'{i}'] = y_paradata[1][i]
-                    para.info = info
+                    para = ArrayDef(lineno=y_paradata[0].lineno, dims=tuple(y_paradata[1]), value=y_paradata[0].value,
+                                    symbol=y_paradata[0].symbol)
                 else:
-                    para = Node(NodeType.INT_VAR, value=y_paradata[0].value, lineno=y_paradata[0].lineno, graph_node=y_paradata[0].graph_node)
+                    para = Node(NodeType.INT_VAR, value=y_paradata[0].value, symbol=y_paradata[0].symbol, lineno=y_paradata[0].lineno)
                 return para
             else:
-                self.__error("VOID Can't be used for VAR or ARRAY")
+                self.__report("VOID Can't be used for VAR or ARRAY")
 
     def __y_paradata(self) -> Union[list[Node, Node], list[Node, list[Node]]]:
         """
@@ -587,7 +958,7 @@ class Yacc:
         """
         dem = []
         if self.__accept('LBRACE'):
-            if self.__curr_token.type == 'RBRACE':
+            if self.__curr_token is not None and self.__curr_token.type == 'RBRACE':
                 self.__next()
                 dem.append(None)
             else:
@@ -610,16 +981,22 @@ class Yacc:
         while True:
             if self.__curr_token is None or self.__curr_token.type == 'RBRACKET':
                 break
-            tmp = self.__y_onestatement()
+            start = self.__pos
+            try:
+                tmp = self.__y_onestatement()
+            except YaccError:
+                if not self.recover:
+                    raise
+                self.__synchronize(start, top=False)
+                continue
             if tmp is not None:
-                if type(tmp) == Node:
+                if isinstance(tmp, Node):
                     y_onestatements.append(tmp)
                 else:
                     y_onestatements.extend(tmp)
         return y_onestatements
 
     def __y_onestatement(self) -> Union[list[Node], Node, None]:
-        global L
         if self.__accept('INT') or self.__accept('VOID'):
             # for local variable definition
             y_localvars = []
@@ -633,125 +1010,60 @@ class Yacc:
                 if i[0].node_type == NodeType.POINTER:
                     # for pointer local variable
                     if y_type.node_type == NodeType.INT:
-                        localvar = Node(NodeType.POINTER_INT_VAR, value=i[1].value, lineno=i[1].lineno, graph_node=f"L{L}")
-                        # for graphviz
-                        self.graph.node(localvar.graph_node, "int*")
-                        self.graph.edge(localvar.graph_node, i[1].graph_node)
-                        L += 1
+                        localvar = Node(NodeType.POINTER_INT_VAR, value=i[1].value, symbol=i[1].symbol, lineno=i[1].lineno)
                         y_localvars.append(localvar)
                     else:
-                        self.__error("VOID Can't be used for POINTER!")
+                        self.__report("VOID Can't be used for POINTER!")
                 else:
                     if y_type.node_type == NodeType.INT:
                         if len(i[1]):
-                            localvar = Node(NodeType.INT_ARRAY, value=i[0].value, lineno=i[0].lineno, graph_node=f"L{L}")
-                            array_info = localvar.value
-                            node_val = "int"
-                            info = {'size': len(i[1])}
-                            for j in range(info['size']):
-                                info[f'{j}'] = i[1][j]
-                                array_info += f"[{i[1][j]}]"
-                                node_val += "[]"
-                                self.graph.edge(i[0].graph_node, i[1][j].graph_node)
-                            info['array'] = array_info
-                            localvar.info = info
-                            # for graphviz
-                            self.graph.node(localvar.graph_node, node_val)
-                            self.graph.edge(localvar.graph_node, i[0].graph_node)
+                            localvar = ArrayDef(lineno=i[0].lineno, dims=tuple(i[1]), value=i[0].value, symbol=i[0].symbol,
+                                                local=True)
                         else:
-                            localvar = Node(NodeType.INT_VAR, value=i[0].value, lineno=i[0].lineno, graph_node=f"L{L}")
-                            self.graph.node(localvar.graph_node, "int")
-                            self.graph.edge(localvar.graph_node, i[0].graph_node)
-                        L += 1
+                            localvar = Node(NodeType.INT_VAR, value=i[0].value, symbol=i[0].symbol, lineno=i[0].lineno)
                         y_localvars.append(localvar)
                     else:
-                        self.__error("VOID Can't be used for VAR or ARRAY")
+                        self.__report("VOID Can't be used for VAR or ARRAY")
             return y_localvars
         else:
             y_statement = self.__y_statement()
             return y_statement
 
     def __y_statement(self) -> Optional[Node]:
-        global T, B
         if self.__accept('WHILE'):
-            y_while = Node(NodeType.WHILE, value='WHILE', lineno=self.__last_token.line, graph_node=f"T{T}")
-            # for graphviz
-            self.graph.node(y_while.graph_node, "while")
-            T += 1
+            lineno = self.__last_token.line
             self.__except('LPAREN')
             y_expr = self.__y_expr()
             self.__except('RPAREN')
             y_statement = self.__y_statement()
-            info = {
-                "condition": y_expr,
-                "statement": y_statement
-            }
-            y_while.info = info
-            # for graphviz
-            self.graph.edge(y_while.graph_node, y_expr.graph_node)
-            if y_statement is not None:
-                self.graph.edge(y_while.graph_node, y_statement.graph_node)
-            return y_while
+            return While(lineno=lineno, condition=y_expr, statement=y_statement)
         elif self.__accept('IF'):
-            y_if = Node(NodeType.IF, value='IF', lineno=self.__last_token.line, graph_node=f"T{T}")
-            # for graphviz
-            self.graph.node(y_if.graph_node, "if")
-            T += 1
+            lineno = self.__last_token.line
             self.__except('LPAREN')
             y_expr = self.__y_expr()
             self.__except('RPAREN')
             y_statement = self.__y_statement()
             y_elsestat = self.__y_elsestat()
-            info = {
-                "condition": y_expr,
-                "statement": y_statement,
-                "elsestat": y_elsestat
-            }
-            y_if.info = info
-            # for graphviz
-            self.graph.edge(y_if.graph_node, y_expr.graph_node)
-            if y_statement is not None:
-                self.graph.edge(y_if.graph_node, y_statement.graph_node)
-            if y_elsestat is not None:
-                self.graph.edge(y_if.graph_node, y_elsestat.graph_node)
-            return y_if
+            return If(lineno=lineno, condition=y_expr, statement=y_statement, elsestat=y_elsestat)
         elif self.__accept('BREAK'):
-            y_break = Node(NodeType.BREAK, value='break', lineno=self.__last_token.line, graph_node=f"T{T}")
-            # for graphviz
-            self.graph.node(y_break.graph_node, "break")
-            T += 1
+            y_break = Node(NodeType.BREAK, value='break', lineno=self.__last_token.line)
             self.__except('SEMICOLON')
             return y_break
         elif self.__accept('CONTINUE'):
-            y_continue = Node(NodeType.CONTINUE, value='continue', lineno=self.__last_token.line, graph_node=f"T{T}")
-            # for graphviz
-            self.graph.node(y_continue.graph_node, "continue")
-            T += 1
+            y_continue = Node(NodeType.CONTINUE, value='continue', lineno=self.__last_token.line)
             self.__except('SEMICOLON')
             return y_continue
         elif self.__accept('RETURN'):
-            y_return = Node(NodeType.RETURN, value='return', lineno=self.__last_token.line, graph_node=f"T{T}")
-            # for graphviz
-            self.graph.node(y_return.graph_node, "return")
-            T += 1
+            y_return = Return(lineno=self.__last_token.line)
             if not self.__accept('SEMICOLON'):
-                y_expr = self.__y_expr()
-                y_return.info = {"return_expr": y_expr}
-                # for graphviz
-                self.graph.edge(y_return.graph_node, y_expr.graph_node)
+                y_return.return_expr = self.__y_expr()
                 self.__except('SEMICOLON')
             return y_return
         elif self.__accept('LBRACKET'):
-            y_block = Node(NodeType.BLOCK, lineno=self.__last_token.line, graph_node=f"B{B}")
-            self.graph.node(y_block.graph_node, "Block")
-            B += 1
+            lineno = self.__last_token.line
             y_subprogram = self.__y_subprogram()
-            # for graphviz
-            for i in y_subprogram:
-                self.graph.edge(y_block.graph_node, i.graph_node)
-            y_block.info["subprogram"] = y_subprogram
             self.__except('RBRACKET')
-            return y_block
+            return Block(lineno=lineno, subprogram=y_subprogram)
         elif self.__accept('SEMICOLON'):
             return None
         else:
@@ -759,447 +1071,64 @@ class Yacc:
             self.__except('SEMICOLON')
             return y_expr
 
-    def __y_elsestat(self) -> Optional[Node]:
-        global T
+    def __y_elsestat(self) -> Optional[Else]:
         if self.__accept('ELSE'):
-            y_else = Node(NodeType.ELSE, lineno=self.__last_token.line, graph_node=f"T{T}")
-            # for graphviz
-            self.graph.node(y_else.graph_node, "else")
-            T += 1
+            lineno = self.__last_token.line
             y_statement = self.__y_statement()
-            if y_statement is not None:
-                self.graph.edge(y_else.graph_node, y_statement.graph_node)
-            y_else.info['statement'] = y_statement
-            return y_else
+            return Else(lineno=lineno, statement=y_statement)
         else:
             return None
 
     def __y_expr(self) -> Node:
         """
+        表达式解析（算符优先/优先级爬升），以显式栈代替逐个运算符的递归
 
-        :return:
-        """
-        return self.__y_assexpr()
-
-    def __y_assexpr(self) -> Node:
-        """
-
+        优先级由低到高：= 、|| 、&& 、比较运算、+ - 、* / %，其中赋值与比较运算为右结合，其余左结合
 
-        :return:
+        :return: 表达式结点
         """
-        y_orexpr = self.__y_orexpr()
-        y_asstail = self.__y_asstail()
-        if y_asstail is not None:
-            y_asstail.info['lvar'] = y_orexpr
-            # for graphviz
-            self.graph.edge(y_asstail.graph_node, y_orexpr.graph_node)
-            return y_asstail
-        else:
-            return y_orexpr
-
-    def __y_orexpr(self) -> Node:
-        """
-
-        :return:
-        """
-        y_andexpr = self.__y_andexpr()
-        y_ortail = self.__y_ortail()
-        if y_ortail is not None:
-            if isinstance(y_ortail, Node):
-                y_ortail.info['lvar'] = y_andexpr
-                # for graphviz
-                self.graph.edge(y_ortail.graph_node, y_andexpr.graph_node)
-                return y_ortail
-            else:
-                ort, loi = y_ortail
-                loi.info['lvar'] = y_andexpr
-                # for graphviz
-                self.graph.edge(loi.graph_node, y_andexpr.graph_node)
-                return ort
-        else:
-            return y_andexpr
-
-    def __y_asstail(self) -> Optional[Node]:
-        global P
-        """
-
-        :return:
-        """
-        if self.__accept('ASSIGN'):
-            y_assign = Node(NodeType.ASSIGN, lineno=self.__last_token.line, graph_node=f"P{P}")
-            # for graphviz
-            self.graph.node(y_assign.graph_node, "=")
-            P += 1
-            y_assexpr = self.__y_assexpr()
-            y_asstail = self.__y_asstail()
-            if y_asstail is not None:
-                y_asstail.info['lvar'] = y_assexpr
-                y_assign.info['rvar'] = y_asstail
-                # for graphviz
-                self.graph.edge(y_asstail.graph_node, y_assexpr.graph_node)
-                self.graph.edge(y_assign.graph_node, y_asstail.graph_node)
-                return y_assign
-            else:
-                y_assign.info['rvar'] = y_assexpr
-                # for graphviz
-                self.graph.edge(y_assign.graph_node, y_assexpr.graph_node)
-                return y_assign
-        else:
-            return None
-
-    def __y_ortail(self) -> Union[Node, tuple[Node, Node], None]:
-        global P
-        """
-
-
-        :return:
-        """
-        if self.__accept('LOGIC_OR'):
-            y_logic_or = Node(NodeType.LOGIC_OR, lineno=self.__last_token.line, graph_node=f"P{P}")
-            # for graphviz
-            self.graph.node(y_logic_or.graph_node, "||")
-            P += 1
-            y_andexpr = self.__y_andexpr()
-            y_ortail = self.__y_ortail()
-            if y_ortail is not None:
-                if isinstance(y_ortail, Node):
-                    if y_ortail.node_type is NodeType.LOGIC_OR:
-                        y_logic_or.info['rvar'] = y_andexpr
-                        y_ortail.info['lvar'] = y_logic_or
-                        # for graphviz
-                        self.graph.edge(y_ortail.graph_node, y_logic_or.graph_node)
-                        self.graph.edge(y_logic_or.graph_node, y_andexpr.graph_node)
-                        return y_ortail, y_logic_or
-                    else:
-                        y_ortail.info['lvar'] = y_andexpr
-                        y_logic_or.info['rvar'] = y_ortail
-                        # for graphviz
-                        self.graph.edge(y_ortail.graph_node, y_andexpr.graph_node)
-                        self.graph.edge(y_logic_or.graph_node, y_ortail.graph_node)
-                        return y_logic_or
-                else:
-                    ort, loi = y_ortail
-                    y_logic_or.info['rvar'] = y_andexpr
-                    loi.info['lvar'] = y_logic_or
-                    # for graphviz
-                    self.graph.edge(loi.graph_node, y_logic_or.graph_node)
-                    self.graph.edge(y_logic_or.graph_node, y_andexpr.graph_node)
-                    return ort, y_logic_or
-            else:
-                y_logic_or.info['rvar'] = y_andexpr
-                # for graphviz
-                self.graph.edge(y_logic_or.graph_node, y_andexpr.graph_node)
-                return y_logic_or
-        else:
-            return None
-
-    def __y_andexpr(self) -> Node:
-        """
-
-        :return:
-        """
-        y_cmpexpr = self.__y_cmpexpr()
-        y_andtail = self.__y_andtail()
-        if y_andtail is not None:
-            if isinstance(y_andtail, Node):
-                y_andtail.info['lvar'] = y_cmpexpr
-                # for graphviz
-                self.graph.edge(y_andtail.graph_node, y_cmpexpr.graph_node)
-                return y_andtail
-            else:
-                ant, lai = y_andtail
-                lai.info['lvar'] = y_cmpexpr
-                # for graphviz
-                self.graph.edge(lai.graph_node, y_cmpexpr.graph_node)
-                return ant
-        else:
-            return y_cmpexpr
-
-    def __y_andtail(self) -> Union[Node, tuple[Node, Node], None]:
-        global P
-        """
-
-
-        :return:
-        """
-        if self.__accept('LOGIC_AND'):
-            y_logic_and = Node(NodeType.LOGIC_AND, lineno=self.__last_token.line, graph_node=f"P{P}")
-            # for graphviz
-            self.graph.node(y_logic_and.graph_node, "&&")
-            P += 1
-            y_cmpexpr = self.__y_cmpexpr()
-            y_andtail = self.__y_andtail()
-            if y_andtail is not None:
-                if isinstance(y_andtail, Node):
-                    if y_andtail.node_type is NodeType.LOGIC_AND:
-                        y_logic_and.info['rvar'] = y_cmpexpr
-                        y_andtail.info['lvar'] = y_logic_and
-                        # for graphviz
-                        self.graph.edge(y_andtail.graph_node, y_logic_and.graph_node)
-                        self.graph.edge(y_logic_and.graph_node, y_cmpexpr.graph_node)
-                        return y_andtail, y_logic_and
-                    else:
-                        y_andtail.info['lvar'] = y_cmpexpr
-                        y_logic_and.info['rvar'] = y_andtail
-                        # for graphviz
-                        self.graph.edge(y_andtail.graph_node, y_cmpexpr.graph_node)
-                        self.graph.edge(y_logic_and.graph_node, y_andtail.graph_node)
-                        return y_logic_and
-                else:
-                    ant, lai = y_andtail
-                    y_logic_and.info['rvar'] = y_cmpexpr
-                    lai.info['lvar'] = y_logic_and
-                    # for graphviz
-                    self.graph.edge(lai.graph_node, y_logic_and.graph_node)
-                    self.graph.edge(y_logic_and.graph_node, y_cmpexpr.graph_node)
-                    return ant, y_logic_and
-            else:
-                y_logic_and.info['rvar'] = y_cmpexpr
-                # for graphviz
-                self.graph.edge(y_logic_and.graph_node, y_cmpexpr.graph_node)
-                return y_logic_and
-        else:
-            return None
-
-    def __y_cmpexpr(self) -> Node:
-        """
-
-
-        :return:
-        """
-        y_aloexpr = self.__y_aloexpr()
-        y_cmptail = self.__y_cmptail()
-        if y_cmptail is not None:
-            y_cmptail.info['lvar'] = y_aloexpr
-            # for graphviz
-            self.graph.edge(y_cmptail.graph_node, y_aloexpr.graph_node)
-            return y_cmptail
-        else:
-            return y_aloexpr
-
-    def __y_cmptail(self) -> Optional[Node]:
-        global P
-        """
-
-
-        :return:
-        """
-        if self.__curr_token.type in ('GEQ', 'GT', 'LT', 'LEQ', 'EQ', 'NEQ'):
-            if self.__curr_token.type == 'GEQ':
-                cmp = NodeType.GEQ
-            elif self.__curr_token.type == 'GT':
-                cmp = NodeType.GT
-            elif self.__curr_token.type == 'LT':
-                cmp = NodeType.LT
-            elif self.__curr_token.type == 'LEQ':
-                cmp = NodeType.LEQ
-            elif self.__curr_token.type == 'EQ':
-                cmp = NodeType.EQ
-            else:
-                cmp = NodeType.NEQ
+        operands = [self.__y_factor()]
+        # (优先级, 运算符Token)
+        operators = []
+        while self.__curr_token is not None and self.__curr_token.type in BINARY_OPERATORS:
+            token = self.__curr_token
+            prec, right, _ = BINARY_OPERATORS[token.type]
+            while operators and (operators[-1][0] > prec or (operators[-1][0] == prec and not right)):
+                self.__reduce(operands, operators.pop()[1])
+            operators.append((prec, token))
             self.__next()
-            y_cmps = Node(cmp, value=self.__last_token.value, lineno=self.__last_token.line, graph_node=f"P{P}")
-            # for graphviz
-            self.graph.node(y_cmps.graph_node, self.__last_token.value)
-            P += 1
-            y_aloexpr = self.__y_aloexpr()
-            y_cmptail = self.__y_cmptail()
-            if y_cmptail is not None:
-                y_cmptail.info['lvar'] = y_aloexpr
-                y_cmps.info['rvar'] = y_cmptail
-                # for graphviz
-                self.graph.edge(y_cmptail.graph_node, y_aloexpr.graph_node)
-                self.graph.edge(y_cmps.graph_node, y_cmptail.graph_node)
-                return y_cmps
-            else:
-                y_cmps.info['rvar'] = y_aloexpr
-                # for graphviz
-                self.graph.edge(y_cmps.graph_node, y_aloexpr.graph_node)
-                return y_cmps
-        else:
-            return None
-
-    def __y_aloexpr(self) -> Node:
-        y_item = self.__y_item()
-        y_alotail = self.__y_alotail()
-        if y_alotail is not None:
-            if isinstance(y_alotail, Node):
-                y_alotail.info['lvar'] = y_item
-                # for graphviz
-                self.graph.edge(y_alotail.graph_node, y_item.graph_node)
-                return y_alotail
-            else:
-                alo, absb = y_alotail
-                absb.info['lvar'] = y_item
-                # for graphviz
-                self.graph.edge(absb.graph_node, y_item.graph_node)
-                return alo
-        else:
-            return y_item
-
-    def __y_alotail(self) -> Union[Node, tuple[Node, Node], None]:
-        global P
-        """
-
+            operands.append(self.__y_factor())
+        while operators:
+            self.__reduce(operands, operators.pop()[1])
+        return operands[0]
 
-        :return:
+    @staticmethod
+    def __reduce(operands: list[Node], token: Token) -> None:
         """
-        if self.__accept('PLUS') or self.__accept('MINUS'):
-            if self.__last_token.type == 'PLUS':
-                y_addsub = Node(NodeType.PLUS, lineno=self.__last_token.line, graph_node=f"P{P}")
-            else:
-                y_addsub = Node(NodeType.MINUS, lineno=self.__last_token.line, graph_node=f"P{P}")
-            # for graphviz
-            self.graph.node(y_addsub.graph_node, self.__last_token.value)
-            P += 1
-            y_item = self.__y_item()
-            y_alotail = self.__y_alotail()
-            if y_alotail is not None:
-                if isinstance(y_alotail, Node):
-                    if y_alotail.node_type in [NodeType.PLUS, NodeType.MINUS]:
-                        y_addsub.info['rvar'] = y_item
-                        y_alotail.info['lvar'] = y_addsub
-                        # for graphviz
-                        self.graph.edge(y_alotail.graph_node, y_addsub.graph_node)
-                        self.graph.edge(y_addsub.graph_node, y_item.graph_node)
-                        return y_alotail, y_addsub
-                    else:
-                        y_alotail.info['lvar'] = y_item
-                        y_addsub.info['rvar'] = y_alotail
-                        # for graphviz
-                        self.graph.edge(y_alotail.graph_node, y_item.graph_node)
-                        self.graph.edge(y_addsub.graph_node, y_alotail.graph_node)
-                        return y_addsub
-                else:
-                    alo, adsb = y_alotail
-                    y_addsub.info['rvar'] = y_item
-                    adsb.info['lvar'] = y_addsub
-                    # for graphviz
-                    self.graph.edge(adsb.graph_node, y_addsub.graph_node)
-                    self.graph.edge(y_addsub.graph_node, y_item.graph_node)
-                    return alo, y_addsub
-            else:
-                y_addsub.info['rvar'] = y_item
-                # for graphviz
-                self.graph.edge(y_addsub.graph_node, y_item.graph_node)
-                return y_addsub
-        else:
-            return None
-
-    def __y_item(self) -> Node:
+        以栈顶两个操作数构造二元运算结点
         """
-
-
-        :return:
-        """
-        y_factor = self.__y_factor()
-        y_itemtail = self.__y_itemtail()
-        if y_itemtail is not None:
-            if isinstance(y_itemtail, Node):
-                y_itemtail.info['lvar'] = y_factor
-                # for graphviz
-                self.graph.edge(y_itemtail.graph_node, y_factor.graph_node)
-                return y_itemtail
-            else:
-                ite, mldv = y_itemtail
-                mldv.info['lvar'] = y_factor
-                # for graphviz
-                self.graph.edge(mldv.graph_node, y_factor.graph_node)
-                return ite
-        else:
-            return y_factor
+        y_rvar = operands.pop()
+        y_lvar = operands.pop()
+        operands.append(BinOp(BINARY_OPERATORS[token.type][2], lineno=token.line, lvar=y_lvar, rvar=y_rvar,
+                              value=token.value if token.type in COMPARE_OPERATORS else ""))
 
     def __y_factor(self) -> Node:
-        global P
         """
-
+        解析带前缀一元运算符的运算元素
 
         :return:
         """
-        if self.__curr_token.type in ('NOT', 'MINUS', 'AND', 'TIMES', 'SELF_PLUS', 'SELF_MINUS'):
-            if self.__curr_token.type == 'NOT':
-                lop = NodeType.NOT
-            elif self.__curr_token.type == 'MINUS':
-                lop = NodeType.NEGATIVE
-            elif self.__curr_token.type == 'AND':
-                lop = NodeType.AND
-            elif self.__curr_token.type == 'TIMES':
-                lop = NodeType.POINTER
-            elif self.__curr_token.type == 'SELF_PLUS':
-                lop = NodeType.SELF_PLUS
-            else:
-                lop = NodeType.SELF_MINUS
+        prefixes = []
+        while self.__curr_token is not None and self.__curr_token.type in PREFIX_OPERATORS:
+            prefixes.append(self.__curr_token)
             self.__next()
-            y_lop = Node(lop, lineno=self.__last_token.line, value=self.__last_token.value, graph_node=f"P{P}")
-            P += 1
-            y_unary_left = Node(NodeType.UNARY_LEFT, lineno=self.__last_token.line, graph_node=f"P{P}")
-            P += 1
-            y_factor = self.__y_factor()
-            # for graphviz
-            self.graph.node(y_unary_left.graph_node, "UL")
-            self.graph.node(y_lop.graph_node, y_lop.value)
-            self.graph.edge(y_unary_left.graph_node, y_lop.graph_node)
-            self.graph.edge(y_unary_left.graph_node, y_factor.graph_node)
-            y_unary_left.info['lop'] = y_lop
-            y_unary_left.info['target'] = y_factor
-            return y_unary_left
-        else:
-            y_val = self.__y_val()
-            return y_val
-
-    def __y_itemtail(self) -> Union[Node, tuple[Node, Node], None]:
-        global P
-        """
-
-
-        :return:
-        """
-        if self.__accept('TIMES') or self.__accept('DIVIDE') or self.__accept('MOD'):
-            if self.__last_token.type == 'TIMES':
-                y_muldiv = Node(NodeType.TIMES, lineno=self.__last_token.line, graph_node=f"P{P}")
-            elif self.__last_token.type == 'DIVIDE':
-                y_muldiv = Node(NodeType.DIVIDE, lineno=self.__last_token.line, graph_node=f"P{P}")
-            else:
-                y_muldiv = Node(NodeType.MOD, lineno=self.__last_token.line, graph_node=f"P{P}")
-            # for graphviz
-            self.graph.node(y_muldiv.graph_node, self.__last_token.value)
-            P += 1
-            y_factor = self.__y_factor()
-            y_itemtail = self.__y_itemtail()
-            if y_itemtail is not None:
-                if isinstance(y_itemtail, Node):
-                    if y_itemtail.node_type in [NodeType.TIMES, NodeType.DIVIDE, NodeType.MOD]:
-                        y_muldiv.info['rvar'] = y_factor
-                        y_itemtail.info['lvar'] = y_muldiv
-                        # for graphviz
-                        self.graph.edge(y_itemtail.graph_node, y_muldiv.graph_node)
-                        self.graph.edge(y_muldiv.graph_node, y_factor.graph_node)
-                        return y_itemtail, y_muldiv
-                    else:
-                        y_itemtail.info['lvar'] = y_factor
-                        y_muldiv.info['rvar'] = y_itemtail
-                        # for graphviz
-                        self.graph.edge(y_itemtail.graph_node, y_factor.graph_node)
-                        self.graph.edge(y_muldiv.graph_node, y_itemtail.graph_node)
-                        return y_muldiv
-                else:
-                    ite, mldv = y_itemtail
-                    y_muldiv.info['rvar'] = y_factor
-                    mldv.info['lvar'] = y_muldiv
-                    # for graphviz
-                    self.graph.edge(mldv.graph_node, y_muldiv.graph_node)
-                    self.graph.edge(y_muldiv.graph_node, y_factor.graph_node)
-                    return ite, y_muldiv
-            else:
-                y_muldiv.info['rvar'] = y_factor
-                # for graphviz
-                self.graph.edge(y_muldiv.graph_node, y_factor.graph_node)
-                return y_muldiv
-        else:
-            return None
+        y_factor = self.__y_val()
+        for token in reversed(prefixes):
+            y_lop = Node(PREFIX_OPERATORS[token.type], lineno=token.line, value=token.value)
+            y_factor = UnaryLeft(lineno=token.line, lop=y_lop, target=y_factor)
+        return y_factor
 
     def __y_val(self) -> Node:
-        global P
         """
         解析运算元素是否存在右运算符
 
@@ -1208,24 +1137,13 @@ class Yacc:
         y_elem = self.__y_elem()
         while self.__accept('SELF_PLUS') or self.__accept('SELF_MINUS'):
             if self.__last_token.type == 'SELF_PLUS':
-                y_rop = Node(NodeType.SELF_PLUS, lineno=self.__last_token.line, value=self.__last_token.value, graph_node=f"P{P}")
+                y_rop = Node(NodeType.SELF_PLUS, lineno=self.__last_token.line, value=self.__last_token.value)
             else:
-                y_rop = Node(NodeType.SELF_MINUS, lineno=self.__last_token.line, value=self.__last_token.value, graph_node=f"P{P}")
-            P += 1
-            y_unary_right = Node(NodeType.UNARY_RIGHT, lineno=self.__last_token.line, graph_node=f"P{P}")
-            P += 1
-            # for graphviz
-            self.graph.node(y_unary_right.graph_node, "UR")
-            self.graph.node(y_rop.graph_node, self.__last_token.value)
-            self.graph.edge(y_unary_right.graph_node, y_rop.graph_node)
-            self.graph.edge(y_unary_right.graph_node, y_elem.graph_node)
-            y_unary_right.info['rop'] = y_rop
-            y_unary_right.info['target'] = y_elem
-            y_elem = y_unary_right
+                y_rop = Node(NodeType.SELF_MINUS, lineno=self.__last_token.line, value=self.__last_token.value)
+            y_elem = UnaryRight(lineno=self.__last_token.line, rop=y_rop, target=y_elem)
         return y_elem
 
     def __y_elem(self) -> Node:
-        global F
         """
         解析单个运算元素
 
@@ -1237,41 +1155,23 @@ class Yacc:
             return y_expr
         elif self.__accept('DIG') or self.__accept('HEX') or self.__accept('OCT'):
             if self.__last_token.type == 'DIG':
-                y_num = Node(NodeType.NUM, lineno=self.__last_token.line, value=self.__last_token.value, graph_node=f"F{F}")
+                y_num = Node(NodeType.NUM, lineno=self.__last_token.line, value=self.__last_token.value)
             elif self.__last_token.type == 'HEX':
-                y_num = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 16)), graph_node=f"F{F}")
+                y_num = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 16)))
             elif self.__last_token.type == 'OCT':
-                y_num = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 8)), graph_node=f"F{F}")
-            # for graphviz
-            self.graph.node(y_num.graph_node, self.__last_token.value)
-            F += 1
+                y_num = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 8)))
             return y_num
         elif self.__accept('IDENT'):
-            y_ident = Node(NodeType.IDENT, lineno=self.__last_token.line, value=self.__last_token.value, graph_node=f"F{F}")
-            F += 1
-            graph_node_value = self.__last_token.value
+            lineno, value, symbol = self.__last_token.line, self.__last_token.value, self.__last_token.symbol
             y_idexpr = self.__y_idexpr()
-            if y_idexpr is not None:
-                if y_idexpr[1] == 'array':
-                    idexpr = y_idexpr[0]
-                    y_ident.node_type = NodeType.ARRAY
-                    y_ident.info['size'] = len(idexpr)
-                    for i in range(y_ident.info['size']):
-                        y_ident.info[f'{i}'] = idexpr[i]
-                        self.graph.edge(y_ident.graph_node, idexpr[i].graph_node)
-                    graph_node_value += "[]" * y_ident.info['size']
-                elif y_idexpr[1] == 'func':
-                    idexpr = y_idexpr[0]
-                    y_ident.node_type = NodeType.FUNC
-                    y_ident.info["args"] = idexpr
-                    graph_node_value += "()"
-                    for i in idexpr:
-                        self.graph.edge(y_ident.graph_node, i.graph_node)
-            # for graphviz
-            self.graph.node(y_ident.graph_node, graph_node_value)
-            return y_ident
+            if y_idexpr is None:
+                return Node(NodeType.IDENT, lineno=lineno, value=value, symbol=symbol)
+            elif y_idexpr[1] == 'array':
+                return ArrayRef(lineno=lineno, indices=tuple(y_idexpr[0]), value=value, symbol=symbol)
+            else:
+                return Call(lineno=lineno, args=tuple(y_idexpr[0]), value=value, symbol=symbol)
         else:
-            self.__error(f"Excepted '(' or NUM or IDENT, Found '{self.__curr_token.value}'")
+            self.__error(f"Excepted '(' or NUM or IDENT, Found '{self.__found()}'")
 
     def __y_idexpr(self) -> Union[tuple[list[Node], str], None]:
         """
@@ -1300,7 +1200,7 @@ class Yacc:
         :return:
         """
         y_args = []
-        if self.__curr_token.type == 'RPAREN':
+        if self.__curr_token is None or self.__curr_token.type == 'RPAREN':
             return y_args
         y_expr = self.__y_expr()
         if y_expr is not None:
@@ -1313,7 +1213,6 @@ class Yacc:
         return y_args
 
     def __y_num(self) -> Node:
-        global F
         """
         期望解析数字，若当前不为数字则抛出错误
 
@@ -1321,30 +1220,24 @@ class Yacc:
         """
         if self.__accept('DIG') or self.__accept('HEX') or self.__accept('OCT'):
             if self.__last_token.type == 'DIG':
-                tmp = Node(NodeType.NUM, lineno=self.__last_token.line, value=self.__last_token.value, graph_node=f"F{F}")
+                tmp = Node(NodeType.NUM, lineno=self.__last_token.line, value=self.__last_token.value)
             elif self.__last_token.type == 'HEX':
-                tmp = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 16)), graph_node=f"F{F}")
+                tmp = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 16)))
             elif self.__last_token.type == 'OCT':
-                tmp = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 8)), graph_node=f"F{F}")
-            # for graphviz
-            self.graph.node(tmp.graph_node, self.__last_token.value)
-            F += 1
+                tmp = Node(NodeType.NUM, lineno=self.__last_token.line, value=str(int(self.__last_token.value, 8)))
             return tmp
         else:
-            self.__error(f"Excepted NUM, Found '{self.__curr_token.value}'")
+            self.__error(f"Excepted NUM, Found '{self.__found()}'")
 
     def __y_ident(self) -> Node:
-        global F
         """
         期望解析标识符，若当前不为标识符则抛出错误
 
         :return:
         """
         if self.__accept('IDENT'):
-            tmp = Node(NodeType.IDENT, lineno=self.__last_token.line, value=self.__last_token.value, graph_node=f"F{F}")
-            # for graphviz
-            self.graph.node(tmp.graph_node, self.__last_token.value)
-            F += 1
+            tmp = Node(NodeType.IDENT, lineno=self.__last_token.line, value=self.__last_token.value,
+                       symbol=self.__last_token.symbol)
             return tmp
         else:
-            self.__error(f"Excepted IDENT, Found '{self.__curr_token.value}'")
+            self.__error(f"Excepted IDENT, Found '{self.__found()}'")